@@ -0,0 +1,135 @@
+"""AudioDownloader stand-in that serves generated Opus files.
+
+Playlists are synthetic: `fake://playlist/N` lists N videos and
+`fake://video/ID` is a single video with that ID. "Downloading" a
+video copies one of the template files from a local directory, or fetches it
+from a local HTTP server, so the real download_entry bookkeeping (skip-existing
+checks, ledger updates, worker pool) runs without touching YouTube.
+
+Settings come from the environment so the real CLI can run unchanged in a
+subprocess:
+    YTSCRIBE_BENCH_SOURCE    directory or http:// URL holding *.opus templates
+    YTSCRIBE_BENCH_LATENCY   extra seconds per download (default 0)
+"""
+
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import httpx
+
+import ytscribe.cli
+import ytscribe.downloader
+from ytscribe.downloader import AudioDownloader
+from ytscribe.ledger import Ledger
+from ytscribe.metrics import Metrics
+
+FAKE_SCHEME = "fake://playlist/"
+FAKE_VIDEO_SCHEME = "fake://video/"
+
+
+class FakeDownloader(AudioDownloader):
+    """Downloader whose playlists and audio are generated locally."""
+
+    def __init__(
+        self,
+        output_root: Path,
+        ledger: Optional[Ledger] = None,
+        metrics: Optional[Metrics] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(output_root, ledger, metrics, **kwargs)
+        self.source = os.environ["YTSCRIBE_BENCH_SOURCE"]
+        self.latency = float(os.getenv("YTSCRIBE_BENCH_LATENCY", "0"))
+        if self.source.startswith("http"):
+            self._http = httpx.Client(timeout=30)
+            index = self._http.get(f"{self.source}/index.txt")
+            index.raise_for_status()
+            self.templates = index.text.split()
+        else:
+            self.templates = sorted(p.name for p in Path(self.source).glob("*.opus"))
+        if not self.templates:
+            raise ValueError(f"No *.opus templates in {self.source}")
+
+    def iter_entries(self, url: str) -> Iterator[dict[str, Any]]:
+        if url.startswith(FAKE_VIDEO_SCHEME):
+            video_id = url.removeprefix(FAKE_VIDEO_SCHEME)
+            entry = {
+                "_type": "url",
+                "id": video_id,
+                "url": url,
+                "title": f"Benchmark video {video_id}",
+            }
+            if self.ledger is not None:
+                self.ledger.record_enumerated(entry, url)
+            yield entry
+            return
+        if not url.startswith(FAKE_SCHEME):
+            raise ValueError(
+                f"FakeDownloader only serves {FAKE_SCHEME}N and "
+                f"{FAKE_VIDEO_SCHEME}ID URLs"
+            )
+        count = int(url.removeprefix(FAKE_SCHEME))
+        print(f"📦 Found {count} video(s) to download\n")
+        for i in range(count):
+            entry = {
+                "_type": "url",
+                "id": f"bench{i:05d}",
+                "url": f"{url}/{i}",
+                "title": f"Benchmark video {i}",
+                "playlist_title": f"bench-{count}",
+                "n_entries": count,
+            }
+            if self.ledger is not None:
+                self.ledger.record_enumerated(entry, url)
+            yield entry
+        if self.ledger is not None:
+            self.ledger.mark_source_complete(url, count)
+
+    def _resolve_entry(self, entry: dict[str, Any]) -> dict[str, Any]:
+        return {
+            **entry,
+            "_type": "video",
+            "channel": "ytscribe-bench",
+            "upload_date": "20240101",
+        }
+
+    def _fetch_audio(
+        self,
+        info: dict[str, Any],
+        output_template: str,
+        progress_label: Optional[str] = None,
+    ) -> None:
+        # Spread videos over the templates deterministically
+        digest = hashlib.sha1(info["id"].encode()).digest()
+        template = self.templates[digest[0] % len(self.templates)]
+        destination = Path(f"{output_template}.opus")
+
+        with self.metrics.span("download", info["id"]) as span:
+            if self.latency:
+                time.sleep(self.latency)
+            if self.source.startswith("http"):
+                with self._http.stream("GET", f"{self.source}/{template}") as response:
+                    response.raise_for_status()
+                    with open(destination, "wb") as f:
+                        for chunk in response.iter_bytes():
+                            f.write(chunk)
+            else:
+                shutil.copyfile(Path(self.source) / template, destination)
+            span.attrs["bytes"] = destination.stat().st_size
+        self.metrics.inc("bytes_downloaded_total", span.attrs["bytes"])
+
+        # Identical templates would all hit the transcript cache; make each
+        # file unique so every video costs one API request, like real data
+        with open(destination, "ab") as f:
+            f.write(info["id"].encode())
+
+
+def install() -> None:
+    """Make the CLI use FakeDownloader."""
+    ytscribe.downloader.AudioDownloader = FakeDownloader
+    # The CLI module bound the name at import time
+    ytscribe.cli.AudioDownloader = FakeDownloader
@@ -0,0 +1,311 @@
+"""Local stand-in for the ElevenLabs speech-to-text API.
+
+Accepts `POST /v1/speech-to-text` uploads and answers, after a configurable
+latency, with a realistic diarized `words` payload sized to the uploaded audio.
+A share of requests can be failed with 429 (with Retry-After) or 5xx responses,
+and a concurrency quota answers 429 to requests beyond it, like the real API.
+`GET /stats` returns request counts and utilisation as JSON.
+
+Point ytscribe at it with ELEVENLABS_BASE_URL=http://127.0.0.1:PORT.
+
+Usage:
+    uv run python benchmarks/fake_scribe.py --port 8900 --latency 0.5 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+# Bytes per second of the 64 kbps Opus audio ytscribe downloads
+OPUS_BYTES_PER_SECOND = 8000
+
+_VOCABULARY = (
+    "the a of and to in is it that we you this so really think people going "
+    "about know just like data model question right yeah actually because "
+    "podcast episode interesting point time work problem important"
+).split()
+
+
+def fake_transcript(
+    audio_bytes: int, diarize: bool = True, seed: Optional[int] = None
+) -> dict[str, Any]:
+    """Build a transcript payload in the convert response shape.
+
+    Args:
+        audio_bytes: Size of the uploaded audio, used to estimate its duration.
+        diarize: Whether to assign speaker IDs.
+        seed: Random seed for reproducible payloads.
+
+    Returns:
+        Transcript dictionary with text and word/spacing entries.
+    """
+    rng = random.Random(seed)
+    duration = max(audio_bytes / OPUS_BYTES_PER_SECOND, 1.0)
+    words: list[dict[str, Any]] = []
+    t = 0.0
+    speaker = 0
+    while t < duration:
+        # Speakers change every few sentences
+        if rng.random() < 0.02:
+            speaker = rng.randrange(3)
+        length = rng.uniform(0.15, 0.6)
+        speaker_id = f"speaker_{speaker}" if diarize else None
+        words.append(
+            {
+                "text": rng.choice(_VOCABULARY),
+                "start": round(t, 3),
+                "end": round(t + length, 3),
+                "type": "word",
+                "speaker_id": speaker_id,
+                "logprob": 0.0,
+            }
+        )
+        t += length
+        words.append(
+            {
+                "text": " ",
+                "start": round(t, 3),
+                "end": round(t, 3),
+                "type": "spacing",
+                "speaker_id": speaker_id,
+                "logprob": 0.0,
+            }
+        )
+        t += rng.uniform(0.0, 0.1)
+
+    return {
+        "language_code": "eng",
+        "language_probability": 0.99,
+        "text": "".join(word["text"] for word in words).strip(),
+        "words": words,
+        "audio_duration_secs": round(duration, 3),
+    }
+
+
+class FakeScribeServer:
+    """Threaded HTTP server imitating the speech-to-text endpoint."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.2,
+        latency_per_mb: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        server_error_rate: float = 0.0,
+        retry_after: int = 1,
+        concurrency_limit: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize the server (it starts with start()).
+
+        Args:
+            host: Interface to listen on.
+            port: Port to listen on (0 picks a free port).
+            latency: Fixed processing time per request, in seconds.
+            latency_per_mb: Extra processing time per MB of audio.
+            rate_limit_rate: Share of requests answered with 429.
+            server_error_rate: Share of requests answered with 500/503.
+            retry_after: Retry-After value sent with 429 responses, in seconds.
+            concurrency_limit: Requests allowed in flight; further ones get 429.
+            seed: Random seed for error injection and payloads.
+        """
+        self.latency = latency
+        self.latency_per_mb = latency_per_mb
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.retry_after = retry_after
+        self.concurrency_limit = concurrency_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._in_flight = 0
+        self._in_flight_area = 0.0
+        self._last_change = self._started
+        self.stats: dict[str, Any] = {
+            "requests": 0,
+            "responses": {},
+            "max_in_flight": 0,
+            "busy_seconds": 0.0,
+            "bytes_received": 0,
+        }
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to use as ELEVENLABS_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _track(self, delta: int) -> None:
+        """Update the in-flight gauge and its time integral."""
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight_area += self._in_flight * (now - self._last_change)
+            self._last_change = now
+            self._in_flight += delta
+            self.stats["max_in_flight"] = max(
+                self.stats["max_in_flight"], self._in_flight
+            )
+
+    def _choose_status(self) -> int:
+        """Pick the response status for a request (error injection)."""
+        with self._lock:
+            roll = self._rng.random()
+            over_quota = (
+                self.concurrency_limit is not None
+                and self._in_flight > self.concurrency_limit
+            )
+        if over_quota or roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.server_error_rate:
+            return (
+                503 if roll < self.rate_limit_rate + self.server_error_rate / 2 else 500
+            )
+        return 200
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current statistics, including mean requests in flight."""
+        self._track(0)
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            return {
+                **self.stats,
+                "responses": dict(self.stats["responses"]),
+                "elapsed_seconds": round(elapsed, 3),
+                "mean_in_flight": round(self._in_flight_area / elapsed, 3)
+                if elapsed
+                else 0.0,
+            }
+
+    def reset(self) -> None:
+        """Clear statistics (e.g. between benchmark runs)."""
+        with self._lock:
+            self._started = self._last_change = time.monotonic()
+            self._in_flight_area = 0.0
+            self.stats.update(
+                requests=0,
+                responses={},
+                max_in_flight=0,
+                busy_seconds=0.0,
+                bytes_received=0,
+            )
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        """Build the request handler bound to this server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                if self.path == "/stats":
+                    self._reply(200, server.snapshot())
+                else:
+                    self._reply(404, {"detail": "Not found"})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                if not self.path.startswith("/v1/speech-to-text"):
+                    self._reply(404, {"detail": "Not found"})
+                    return
+
+                started = time.monotonic()
+                server._track(1)
+                try:
+                    status = server._choose_status()
+                    time.sleep(
+                        server.latency + server.latency_per_mb * length / 1024**2
+                    )
+                    if status == 429:
+                        self._reply(
+                            429,
+                            {"detail": {"status": "too_many_concurrent_requests"}},
+                            {"Retry-After": str(server.retry_after)},
+                        )
+                    elif status != 200:
+                        self._reply(status, {"detail": "Injected server error"})
+                    else:
+                        diarize = b'name="diarize"\r\n\r\ntrue' in body
+                        self._reply(200, fake_transcript(length, diarize, seed=length))
+                finally:
+                    server._track(-1)
+                    with server._lock:
+                        server.stats["requests"] += 1
+                        server.stats["bytes_received"] += length
+                        server.stats["busy_seconds"] += time.monotonic() - started
+                        responses = server.stats["responses"]
+                        responses[str(status)] = responses.get(str(status), 0) + 1
+
+            def _reply(
+                self,
+                status: int,
+                payload: dict[str, Any],
+                headers: Optional[dict[str, str]] = None,
+            ) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-scribe", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--latency-per-mb", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency-limit", type=int)
+    args = parser.parse_args()
+
+    server = FakeScribeServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        latency_per_mb=args.latency_per_mb,
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.error_rate,
+        concurrency_limit=args.concurrency_limit,
+    )
+    server.start()
+    print(f"Fake Scribe API on {server.base_url} (stats: {server.base_url}/stats)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
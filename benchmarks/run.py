@@ -0,0 +1,330 @@
+"""Offline end-to-end benchmark for `ytscribe fetch`.
+
+Runs synthetic playlists through the real CLI in a subprocess, with the fake
+downloader (benchmarks/fake_downloader.py) and a fake Scribe API
+(benchmarks/fake_scribe.py), and reports throughput, per-stage latencies from
+the job ledger, peak RSS and API utilisation as JSON.
+
+Usage:
+    uv run python benchmarks/run.py                          # 10, 100, 1000 items
+    uv run python benchmarks/run.py --sizes 10 100 --transcribe-workers 8 \\
+        --fetch-args "--pipeline" --output benchmarks/results/$(git rev-parse --short HEAD).json
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import shlex
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+
+from fake_scribe import OPUS_BYTES_PER_SECOND, FakeScribeServer
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+
+
+def make_templates(directory: Path, count: int, seconds: float) -> list[Path]:
+    """Create Opus template files of roughly the given duration.
+
+    Uses FFmpeg when available (real, probe-able audio); otherwise writes
+    random bytes of the size a 64 kbps file of that duration would have.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    rng = random.Random(0)
+    for i in range(count):
+        path = directory / f"template{i}.opus"
+        duration = seconds * (0.5 + i / max(count - 1, 1))
+        if shutil.which("ffmpeg"):
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-loglevel",
+                    "error",
+                    "-y",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    f"anoisesrc=d={duration:.1f}:a=0.1",
+                    "-c:a",
+                    "libopus",
+                    "-b:a",
+                    "64k",
+                    str(path),
+                ],
+                check=True,
+            )
+        else:
+            path.write_bytes(rng.randbytes(int(duration * OPUS_BYTES_PER_SECOND)))
+        paths.append(path)
+    (directory / "index.txt").write_text("\n".join(p.name for p in paths))
+    return paths
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def serve_directory(directory: Path) -> tuple[ThreadingHTTPServer, str]:
+    """Serve a directory over HTTP on a free local port."""
+    handler = functools.partial(_QuietHandler, directory=str(directory))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def percentiles(values: list[float]) -> Optional[dict[str, float]]:
+    """Summarise latencies (seconds) as mean/p50/p95/max."""
+    if not values:
+        return None
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, round(0.95 * (len(values) - 1)))]
+    return {
+        "count": len(values),
+        "mean": round(statistics.fmean(values), 4),
+        "p50": round(statistics.median(values), 4),
+        "p95": round(p95, 4),
+        "max": round(values[-1], 4),
+    }
+
+
+def ledger_metrics(ledger_path: Path) -> dict[str, Any]:
+    """Read per-stage latencies and final states from a run's job ledger."""
+    if not ledger_path.exists():
+        return {"states": {}, "download": None, "transcribe": None}
+    conn = sqlite3.connect(ledger_path)
+    try:
+        states = dict(conn.execute("SELECT state, COUNT(*) FROM videos GROUP BY state"))
+        downloads = [
+            row[0]
+            for row in conn.execute(
+                "SELECT download_seconds FROM videos WHERE download_seconds IS NOT NULL"
+            )
+        ]
+        transcriptions = [
+            row[0]
+            for row in conn.execute(
+                "SELECT transcribe_seconds FROM videos "
+                "WHERE transcribe_seconds IS NOT NULL"
+            )
+        ]
+    finally:
+        conn.close()
+    return {
+        "states": states,
+        "download": percentiles(downloads),
+        "transcribe": percentiles(transcriptions),
+    }
+
+
+def run_once(
+    size: int,
+    source: str,
+    scribe: FakeScribeServer,
+    fetch_args: list[str],
+    transcribe_workers: int,
+    download_latency: float,
+    log_dir: Path,
+) -> dict[str, Any]:
+    """Run one playlist of `size` items through the CLI and collect metrics."""
+    with tempfile.TemporaryDirectory(prefix=f"ytscribe-bench-{size}-") as tmp:
+        work = Path(tmp)
+        rss_file = work / "rss.json"
+        env = {
+            **os.environ,
+            "ELEVENLABS_API_KEY": "bench",
+            "ELEVENLABS_BASE_URL": scribe.base_url,
+            "DOWNLOAD_ROOT": str(work / "audio"),
+            "TRANSCRIPT_ROOT": str(work / "transcripts"),
+            "CACHE_ROOT": str(work / "cache"),
+            "LEDGER_PATH": str(work / "ytscribe.sqlite3"),
+            "YTSCRIBE_BENCH_SOURCE": source,
+            "YTSCRIBE_BENCH_LATENCY": str(download_latency),
+            "YTSCRIBE_BENCH_RSS_FILE": str(rss_file),
+        }
+        command = [
+            sys.executable,
+            str(BENCH_DIR / "run_cli.py"),
+            "fetch",
+            f"fake://playlist/{size}",
+            "--transcribe-workers",
+            str(transcribe_workers),
+            *fetch_args,
+        ]
+
+        scribe.reset()
+        log_path = log_dir / f"fetch-{size}.log"
+        started = time.perf_counter()
+        with open(log_path, "w") as log:
+            completed = subprocess.run(
+                command, env=env, stdout=log, stderr=subprocess.STDOUT, cwd=work
+            )
+        wall = time.perf_counter() - started
+
+        api = scribe.snapshot()
+        ledger = ledger_metrics(work / "ytscribe.sqlite3")
+        peak_rss = (
+            json.loads(rss_file.read_text())["peak_rss_bytes"]
+            if rss_file.exists()
+            else None
+        )
+
+    transcribed = ledger["states"].get("transcribed", 0)
+    return {
+        "items": size,
+        "exit_code": completed.returncode,
+        "wall_seconds": round(wall, 3),
+        "items_per_second": round(transcribed / wall, 3) if wall else 0.0,
+        "states": ledger["states"],
+        "stage_latency_seconds": {
+            "download": ledger["download"],
+            "transcribe": ledger["transcribe"],
+        },
+        "peak_rss_mb": round(peak_rss / 1024**2, 1) if peak_rss else None,
+        "api": {
+            "requests": api["requests"],
+            "responses": api["responses"],
+            "max_in_flight": api["max_in_flight"],
+            "mean_in_flight": api["mean_in_flight"],
+            # Share of the allowed request slots that were actually busy
+            "utilisation": round(api["busy_seconds"] / (wall * transcribe_workers), 3)
+            if wall
+            else 0.0,
+            "mb_uploaded": round(api["bytes_received"] / 1024**2, 2),
+        },
+        "log": str(log_path),
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, if run from a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--transcribe-workers", type=int, default=4)
+    parser.add_argument(
+        "--fetch-args",
+        default="",
+        help="Extra `ytscribe fetch` options, e.g. '--pipeline --download-workers 4' (use --fetch-args=--pipeline for a single option)",
+    )
+    parser.add_argument("--templates", type=int, default=4)
+    parser.add_argument(
+        "--template-seconds", type=float, default=60.0, help="Mean audio duration"
+    )
+    parser.add_argument("--serve-http", action="store_true", help="Download over HTTP")
+    parser.add_argument("--download-latency", type=float, default=0.0)
+    parser.add_argument("--api-latency", type=float, default=0.2)
+    parser.add_argument("--api-latency-per-mb", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--api-concurrency-limit",
+        type=int,
+        help="Answer requests beyond this many in flight with 429",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write JSON here (default stdout)")
+    args = parser.parse_args()
+
+    fetch_args = shlex.split(args.fetch_args)
+    with tempfile.TemporaryDirectory(prefix="ytscribe-bench-") as tmp:
+        template_dir = Path(tmp) / "templates"
+        make_templates(template_dir, args.templates, args.template_seconds)
+        log_dir = Path(tmp) / "logs"
+        log_dir.mkdir()
+
+        http_server = None
+        source = str(template_dir)
+        if args.serve_http:
+            http_server, source = serve_directory(template_dir)
+
+        scribe = FakeScribeServer(
+            latency=args.api_latency,
+            latency_per_mb=args.api_latency_per_mb,
+            rate_limit_rate=args.rate_limit_rate,
+            server_error_rate=args.error_rate,
+            concurrency_limit=args.api_concurrency_limit,
+            seed=args.seed,
+        )
+        scribe.start()
+        runs = []
+        try:
+            for size in args.sizes:
+                print(f"▶ {size} items ...", file=sys.stderr, flush=True)
+                result = run_once(
+                    size,
+                    source,
+                    scribe,
+                    fetch_args,
+                    args.transcribe_workers,
+                    args.download_latency,
+                    log_dir,
+                )
+                if result["exit_code"] != 0:
+                    # Keep the log: the temporary directory is about to go away
+                    result["log_tail"] = Path(result["log"]).read_text()[-2000:]
+                del result["log"]
+                runs.append(result)
+                print(
+                    f"  {result['items_per_second']} items/s, "
+                    f"{result['wall_seconds']}s wall, "
+                    f"peak RSS {result['peak_rss_mb']} MB, "
+                    f"API utilisation {result['api']['utilisation']}",
+                    file=sys.stderr,
+                )
+        finally:
+            scribe.stop()
+            if http_server is not None:
+                http_server.shutdown()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()
+            },
+        },
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+        print(f"✓ Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
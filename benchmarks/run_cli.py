@@ -0,0 +1,37 @@
+"""Run the real ytscribe CLI with the fake downloader (benchmark child process).
+
+Writes this process's peak RSS to $YTSCRIBE_BENCH_RSS_FILE on exit.
+
+Usage:
+    python benchmarks/run_cli.py fetch fake://playlist/10 [fetch options]
+"""
+
+import json
+import os
+import resource
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_downloader  # noqa: E402
+
+fake_downloader.install()
+
+from ytscribe.cli import main  # noqa: E402
+
+
+def _peak_rss_bytes() -> int:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        rss_file = os.getenv("YTSCRIBE_BENCH_RSS_FILE")
+        if rss_file:
+            with open(rss_file, "w") as f:
+                json.dump({"peak_rss_bytes": _peak_rss_bytes()}, f)
@@ -0,0 +1,158 @@
+"""Per-job overhead of `ytscribe fetch` per process vs. `ytscribe serve`.
+
+Submits the same number of single-video jobs two ways, one after another, with
+the fake downloader and a fake Scribe API: as one CLI process per job (what a
+service shelling out to ytscribe does), and as `POST /jobs` requests to one
+long-running `ytscribe serve`. Reports per-job latency for both as JSON.
+
+Usage:
+    uv run python benchmarks/serve.py --jobs 20
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+from fake_scribe import FakeScribeServer
+from run import BENCH_DIR, make_templates, percentiles
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _environment(work: Path, source: str, scribe: FakeScribeServer) -> dict[str, str]:
+    return {
+        **os.environ,
+        "ELEVENLABS_API_KEY": "bench",
+        "ELEVENLABS_BASE_URL": scribe.base_url,
+        "DOWNLOAD_ROOT": str(work / "audio"),
+        "TRANSCRIPT_ROOT": str(work / "transcripts"),
+        "CACHE_ROOT": str(work / "cache"),
+        "LEDGER_PATH": str(work / "ytscribe.sqlite3"),
+        "YTSCRIBE_BENCH_SOURCE": source,
+    }
+
+
+def run_processes(jobs: int, env: dict[str, str], work: Path) -> list[float]:
+    """Run each job as its own `ytscribe fetch` process."""
+    latencies = []
+    for i in range(jobs):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [
+                sys.executable,
+                str(BENCH_DIR / "run_cli.py"),
+                "fetch",
+                f"fake://video/cli{i:05d}",
+            ],
+            env=env,
+            cwd=work,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"fetch exited with {completed.returncode}")
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run_server(jobs: int, env: dict[str, str], work: Path) -> dict[str, Any]:
+    """Run each job as a POST to one `ytscribe serve` process."""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    launched = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, str(BENCH_DIR / "run_cli.py"), "serve", "--port", str(port)],
+        env=env,
+        cwd=work,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            while True:
+                try:
+                    client.get("/health").raise_for_status()
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None:
+                        raise RuntimeError("serve exited before it was ready")
+                    time.sleep(0.05)
+            startup = time.perf_counter() - launched
+
+            latencies = []
+            for i in range(jobs):
+                started = time.perf_counter()
+                response = client.post(
+                    "/jobs", json={"url": f"fake://video/srv{i:05d}"}
+                )
+                response.raise_for_status()
+                job_id = response.json()["job_id"]
+                while True:
+                    job = client.get(f"/jobs/{job_id}").json()
+                    if job["state"] not in ("queued", "running"):
+                        break
+                    time.sleep(0.01)
+                if job["state"] != "done":
+                    raise RuntimeError(f"Job {job_id} failed: {job['error']}")
+                latencies.append(time.perf_counter() - started)
+    finally:
+        server.terminate()
+        server.wait(30)
+    return {"startup_seconds": round(startup, 3), "latencies": latencies}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument(
+        "--template-seconds", type=float, default=60.0, help="Mean audio duration"
+    )
+    parser.add_argument("--api-latency", type=float, default=0.2)
+    parser.add_argument("--output", type=Path, help="Write JSON here (default stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ytscribe-bench-serve-") as tmp:
+        work = Path(tmp)
+        make_templates(work / "templates", 4, args.template_seconds)
+        scribe = FakeScribeServer(latency=args.api_latency, seed=0)
+        scribe.start()
+        try:
+            env = _environment(work, str(work / "templates"), scribe)
+            print(f"▶ {args.jobs} fetch processes ...", file=sys.stderr, flush=True)
+            processes = run_processes(args.jobs, env, work)
+            print(f"▶ {args.jobs} jobs to serve ...", file=sys.stderr, flush=True)
+            served = run_server(args.jobs, env, work)
+        finally:
+            scribe.stop()
+
+    report = {
+        "settings": {
+            k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()
+        },
+        "fetch_per_job": percentiles(processes),
+        "serve_startup_seconds": served["startup_seconds"],
+        "serve_per_job": percentiles(served["latencies"]),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+        print(f"✓ Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
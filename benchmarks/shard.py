@@ -0,0 +1,173 @@
+"""Several `ytscribe fetch --worker-id` processes sharing one data directory.
+
+Runs the same synthetic playlist through 1, 2, 4, ... worker processes that
+share DOWNLOAD_ROOT, TRANSCRIPT_ROOT and the job ledger, with the fake
+downloader and a fake Scribe API. Reports wall time, speed-up over one worker
+and API requests per video (1.0 means no video was transcribed twice) as JSON.
+
+With --crash-after, the first worker is killed (SIGKILL) that many seconds
+into each run; its unfinished videos are taken over by the other workers once
+their leases expire (--lease-ttl).
+
+Usage:
+    uv run python benchmarks/shard.py --items 40 --workers 1 2 4
+    uv run python benchmarks/shard.py --items 40 --workers 4 --crash-after 3 --lease-ttl 5
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from fake_scribe import FakeScribeServer
+from run import BENCH_DIR, ledger_metrics, make_templates
+
+
+def run_workers(
+    workers: int,
+    items: int,
+    source: str,
+    scribe: FakeScribeServer,
+    lease_ttl: float,
+    download_latency: float,
+    crash_after: Optional[float],
+    queue_size: int,
+) -> dict[str, Any]:
+    """Run one playlist through `workers` processes and collect the results."""
+    with tempfile.TemporaryDirectory(prefix=f"ytscribe-shard-{workers}-") as tmp:
+        work = Path(tmp)
+        env = {
+            **os.environ,
+            "ELEVENLABS_API_KEY": "bench",
+            "ELEVENLABS_BASE_URL": scribe.base_url,
+            "DOWNLOAD_ROOT": str(work / "audio"),
+            "TRANSCRIPT_ROOT": str(work / "transcripts"),
+            "CACHE_ROOT": str(work / "cache"),
+            "LEDGER_PATH": str(work / "ytscribe.sqlite3"),
+            "YTSCRIBE_BENCH_SOURCE": source,
+            "YTSCRIBE_BENCH_LATENCY": str(download_latency),
+        }
+
+        scribe.reset()
+        started = time.perf_counter()
+        processes = [
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    str(BENCH_DIR / "run_cli.py"),
+                    "fetch",
+                    f"fake://playlist/{items}",
+                    "--pipeline",
+                    "--worker-id",
+                    f"worker{i}",
+                    "--lease-ttl",
+                    str(lease_ttl),
+                    "--queue-size",
+                    str(queue_size),
+                ],
+                env=env,
+                cwd=work,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            for i in range(workers)
+        ]
+        crashed = False
+        if crash_after is not None:
+            try:
+                processes[0].wait(crash_after)
+            except subprocess.TimeoutExpired:
+                processes[0].send_signal(signal.SIGKILL)
+                crashed = True
+        exit_codes = [process.wait() for process in processes]
+        wall = time.perf_counter() - started
+
+        api = scribe.snapshot()
+        ledger = ledger_metrics(work / "ytscribe.sqlite3")
+        transcripts = len(list((work / "transcripts").rglob("*.json")))
+
+    return {
+        "workers": workers,
+        "items": items,
+        "crashed_worker": crashed,
+        "exit_codes": exit_codes,
+        "wall_seconds": round(wall, 3),
+        "transcripts": transcripts,
+        "states": ledger["states"],
+        "api_requests": api["requests"],
+        "requests_per_item": round(api["requests"] / items, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--template-seconds", type=float, default=30.0, help="Mean audio duration"
+    )
+    parser.add_argument("--download-latency", type=float, default=0.2)
+    parser.add_argument("--api-latency", type=float, default=0.5)
+    parser.add_argument("--lease-ttl", type=float, default=10.0)
+    parser.add_argument("--crash-after", type=float)
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=1,
+        help="Videos each worker downloads (and so leases) ahead of transcription",
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON here (default stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ytscribe-shard-") as tmp:
+        template_dir = Path(tmp) / "templates"
+        make_templates(template_dir, 4, args.template_seconds)
+        scribe = FakeScribeServer(latency=args.api_latency, seed=0)
+        scribe.start()
+        runs = []
+        try:
+            for workers in args.workers:
+                print(f"▶ {workers} worker(s) ...", file=sys.stderr, flush=True)
+                result = run_workers(
+                    workers,
+                    args.items,
+                    str(template_dir),
+                    scribe,
+                    args.lease_ttl,
+                    args.download_latency,
+                    args.crash_after,
+                    args.queue_size,
+                )
+                result["speedup"] = (
+                    round(runs[0]["wall_seconds"] / result["wall_seconds"], 2)
+                    if runs
+                    else 1.0
+                )
+                runs.append(result)
+                print(
+                    f"  {result['wall_seconds']}s wall, "
+                    f"{result['transcripts']}/{args.items} transcripts, "
+                    f"{result['requests_per_item']} API requests per item",
+                    file=sys.stderr,
+                )
+        finally:
+            scribe.stop()
+
+    settings = {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()}
+    text = json.dumps({"settings": settings, "runs": runs}, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+        print(f"✓ Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""CLI cold-start benchmark and guard.
+
+Measures how long `ytscribe --help` takes in fresh interpreters, lists the
+slowest imports (from `python -X importtime`), and fails if start-up pulls in
+the heavy dependencies that only the transcription/download paths need, or
+exceeds a time budget.
+
+Usage:
+    uv run python benchmarks/startup.py
+    uv run python benchmarks/startup.py --runs 20 --max-ms 250 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Modules `ytscribe --help` must not import
+FORBIDDEN_MODULES = ("elevenlabs", "yt_dlp", "pydantic", "httpx")
+
+_HELP_SNIPPET = (
+    "import sys; sys.argv = ['ytscribe', '--help']; from ytscribe import main; main()"
+)
+
+
+def time_help(runs: int, env: dict[str, str]) -> list[float]:
+    """Wall time of `ytscribe --help` in milliseconds, one fresh process per run."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", _HELP_SNIPPET],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def import_profile(env: dict[str, str], top: int) -> list[dict[str, float | str]]:
+    """Packages that take longest to import with ytscribe.cli.
+
+    Self times from `-X importtime` are summed per top-level package, so e.g.
+    all of typer's submodules count towards 'typer'.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ytscribe.cli"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    totals: dict[str, float] = {}
+    # Lines look like "import time: <self us> | <cumulative us> | <module>"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # column header
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0.0) + int(self_us) / 1000
+    ranked = sorted(totals.items(), key=lambda item: -item[1])[:top]
+    return [{"package": package, "ms": round(ms, 1)} for package, ms in ranked]
+
+
+def loaded_modules(env: dict[str, str]) -> list[str]:
+    """Forbidden modules present after importing the CLI."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, ytscribe.cli; "
+            f"print(' '.join(m for m in {FORBIDDEN_MODULES!r} if m in sys.modules))",
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument(
+        "--max-ms", type=float, help="Fail if the median `--help` time exceeds this"
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON here")
+    args = parser.parse_args()
+
+    # No API key needed: --help must not validate configuration
+    env = {k: v for k, v in os.environ.items() if k != "ELEVENLABS_API_KEY"}
+
+    timings = time_help(args.runs, env)
+    profile = import_profile(env, args.top)
+    forbidden = loaded_modules(env)
+    median = statistics.median(timings)
+
+    report = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "help_ms": {
+            "median": round(median, 1),
+            "min": round(min(timings), 1),
+            "max": round(max(timings), 1),
+        },
+        "slowest_imports": profile,
+        "forbidden_modules_loaded": forbidden,
+    }
+
+    print(f"`ytscribe --help`: median {median:.0f} ms over {args.runs} run(s)")
+    print("\nSlowest packages to import (ms):")
+    for row in profile:
+        print(f"  {row['ms']:8.1f}  {row['package']}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    failed = False
+    if forbidden:
+        print(f"\n✗ Start-up imports heavy modules: {', '.join(forbidden)}")
+        failed = True
+    if args.max_ms is not None and median > args.max_ms:
+        print(
+            f"\n✗ Median start-up {median:.0f} ms exceeds budget of {args.max_ms:.0f} ms"
+        )
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\n✓ Start-up within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""FFmpeg/ffprobe helpers for inspecting, converting and cutting audio files."""
+
+import re
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+# silencedetect log lines, e.g. "[silencedetect @ 0x...] silence_end: 12.5 | ..."
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def probe_duration(audio_path: Path) -> float:
+    """Get the duration of an audio file in seconds.
+
+    Args:
+        audio_path: Path to the audio file.
+
+    Returns:
+        Duration in seconds.
+
+    Raises:
+        FileNotFoundError: If ffprobe is not installed.
+        ValueError: If the duration could not be determined.
+    """
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            str(audio_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        raise ValueError(
+            f"Could not determine duration of {audio_path}: {result.stderr.strip()}"
+        )
+
+
+def probe_codec(audio_path: Path) -> Optional[str]:
+    """Get the codec of the first audio stream of a file.
+
+    Args:
+        audio_path: Path to the audio (or video) file.
+
+    Returns:
+        FFmpeg codec name (e.g. 'opus', 'aac'), or None if the file has no
+        readable audio stream.
+
+    Raises:
+        FileNotFoundError: If ffprobe is not installed.
+    """
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=codec_name",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            str(audio_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def convert_to_opus(
+    source: Path,
+    destination: Path,
+    copy: bool,
+    bitrate: str = "64k",
+    threads: Optional[int] = None,
+) -> None:
+    """Write the audio of a file as Ogg Opus.
+
+    Args:
+        source: Input file (any container FFmpeg reads).
+        destination: Output .opus file.
+        copy: Copy the audio stream as it is (it must already be Opus);
+            otherwise it is re-encoded with libopus.
+        bitrate: Bitrate when re-encoding.
+        threads: FFmpeg threads for decoding and encoding (None lets FFmpeg
+            choose).
+
+    Raises:
+        FileNotFoundError: If ffmpeg is not installed.
+        RuntimeError: If ffmpeg fails.
+    """
+    thread_args = ["-threads", str(threads)] if threads else []
+    codec_args = ["-c:a", "copy"] if copy else ["-c:a", "libopus", "-b:a", bitrate]
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            *thread_args,
+            "-i",
+            str(source),
+            "-vn",
+            "-map",
+            "0:a:0",
+            *codec_args,
+            *thread_args,
+            "-f",
+            "ogg",
+            str(destination),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg failed to convert {source} to Opus: {result.stderr[-500:]}"
+        )
+
+
+def detect_silences(
+    audio_path: Path, noise_db: float = -35.0, min_silence: float = 0.5
+) -> list[tuple[float, float]]:
+    """Find silent stretches in an audio file.
+
+    Args:
+        audio_path: Path to the audio file.
+        noise_db: Level below which audio counts as silence, in dB.
+        min_silence: Minimum silence length in seconds.
+
+    Returns:
+        List of (start, end) times in seconds, in order.
+
+    Raises:
+        FileNotFoundError: If ffmpeg is not installed.
+        RuntimeError: If ffmpeg fails.
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-nostats",
+            "-i",
+            str(audio_path),
+            "-af",
+            f"silencedetect=noise={noise_db}dB:d={min_silence}",
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg silence detection failed: {result.stderr[-500:]}")
+
+    silences = []
+    start = None
+    for line in result.stderr.splitlines():
+        if match := _SILENCE_START.search(line):
+            start = max(float(match.group(1)), 0.0)
+        elif (match := _SILENCE_END.search(line)) and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def cut_segment(source: Path, destination: Path, start: float, end: float) -> None:
+    """Copy a time range of an audio file without re-encoding.
+
+    Args:
+        source: Input audio file.
+        destination: Output file (same container as the input).
+        start: Segment start in seconds.
+        end: Segment end in seconds.
+
+    Raises:
+        FileNotFoundError: If ffmpeg is not installed.
+        RuntimeError: If ffmpeg fails.
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-ss",
+            f"{start:.3f}",
+            "-i",
+            str(source),
+            "-t",
+            f"{end - start:.3f}",
+            "-c",
+            "copy",
+            str(destination),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to cut {source}: {result.stderr[-500:]}")
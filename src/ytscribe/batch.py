@@ -0,0 +1,172 @@
+"""Batch runs over many sources.
+
+Sources are read from a list of URLs, listed lazily and interleaved, so one
+huge playlist can't hold up all the others: each active source in turn hands
+over its next video (or `weight` videos, when scheduling by weight). A video
+that several sources list is scheduled once, for the first source that
+reaches it.
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Optional
+
+from ytscribe.downloader import AudioDownloader
+
+SCHEDULES = ("round-robin", "weighted")
+
+
+@dataclass(frozen=True)
+class BatchSource:
+    """One line of a batch file.
+
+    Attributes:
+        url: YouTube video, playlist or channel URL.
+        weight: Videos this source gets per turn when scheduling by weight.
+    """
+
+    url: str
+    weight: int = 1
+
+
+@dataclass
+class SourceStats:
+    """What a batch run took from one source.
+
+    Attributes:
+        scheduled: Videos handed to the download stage.
+        duplicates: Videos skipped because another source listed them first.
+        video_ids: IDs of the scheduled videos, in order.
+        error: Why listing stopped early, if it did.
+    """
+
+    scheduled: int = 0
+    duplicates: int = 0
+    video_ids: list[str] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+
+def parse_sources(lines: Iterable[str]) -> list[BatchSource]:
+    """Parse batch file lines of the form `URL [WEIGHT]`.
+
+    Blank lines and lines starting with # are skipped, and a URL listed twice
+    keeps its first weight.
+
+    Args:
+        lines: Lines of the batch file.
+
+    Returns:
+        The sources, in file order.
+
+    Raises:
+        ValueError: If a weight is not a positive integer.
+    """
+    sources: dict[str, BatchSource] = {}
+    for number, line in enumerate(lines, 1):
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        weight = 1
+        if len(fields) > 1:
+            try:
+                weight = int(fields[1])
+            except ValueError:
+                weight = 0
+            if weight < 1:
+                raise ValueError(
+                    f"Line {number}: weight must be a positive integer, "
+                    f"got '{fields[1]}'"
+                )
+        sources.setdefault(fields[0], BatchSource(fields[0], weight))
+    return list(sources.values())
+
+
+class SourceScheduler:
+    """Interleaves the entries of many sources and drops duplicate videos.
+
+    Iterating the scheduler lists sources lazily: at most `max_active` are
+    being listed at a time, and the next source is opened when one runs out.
+    The stats are filled in as entries are handed out.
+    """
+
+    def __init__(
+        self,
+        downloader: AudioDownloader,
+        sources: list[BatchSource],
+        schedule: str = "round-robin",
+        max_active: int = 16,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            downloader: Downloader used to list each source.
+            sources: Sources to take videos from.
+            schedule: 'round-robin' (one video per source per turn) or
+                'weighted' (`weight` videos per source per turn).
+            max_active: Sources listed at the same time.
+
+        Raises:
+            ValueError: If the schedule is unknown or max_active < 1.
+        """
+        if schedule not in SCHEDULES:
+            raise ValueError(
+                f"Unknown schedule '{schedule}'. Choose from: {', '.join(SCHEDULES)}"
+            )
+        if max_active < 1:
+            raise ValueError("max_active must be at least 1")
+
+        self.downloader = downloader
+        self.sources = sources
+        self.schedule = schedule
+        self.max_active = max_active
+        self.stats = {source.url: SourceStats() for source in sources}
+        self._seen: set[str] = set()
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        waiting = iter(self.sources)
+        active: list[tuple[BatchSource, Iterator[dict[str, Any]]]] = []
+
+        while True:
+            while len(active) < self.max_active:
+                source = next(waiting, None)
+                if source is None:
+                    break
+                active.append((source, self.downloader.iter_entries(source.url)))
+            if not active:
+                return
+
+            for source, entries in list(active):
+                turns = source.weight if self.schedule == "weighted" else 1
+                taken = 0
+                while taken < turns:
+                    entry = self._next_entry(source, entries)
+                    if entry is None:
+                        active.remove((source, entries))
+                        break
+                    if entry["id"] in self._seen:
+                        self.stats[source.url].duplicates += 1
+                        continue
+                    self._seen.add(entry["id"])
+                    stats = self.stats[source.url]
+                    stats.scheduled += 1
+                    stats.video_ids.append(entry["id"])
+                    taken += 1
+                    # Positions are global in a batch; a playlist's own count
+                    # would make the progress counter misleading
+                    yield {**entry, "n_entries": None}
+
+    def _next_entry(
+        self, source: BatchSource, entries: Iterator[dict[str, Any]]
+    ) -> Optional[dict[str, Any]]:
+        """Next entry with a video ID from a source, or None once it is done."""
+        while True:
+            try:
+                entry = next(entries)
+            except StopIteration:
+                return None
+            except Exception as e:
+                self.stats[source.url].error = e
+                print(f"✗ Listing stopped for {source.url}: {e}", file=sys.stderr)
+                return None
+            if entry.get("id"):
+                return entry
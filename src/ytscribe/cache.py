@@ -0,0 +1,138 @@
+"""Content-addressed cache for ElevenLabs transcription responses.
+
+Responses are keyed by a hash of the audio bytes plus the options that affect
+the transcript, so re-running the same file (or a reupload of identical audio
+saved under another channel directory) never pays for the API twice.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from ytscribe.storage import atomic_write
+
+# Read size for hashing audio files
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+class TranscriptCache:
+    """Size-bounded, least-recently-used store of raw transcription responses."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: Directory holding cached responses.
+            max_bytes: Total size above which least recently used entries are
+                evicted.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Bytes in the cache, measured on the first put and then kept up to
+        # date, so only a put that crosses max_bytes scans the directory
+        self._total: Optional[int] = None
+
+    def key(self, audio_path: Path, options: dict[str, Any]) -> str:
+        """Compute the cache key for an audio file and transcription options.
+
+        Args:
+            audio_path: Path to the audio file.
+            options: Options that change the transcript (model, language, ...).
+
+        Returns:
+            Hex digest identifying the audio content and options.
+        """
+        digest = hashlib.sha256()
+        with open(audio_path, "rb") as f:
+            while chunk := f.read(_HASH_CHUNK_BYTES):
+                digest.update(chunk)
+        digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Get the file path for a cache key."""
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Look up a cached response.
+
+        Args:
+            key: Cache key from key().
+
+        Returns:
+            The cached response dictionary, or None on a miss.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put(self, key: str, data: dict[str, Any]) -> None:
+        """Store a response and evict old entries if the cache is over size.
+
+        Args:
+            key: Cache key from key().
+            data: Raw response dictionary from ElevenLabs.
+        """
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+
+        # Write to a temp file first so readers never see a partial entry
+        with atomic_write(path) as f:
+            json.dump(data, f, ensure_ascii=False)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += size - replaced
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """Every entry as (modification time, size, path)."""
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_bytes.
+
+        Must be called with the lock held. Rescans the directory, which also
+        counts entries other processes added since the last scan.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._total = total
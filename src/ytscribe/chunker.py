@@ -0,0 +1,244 @@
+"""Split long audio at silences and stitch chunk transcripts back together.
+
+Chunks are cut with stream copy (no re-encoding) at the silence closest to each
+target boundary. Neighbouring chunks overlap slightly: the words both chunks
+transcribe in the overlap are used to map each chunk's speaker labels onto the
+labels already in use, so speakers stay consistent across chunk edges.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from ytscribe.audio import cut_segment, detect_silences
+
+# How far from the ideal boundary to look for a silence, as a share of the target
+_SEARCH_WINDOW_RATIO = 0.15
+
+# Words in the overlap match if their (offset) start times are this close
+_MATCH_TOLERANCE_SECONDS = 0.5
+
+
+@dataclass
+class Chunk:
+    """A time range of the original audio, transcribed as one request.
+
+    Attributes:
+        index: Position of the chunk in the file.
+        start: Where the chunk's audio begins, including the overlap.
+        end: Where the chunk's audio ends.
+        boundary: Where this chunk takes over from the previous one; words
+            starting earlier are taken from the previous chunk instead.
+        path: The cut audio file, once written.
+    """
+
+    index: int
+    start: float
+    end: float
+    boundary: float
+    path: Optional[Path] = None
+
+
+def plan_chunks(
+    duration: float,
+    silences: list[tuple[float, float]],
+    target_seconds: float,
+    overlap_seconds: float,
+) -> list[Chunk]:
+    """Choose chunk boundaries at silences near multiples of the target length.
+
+    Args:
+        duration: Total audio duration in seconds.
+        silences: Silent stretches as (start, end) pairs.
+        target_seconds: Desired chunk length.
+        overlap_seconds: Audio repeated at the start of each chunk after the first.
+
+    Returns:
+        Chunks covering the whole file, in order.
+    """
+    window = target_seconds * _SEARCH_WINDOW_RATIO
+    midpoints = [(start + end) / 2 for start, end in silences]
+
+    boundaries = [0.0]
+    # Don't leave a tiny final chunk: stop once the rest fits in ~1.2 targets
+    while duration - boundaries[-1] > target_seconds * 1.2:
+        ideal = boundaries[-1] + target_seconds
+        nearby = [
+            m
+            for m in midpoints
+            if abs(m - ideal) <= window and m > boundaries[-1] + overlap_seconds
+        ]
+        boundaries.append(min(nearby, key=lambda m: abs(m - ideal), default=ideal))
+    boundaries.append(duration)
+
+    return [
+        Chunk(
+            index=i,
+            start=max(boundaries[i] - overlap_seconds, 0.0) if i else 0.0,
+            end=boundaries[i + 1],
+            boundary=boundaries[i],
+        )
+        for i in range(len(boundaries) - 1)
+    ]
+
+
+def split_audio(
+    audio_path: Path,
+    output_dir: Path,
+    duration: float,
+    target_seconds: float,
+    overlap_seconds: float = 15.0,
+) -> list[Chunk]:
+    """Cut an audio file into overlapping chunks at silence boundaries.
+
+    Args:
+        audio_path: Audio file to split.
+        output_dir: Directory for the chunk files.
+        duration: Audio duration in seconds.
+        target_seconds: Desired chunk length.
+        overlap_seconds: Audio repeated at the start of each chunk after the first.
+
+    Returns:
+        Chunks with their file paths set.
+    """
+    silences = detect_silences(audio_path)
+    chunks = plan_chunks(duration, silences, target_seconds, overlap_seconds)
+    for chunk in chunks:
+        chunk.path = (
+            output_dir / f"{audio_path.stem}.part{chunk.index:03d}{audio_path.suffix}"
+        )
+        cut_segment(audio_path, chunk.path, chunk.start, chunk.end)
+    return chunks
+
+
+def _normalize(text: str) -> str:
+    """Normalize a word for matching across chunks."""
+    return re.sub(r"\W+", "", text.lower())
+
+
+def _speaker_number(speaker_id: str) -> int:
+    """Get the numeric suffix of a 'speaker_N' label (-1 if there is none)."""
+    match = re.search(r"(\d+)$", speaker_id)
+    return int(match.group(1)) if match else -1
+
+
+def _map_speakers(
+    previous: list[dict[str, Any]],
+    current: list[dict[str, Any]],
+    boundary: float,
+    next_number: int,
+) -> tuple[dict[str, str], int]:
+    """Map a chunk's speaker labels onto the labels used so far.
+
+    Args:
+        previous: Already stitched words (global labels, absolute times) in the
+            overlap window.
+        current: All of the new chunk's words (local labels, absolute times).
+        boundary: End of the overlap window.
+        next_number: First unused global speaker number.
+
+    Returns:
+        Tuple of (local label → global label mapping, next unused number).
+    """
+    votes: Counter[tuple[str, str]] = Counter()
+    for word in current:
+        if (word.get("start") or 0) >= boundary:
+            break
+        # Untimed words can't be matched by position
+        if (
+            word.get("type") != "word"
+            or not word.get("speaker_id")
+            or word.get("start") is None
+        ):
+            continue
+        text = _normalize(word.get("text", ""))
+        for candidate in previous:
+            if (
+                candidate.get("type") == "word"
+                and candidate.get("speaker_id")
+                and candidate.get("start") is not None
+                and _normalize(candidate.get("text", "")) == text
+                and abs(candidate["start"] - word["start"]) <= _MATCH_TOLERANCE_SECONDS
+            ):
+                votes[(word["speaker_id"], candidate["speaker_id"])] += 1
+                break
+
+    mapping: dict[str, str] = {}
+    for (local, global_label), _ in votes.most_common():
+        if local not in mapping and global_label not in mapping.values():
+            mapping[local] = global_label
+
+    # Speakers not matched in the overlap are new to the transcript
+    for word in current:
+        local = word.get("speaker_id")
+        if local and local not in mapping:
+            mapping[local] = f"speaker_{next_number}"
+            next_number += 1
+
+    return mapping, next_number
+
+
+def stitch_transcripts(
+    chunks: list[Chunk], transcripts: list[dict[str, Any]]
+) -> dict[str, Any]:
+    """Merge chunk transcripts into one transcript of the original file.
+
+    Word timestamps are shifted to original-file time, words in each overlap
+    are taken from the earlier chunk, and speaker labels are made consistent.
+
+    Args:
+        chunks: Chunks in order, as returned by split_audio.
+        transcripts: ElevenLabs response dictionaries, one per chunk.
+
+    Returns:
+        A transcript dictionary in the same shape as a single API response.
+    """
+    words: list[dict[str, Any]] = []
+    next_number = 0
+
+    for chunk, transcript in zip(chunks, transcripts):
+        shifted = []
+        for word in transcript.get("words") or []:
+            word = dict(word)
+            for key in ("start", "end"):
+                if word.get(key) is not None:
+                    word[key] = word[key] + chunk.start
+            shifted.append(word)
+
+        if chunk.index == 0:
+            mapping = {}
+            for word in shifted:
+                if word.get("speaker_id"):
+                    mapping[word["speaker_id"]] = word["speaker_id"]
+                    next_number = max(
+                        next_number, _speaker_number(word["speaker_id"]) + 1
+                    )
+        else:
+            overlap_previous = [
+                w for w in words if (w.get("start") or 0) >= chunk.start
+            ]
+            mapping, next_number = _map_speakers(
+                overlap_previous, shifted, chunk.boundary, next_number
+            )
+            shifted = [w for w in shifted if (w.get("start") or 0) >= chunk.boundary]
+
+        for word in shifted:
+            if word.get("speaker_id"):
+                word["speaker_id"] = mapping.get(word["speaker_id"], word["speaker_id"])
+        words.extend(shifted)
+
+    first = transcripts[0] if transcripts else {}
+    return {
+        "language_code": first.get("language_code"),
+        "language_probability": min(
+            (t.get("language_probability") or 0 for t in transcripts), default=0
+        ),
+        "text": "".join(word.get("text", "") for word in words).strip(),
+        "words": words,
+        "chunks": [
+            {"start": chunk.start, "end": chunk.end, "boundary": chunk.boundary}
+            for chunk in chunks
+        ],
+    }
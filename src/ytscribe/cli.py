@@ -1,16 +1,40 @@
 """Command-line interface for ytscribe.
 
 Provides a Typer-based CLI for downloading YouTube audio and transcribing with ElevenLabs.
+
+yt-dlp and the ElevenLabs SDK are slow to import, so the modules that use them
+are imported inside the commands that need them; `--help`, `status` and
+`search` start without loading either.
 """
 
-from typing import Optional
+import sys
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
 
 import typer
 from typing_extensions import Annotated
 
-from ytscribe.config import get_config
-from ytscribe.downloader import AudioDownloader
-from ytscribe.transcriber import Transcriber
+from ytscribe.config import TRANSCRIPT_STORES, get_config
+from ytscribe.leases import DEFAULT_TTL as DEFAULT_LEASE_TTL
+from ytscribe.ledger import (
+    DOWNLOADED,
+    FAILED,
+    STATES,
+    TRANSCRIBED,
+    Ledger,
+    video_id_from_path,
+)
+from ytscribe.metrics import Metrics
+from ytscribe.profiling import PROFILE_MODES
+
+if TYPE_CHECKING:
+    from ytscribe.batch import SourceScheduler
+    from ytscribe.downloader import AudioDownloader
+    from ytscribe.schedule import Plan
+    from ytscribe.transcriber import Transcriber
 
 app = typer.Typer(
     name="ytscribe",
@@ -49,6 +73,183 @@ def fetch(
             help="Annotate who is speaking (speaker diarization)",
         ),
     ] = True,
+    no_cache: Annotated[
+        bool,
+        typer.Option(
+            "--no-cache",
+            help="Always call the API; don't read or write the local transcript cache",
+        ),
+    ] = False,
+    refresh: Annotated[
+        bool,
+        typer.Option(
+            "--refresh",
+            help="Call the API even when a cached transcript exists, and replace it",
+        ),
+    ] = False,
+    dedup: Annotated[
+        bool,
+        typer.Option(
+            "--dedup",
+            help="Fingerprint the audio of each download and reuse the cached transcript of a reupload, or of the video a clip was cut from, instead of calling the API",
+        ),
+    ] = False,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume",
+            help="Continue the last run for this URL from the job ledger: skip re-listing and already transcribed videos",
+        ),
+    ] = False,
+    pipeline: Annotated[
+        bool,
+        typer.Option(
+            "--pipeline",
+            help="Transcribe each file as soon as it is downloaded instead of after the whole playlist",
+        ),
+    ] = False,
+    download_workers: Annotated[
+        int,
+        typer.Option(
+            "--download-workers",
+            min=1,
+            help="Number of playlist entries to download (and post-process) concurrently",
+        ),
+    ] = 1,
+    ffmpeg_threads: Annotated[
+        Optional[int],
+        typer.Option(
+            "--ffmpeg-threads",
+            min=1,
+            help="Threads per FFmpeg conversion of a download (default: FFmpeg decides)",
+        ),
+    ] = None,
+    ffmpeg_jobs: Annotated[
+        Optional[int],
+        typer.Option(
+            "--ffmpeg-jobs",
+            min=1,
+            help="FFmpeg conversions allowed at once across download workers (default: one per worker)",
+        ),
+    ] = None,
+    transcribe_workers: Annotated[
+        int,
+        typer.Option(
+            "--transcribe-workers",
+            min=1,
+            help="Number of concurrent transcription requests",
+        ),
+    ] = 1,
+    chunk_minutes: Annotated[
+        Optional[float],
+        typer.Option(
+            "--chunk-minutes",
+            min=1,
+            help="Split files longer than this at silences and transcribe the chunks in parallel (files over the 3 GB / 10 h API limit are always split)",
+        ),
+    ] = None,
+    preprocess: Annotated[
+        bool,
+        typer.Option(
+            "--preprocess",
+            help="Before upload, downmix to mono, re-encode as low-bitrate Opus and shorten long silences (timestamps are mapped back to the original audio)",
+        ),
+    ] = False,
+    max_silence: Annotated[
+        float,
+        typer.Option(
+            "--max-silence",
+            min=0.1,
+            help="With --preprocess, shorten silences longer than this many seconds to this length",
+        ),
+    ] = 1.0,
+    transcript_store: Annotated[
+        Optional[str],
+        typer.Option(
+            "--transcript-store",
+            help="Raw transcript format: 'json' or 'columnar' (compact .words file; see `ytscribe export-json`). Defaults to TRANSCRIPT_STORE.",
+        ),
+    ] = None,
+    async_webhook: Annotated[
+        bool,
+        typer.Option(
+            "--async-webhook",
+            help="Submit files and return immediately; transcripts are written when ElevenLabs calls back (run `ytscribe receive`)",
+        ),
+    ] = False,
+    queue_size: Annotated[
+        int,
+        typer.Option(
+            "--queue-size",
+            min=1,
+            help="Downloaded files allowed to wait for transcription before downloads pause (with --pipeline)",
+        ),
+    ] = 4,
+    adaptive_concurrency: Annotated[
+        bool,
+        typer.Option(
+            "--adaptive-concurrency",
+            help="Treat --transcribe-workers as a ceiling: start with one request in flight, add more while requests succeed and halve on 429s",
+        ),
+    ] = False,
+    retries: Annotated[
+        int,
+        typer.Option(
+            "--retries",
+            min=0,
+            help="Retries per download and API request on transient errors and throttling (with backoff, honouring Retry-After)",
+        ),
+    ] = 4,
+    worker_id: Annotated[
+        Optional[str],
+        typer.Option(
+            "--worker-id",
+            help="Share the work with other workers fetching into the same data directory: each video is leased to one worker at a time",
+        ),
+    ] = None,
+    lease_ttl: Annotated[
+        float,
+        typer.Option(
+            "--lease-ttl",
+            min=1,
+            help="With --worker-id, seconds without a heartbeat before another worker takes over a crashed worker's videos",
+        ),
+    ] = DEFAULT_LEASE_TTL,
+    plan_only: Annotated[
+        bool,
+        typer.Option(
+            "--plan-only",
+            help="Download, then print the transcription plan (billed minutes, estimated time, files over the API limits) and stop",
+        ),
+    ] = False,
+    metrics_out: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--metrics-out",
+            help="Write per-stage timings and counters to this JSON file, plus a Prometheus textfile (.prom) next to it",
+        ),
+    ] = None,
+    profile: Annotated[
+        bool,
+        typer.Option(
+            "--profile",
+            help="Profile CPU and memory per stage and video; files go to data/profiles/<run>/ and a summary is printed at the end",
+        ),
+    ] = False,
+    profile_mode: Annotated[
+        str,
+        typer.Option(
+            "--profile-mode",
+            help="With --profile: 'sampling' (collapsed stacks for flame graphs, low overhead) or 'cprofile' (pstats files, exact call counts)",
+        ),
+    ] = "sampling",
+    profile_memory: Annotated[
+        bool,
+        typer.Option(
+            "--profile-memory/--no-profile-memory",
+            help="With --profile, also trace memory with tracemalloc (slows down allocations, and so the CPU profile)",
+        ),
+    ] = True,
 ) -> None:
     """Download YouTube audio and optionally transcribe with ElevenLabs.
 
@@ -60,22 +261,154 @@ def fetch(
         ytscribe fetch https://www.youtube.com/playlist?list=PLAYLIST_ID
         ytscribe fetch VIDEO_URL --skip-transcribe
         ytscribe fetch VIDEO_URL --language spa --no-diarize
+        ytscribe fetch VIDEO_URL --refresh
+        ytscribe fetch VIDEO_URL --dedup
+        ytscribe fetch PLAYLIST_URL --resume
+        ytscribe fetch PLAYLIST_URL --download-workers 4 --transcribe-workers 4
+        ytscribe fetch PLAYLIST_URL --download-workers 8 --ffmpeg-jobs 2
+        ytscribe fetch PLAYLIST_URL --pipeline --transcribe-workers 3
+        ytscribe fetch VIDEO_URL --chunk-minutes 30
+        ytscribe fetch PLAYLIST_URL --preprocess --max-silence 0.8
+        ytscribe fetch PLAYLIST_URL --async-webhook --transcribe-workers 8
+        ytscribe fetch PLAYLIST_URL --transcribe-workers 16 --adaptive-concurrency
+        ytscribe fetch PLAYLIST_URL --transcript-store columnar
+        ytscribe fetch PLAYLIST_URL --plan-only
+        ytscribe fetch PLAYLIST_URL --pipeline --worker-id node1-a
+        ytscribe fetch PLAYLIST_URL --metrics-out metrics/nightly.json
+        ytscribe fetch VIDEO_URL --profile --profile-mode cprofile
     """
+    from ytscribe.downloader import AudioDownloader
+    from ytscribe.fingerprint import FingerprintIndex
+    from ytscribe.leases import LeaseSet, claim_entries
+    from ytscribe.preprocess import PreprocessSettings
+    from ytscribe.profiling import Profiler
+    from ytscribe.retry import AdaptiveLimiter
+    from ytscribe.schedule import plan_batch
+    from ytscribe.transcriber import Transcriber
+
+    metrics = Metrics()
+    ledger: Optional[Ledger] = None
+    leases: Optional[LeaseSet] = None
+    fingerprints: Optional[FingerprintIndex] = None
+    preprocess_settings = (
+        PreprocessSettings(max_silence=max_silence) if preprocess else None
+    )
+    limiter = AdaptiveLimiter(transcribe_workers) if adaptive_concurrency else None
     try:
         # Load and validate configuration
         config = get_config()
+        if not skip_transcribe:
+            # Fail before downloading anything rather than after
+            config.require_api_key()
+        if transcript_store is not None:
+            if transcript_store not in TRANSCRIPT_STORES:
+                raise ValueError(
+                    f"--transcript-store must be one of: {', '.join(TRANSCRIPT_STORES)}"
+                )
+            config = replace(config, transcript_store=transcript_store)
+        if profile:
+            if profile_mode not in PROFILE_MODES:
+                raise ValueError(
+                    f"--profile-mode must be one of: {', '.join(PROFILE_MODES)}"
+                )
+            metrics.profiler = Profiler(
+                config.download_root.parent
+                / "profiles"
+                / time.strftime("%Y%m%d-%H%M%S"),
+                mode=profile_mode,
+                memory=profile_memory,
+            )
+            metrics.profiler.start()
 
         typer.echo("ytscribe v0.1.0")
         typer.echo(f"URL: {url}")
         typer.echo(f"Download root: {config.download_root}")
         typer.echo(f"Transcript root: {config.transcript_root}\n")
 
-        # Initialize downloader
-        downloader = AudioDownloader(config.download_root)
+        # Initialize downloader and job ledger
+        ledger = Ledger(config.ledger_path)
+        fingerprints = (
+            FingerprintIndex(config.fingerprint_index_path) if dedup else None
+        )
+        downloader = AudioDownloader(
+            config.download_root,
+            ledger,
+            metrics,
+            ffmpeg_threads=ffmpeg_threads,
+            ffmpeg_jobs=ffmpeg_jobs,
+            attempts=retries + 1,
+            fingerprints=fingerprints,
+        )
+
+        if resume and ledger.is_source_complete(url):
+            entries: Iterable[dict[str, Any]] = ledger.unfinished_entries(url)
+            typer.echo(
+                f"♻️  Resuming: {len(entries)} unfinished video(s) from the job ledger\n"
+            )
+        else:
+            entries = downloader.iter_entries(url)
+
+        if worker_id is not None:
+            leases = LeaseSet(
+                config.download_root
+                / ".leases"
+                / ("download" if skip_transcribe else "transcribe"),
+                worker_id,
+                ttl=lease_ttl,
+                outcome=_lease_outcome(ledger, skip_transcribe),
+                metrics=metrics,
+            )
+            leases.start()
+            typer.echo(f"🔒 Sharing the work as worker '{worker_id}'\n")
+            # Waiting on other workers' leases is safe only when this worker's
+            # own leases settle meanwhile, i.e. not while its downloads wait
+            # for the transcription stage
+            entries = claim_entries(
+                entries,
+                leases,
+                wait=skip_transcribe or (pipeline and not async_webhook),
+            )
+
+        # Without --resume every downloaded file is transcribed (the cache
+        # avoids paying twice); with it, finished videos are skipped
+        should_transcribe = _needs_transcription(ledger) if resume else None
+
+        # Webhook submissions return at once, so there is nothing to overlap;
+        # a plan must see every download before anything is transcribed
+        if pipeline and not skip_transcribe and not async_webhook and not plan_only:
+            _fetch_pipelined(
+                entries,
+                downloader,
+                Transcriber(
+                    config,
+                    ledger,
+                    chunk_minutes=chunk_minutes,
+                    metrics=metrics,
+                    preprocess=preprocess_settings,
+                    limiter=limiter,
+                    attempts=retries + 1,
+                    fingerprints=fingerprints,
+                    ffmpeg_slots=downloader.ffmpeg_slots,
+                ),
+                download_workers=download_workers,
+                transcribe_workers=transcribe_workers,
+                queue_size=queue_size,
+                transcribe_kwargs={
+                    "language": language,
+                    "tag_audio_events": tag_audio_events,
+                    "diarize": diarize,
+                    "use_cache": not no_cache,
+                    "refresh": refresh,
+                },
+                should_transcribe=should_transcribe,
+            )
+            return
 
         # Download audio
         try:
-            downloaded_files = downloader.download(url, skip_existing=True)
+            downloaded_files = downloader.download_entries(
+                entries, skip_existing=True, workers=download_workers
+            )
         except Exception as e:
             typer.secho(f"\n✗ Download failed: {e}", fg=typer.colors.RED, err=True)
             raise typer.Exit(1)
@@ -89,59 +422,1384 @@ def fetch(
                 fg=typer.colors.YELLOW,
             )
         else:
-            # Transcribe downloaded files
-            typer.echo("\n🎙️  Starting transcription...\n")
+            pending_files = downloaded_files
+            if should_transcribe is not None:
+                pending_files = [f for f in downloaded_files if should_transcribe(f)]
+                skipped = len(downloaded_files) - len(pending_files)
+                if skipped:
+                    typer.echo(f"\n⏭  {skipped} file(s) already transcribed (--resume)")
+            elif async_webhook:
+                # Submitting them again would pay twice for the same callback
+                pending_files = [
+                    f
+                    for f in downloaded_files
+                    if not ledger.has_webhook_request(video_id_from_path(f))
+                ]
+                skipped = len(downloaded_files) - len(pending_files)
+                if skipped:
+                    typer.echo(
+                        f"\n⏭  {skipped} file(s) already submitted, "
+                        "waiting for webhook callbacks"
+                    )
 
-            transcriber = Transcriber(config)
-            success_count = 0
-            error_count = 0
+            plan = plan_batch(pending_files, ledger, workers=transcribe_workers)
+            _echo_plan(plan, transcribe_workers)
+            for audio_file, reason in plan.rejected:
+                ledger.mark_failed(video_id_from_path(audio_file), "transcribe", reason)
+            if plan_only:
+                return
+            pending_files = plan.paths
 
-            for idx, audio_file in enumerate(downloaded_files, 1):
-                typer.echo(
-                    f"[{idx}/{len(downloaded_files)}] 🎙️  Transcribing: {audio_file.name}"
-                )
+            transcriber = Transcriber(
+                config,
+                ledger,
+                chunk_minutes=chunk_minutes,
+                metrics=metrics,
+                preprocess=preprocess_settings,
+                limiter=limiter,
+                attempts=retries + 1,
+                fingerprints=fingerprints,
+                ffmpeg_slots=downloader.ffmpeg_slots,
+            )
+            transcriber.durations.update(
+                (job.path, job.duration) for job in plan.jobs if job.duration
+            )
+            total = len(pending_files) + len(plan.rejected)
 
-                try:
-                    result = transcriber.transcribe(
-                        audio_path=audio_file,
-                        language=language,
-                        tag_audio_events=tag_audio_events,
-                        diarize=diarize,
-                    )
+            if async_webhook:
+                _submit_webhook(
+                    transcriber,
+                    pending_files,
+                    concurrency=transcribe_workers,
+                    language=language,
+                    tag_audio_events=tag_audio_events,
+                    diarize=diarize,
+                    use_cache=not no_cache,
+                    refresh=refresh,
+                )
+                return
 
-                    typer.secho("  ✓ API request successful", fg=typer.colors.GREEN)
-                    typer.echo(f"  ✓ Saved: {result['json_path']}")
-                    typer.echo(f"  ✓ Saved: {result['md_path']}")
-                    success_count += 1
+            # Transcribe downloaded files
+            typer.echo("\n🎙️  Starting transcription...\n")
 
-                except Exception as e:
-                    typer.secho(f"  ✗ Error: {e}", fg=typer.colors.RED, err=True)
-                    error_count += 1
-                    # Continue with remaining files
-                    continue
+            def on_start(idx: int, audio_file: Path) -> None:
+                typer.echo(f"[{idx}/{total}] 🎙️  Transcribing: {audio_file.name}")
 
-            # Final summary
-            typer.echo("")
-            if success_count > 0:
+            def on_error(audio_file: Path, error: Exception) -> None:
                 typer.secho(
-                    f"✓ Transcribed {success_count} of {len(downloaded_files)} file(s) successfully",
-                    fg=typer.colors.GREEN,
-                )
-            if error_count > 0:
-                typer.secho(
-                    f"✗ Failed to transcribe {error_count} file(s)",
+                    f"  ✗ Error ({audio_file.name}): {error}",
                     fg=typer.colors.RED,
                     err=True,
                 )
 
+            # Failed files are reported and skipped; the rest keep going
+            results = transcriber.transcribe_many(
+                pending_files,
+                concurrency=transcribe_workers,
+                language=language,
+                tag_audio_events=tag_audio_events,
+                diarize=diarize,
+                use_cache=not no_cache,
+                refresh=refresh,
+                on_start=on_start,
+                on_result=_echo_transcribed,
+                on_error=on_error,
+            )
+            error_count = sum(isinstance(r, Exception) for r in results)
+            success_count = len(results) - error_count
+            error_count += len(plan.rejected)
+
+            _echo_transcription_summary(success_count, error_count, total)
+
+    except typer.Exit:
+        raise
     except ValueError as e:
         typer.secho(f"Configuration error: {e}", fg=typer.colors.RED, err=True)
         raise typer.Exit(1)
     except Exception as e:
         typer.secho(f"Error: {e}", fg=typer.colors.RED, err=True)
         raise typer.Exit(1)
+    finally:
+        if leases is not None:
+            leases.close()
+        if fingerprints is not None:
+            fingerprints.close()
+        if ledger is not None:
+            ledger.close()
+        if metrics_out is not None:
+            _write_metrics(metrics, metrics_out)
+        summary = metrics.profiler.stop()
+        if summary:
+            typer.echo("\n📈 " + "\n".join(summary))
+
+
+def _lease_outcome(
+    ledger: Ledger, skip_transcribe: bool
+) -> Callable[[str, float], Optional[bool]]:
+    """Build the lease outcome check from this worker's ledger (see LeaseSet)."""
+    done_states = (DOWNLOADED, TRANSCRIBED) if skip_transcribe else (TRANSCRIBED,)
+
+    def outcome(video_id: str, claimed_at: float) -> Optional[bool]:
+        row = ledger.get(video_id)
+        # Ignore states left by earlier runs
+        if row is None or row["updated_at"] < claimed_at:
+            return None
+        if row["state"] in done_states:
+            return True
+        if row["state"] == FAILED:
+            return False
+        return None
+
+    return outcome
+
+
+def _write_metrics(metrics: Metrics, path: Path) -> None:
+    """Print the per-stage timing summary and write the metrics files."""
+    summary = metrics.stage_summary()
+    if summary:
+        typer.echo("\n⏱  Stage timings (total / mean / max):")
+        for stage, stats in sorted(summary.items(), key=lambda s: -s[1]["total"]):
+            typer.echo(
+                f"  {stage:<20} {stats['total']:8.1f}s / {stats['mean']:6.2f}s / "
+                f"{stats['max']:6.2f}s  ({stats['count']:.0f}×)"
+            )
+    try:
+        json_path, prom_path = metrics.write(path)
+    except OSError as e:
+        typer.secho(f"✗ Could not write metrics: {e}", fg=typer.colors.RED, err=True)
+        return
+    typer.echo(f"✓ Metrics: {json_path} and {prom_path}")
+
+
+def _echo_plan(plan: "Plan", workers: int) -> None:
+    """Print the pre-flight plan of a transcription batch."""
+    if not plan.jobs and not plan.rejected:
+        return
+    typer.echo(f"\n📋 Plan: {len(plan.jobs)} file(s), longest first")
+    typer.echo(f"  Billed audio: up to {plan.billed_seconds / 60:.1f} min")
+    basis = "from earlier runs" if plan.measured_speed else "default rate"
+    typer.echo(
+        f"  Estimated time: {_format_hms(plan.estimated_seconds)} with "
+        f"{workers} worker(s) ({basis})"
+    )
+    if plan.jobs:
+        longest = plan.jobs[0]
+        if longest.duration:
+            typer.echo(
+                f"  Longest: {longest.path.name} ({_format_hms(longest.duration)})"
+            )
+    if plan.split:
+        typer.echo(
+            f"  {plan.split} file(s) over the API limits will be split into chunks"
+        )
+    if plan.unknown:
+        typer.secho(
+            f"  ⚠️  {plan.unknown} file(s) of unknown length left out of the estimates",
+            fg=typer.colors.YELLOW,
+        )
+    for audio_file, reason in plan.rejected:
+        typer.secho(
+            f"  ✗ Skipped ({audio_file.name}): {reason}", fg=typer.colors.RED, err=True
+        )
+
+
+def _echo_transcribed(result: dict[str, Any]) -> None:
+    """Print the success lines for one transcription result."""
+    if result.get("cached"):
+        typer.secho("  ✓ Loaded from cache (no API call)", fg=typer.colors.GREEN)
+    else:
+        typer.secho("  ✓ API request successful", fg=typer.colors.GREEN)
+    typer.echo(f"  ✓ Saved: {result['json_path']}")
+    for path in result.get("export_paths", {"md": result["md_path"]}).values():
+        typer.echo(f"  ✓ Saved: {path}")
+
+
+def _echo_transcription_summary(
+    success_count: int, error_count: int, total: int
+) -> None:
+    """Print the final transcription summary."""
+    typer.echo("")
+    if success_count > 0:
+        typer.secho(
+            f"✓ Transcribed {success_count} of {total} file(s) successfully",
+            fg=typer.colors.GREEN,
+        )
+    if error_count > 0:
+        typer.secho(
+            f"✗ Failed to transcribe {error_count} file(s)",
+            fg=typer.colors.RED,
+            err=True,
+        )
+
+
+def _needs_transcription(ledger: Ledger) -> Callable[[Path], bool]:
+    """Build a filter that rejects audio files already transcribed or submitted."""
+
+    def needs_transcription(audio_path: Path) -> bool:
+        video_id = video_id_from_path(audio_path)
+        return not (
+            ledger.is_transcribed(video_id) or ledger.has_webhook_request(video_id)
+        )
+
+    return needs_transcription
+
+
+def _submit_webhook(
+    transcriber: "Transcriber",
+    audio_files: list[Path],
+    concurrency: int,
+    **transcribe_kwargs: Any,
+) -> None:
+    """Submit files in webhook mode and report what is now in flight."""
+    typer.echo("\n📨 Submitting transcriptions (webhook mode)...\n")
+    total = len(audio_files)
+
+    def on_submitted(submitted: dict[str, Any]) -> None:
+        name = submitted["audio_path"].name
+        if submitted["result"] is not None:
+            typer.echo(f"  ✓ Transcribed without webhook: {name}")
+        else:
+            typer.echo(f"  ✓ Submitted {name} (request {submitted['request_id']})")
+
+    def on_error(audio_file: Path, error: Exception) -> None:
+        typer.secho(
+            f"  ✗ Error ({audio_file.name}): {error}", fg=typer.colors.RED, err=True
+        )
+
+    results = transcriber.submit_many(
+        audio_files,
+        concurrency=concurrency,
+        on_submitted=on_submitted,
+        on_error=on_error,
+        **transcribe_kwargs,
+    )
+    error_count = sum(isinstance(r, Exception) for r in results)
+    pending_count = sum(
+        not isinstance(r, Exception) and r["request_id"] is not None for r in results
+    )
+
+    typer.echo("")
+    typer.secho(
+        f"✓ Submitted {total - error_count} of {total} file(s); "
+        f"{pending_count} waiting for webhook callbacks",
+        fg=typer.colors.GREEN,
+    )
+    if error_count:
+        typer.secho(
+            f"✗ Failed to submit {error_count} file(s)", fg=typer.colors.RED, err=True
+        )
+    if pending_count:
+        typer.echo("Run `ytscribe receive` to write transcripts as callbacks arrive.")
+
+
+def _fetch_pipelined(
+    entries: Iterable[dict[str, Any]],
+    downloader: "AudioDownloader",
+    transcriber: "Transcriber",
+    download_workers: int,
+    transcribe_workers: int,
+    queue_size: int,
+    transcribe_kwargs: dict[str, Any],
+    should_transcribe: Optional[Callable[[Path], bool]] = None,
+) -> None:
+    """Run download and transcription as overlapping pipeline stages."""
+    from ytscribe.pipeline import Pipeline
+
+    typer.echo(
+        f"🔀 Pipelined mode: {download_workers} download worker(s), "
+        f"{transcribe_workers} transcription worker(s), "
+        f"queue size {queue_size}\n"
+    )
+
+    def on_start(seq: int, path: Path) -> None:
+        typer.echo(f"[{seq}] 🎙️  Transcribing: {path.name}")
+
+    def on_failed(path: Path, error: Exception) -> None:
+        typer.secho(f"  ✗ Error ({path.name}): {error}", fg=typer.colors.RED, err=True)
+
+    runner = Pipeline(
+        downloader,
+        transcriber,
+        download_workers=download_workers,
+        transcribe_workers=transcribe_workers,
+        queue_size=queue_size,
+        transcribe_kwargs=transcribe_kwargs,
+        on_transcribe_start=on_start,
+        on_transcribed=_echo_transcribed,
+        on_failed=on_failed,
+        should_transcribe=should_transcribe,
+    )
+    try:
+        result = runner.run_entries(entries)
+    except Exception as e:
+        typer.secho(f"\n✗ Download failed: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+
+    typer.echo(f"\n✓ Downloaded {len(result.downloaded)} file(s)")
+    _echo_transcription_summary(
+        len(result.transcribed),
+        len(result.failed),
+        len(result.transcribed) + len(result.failed),
+    )
+
+
+# Units accepted by --watch
+_INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def _parse_interval(text: str) -> float:
+    """Parse an interval such as '90', '30s', '15m' or '1h' into seconds."""
+    value = text.strip().lower()
+    unit = _INTERVAL_UNITS.get(value[-1:])
+    try:
+        seconds = float(value[:-1] if unit else value) * (unit or 1)
+    except ValueError:
+        raise ValueError(
+            f"Invalid interval '{text}' (use e.g. 90, 30s, 15m or 1h)"
+        ) from None
+    if seconds <= 0:
+        raise ValueError("The --watch interval must be positive")
+    return seconds
+
+
+def _read_sources(path: Path) -> list[str]:
+    """Read URLs from a file, one per line, skipping blank lines and # comments."""
+    lines = (line.strip() for line in path.read_text(encoding="utf-8").splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+@app.command()
+def sync(
+    urls: Annotated[
+        Optional[list[str]],
+        typer.Argument(help="Channel or playlist URLs to sync"),
+    ] = None,
+    sources_file: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--sources",
+            help="File with more source URLs, one per line (# starts a comment)",
+        ),
+    ] = None,
+    watch: Annotated[
+        Optional[str],
+        typer.Option(
+            "--watch",
+            metavar="INTERVAL",
+            help="Keep running and sync again every INTERVAL (e.g. 3600, 30m, 1h)",
+        ),
+    ] = None,
+    initial_limit: Annotated[
+        Optional[int],
+        typer.Option(
+            "--initial-limit",
+            min=1,
+            help="On a source's first sync, only fetch its newest N videos (default: all)",
+        ),
+    ] = None,
+    retry_unfinished: Annotated[
+        bool,
+        typer.Option(
+            "--retry-unfinished/--no-retry-unfinished",
+            help="Also fetch videos of these sources that earlier runs listed but did not finish (e.g. failed ones)",
+        ),
+    ] = True,
+    list_workers: Annotated[
+        int,
+        typer.Option(
+            "--list-workers", min=1, help="Number of sources listed concurrently"
+        ),
+    ] = 8,
+    skip_transcribe: Annotated[
+        bool,
+        typer.Option(
+            "--skip-transcribe", help="Download audio only, skip transcription"
+        ),
+    ] = False,
+    language: Annotated[
+        Optional[str],
+        typer.Option(
+            "--language",
+            help="Language code for transcription (e.g., 'eng', 'spa'). Auto-detect if not specified.",
+        ),
+    ] = None,
+    tag_audio_events: Annotated[
+        bool,
+        typer.Option(
+            "--tag-audio-events/--no-tag-audio-events",
+            help="Tag audio events like laughter, applause",
+        ),
+    ] = True,
+    diarize: Annotated[
+        bool,
+        typer.Option(
+            "--diarize/--no-diarize",
+            help="Annotate who is speaking (speaker diarization)",
+        ),
+    ] = True,
+    download_workers: Annotated[
+        int,
+        typer.Option(
+            "--download-workers",
+            min=1,
+            help="Number of new videos to download (and post-process) concurrently",
+        ),
+    ] = 1,
+    dedup: Annotated[
+        bool,
+        typer.Option(
+            "--dedup",
+            help="Fingerprint the audio of each download and reuse the cached transcript of a reupload, or of the video a clip was cut from, instead of calling the API",
+        ),
+    ] = False,
+    transcribe_workers: Annotated[
+        int,
+        typer.Option(
+            "--transcribe-workers",
+            min=1,
+            help="Number of concurrent transcription requests",
+        ),
+    ] = 1,
+    queue_size: Annotated[
+        int,
+        typer.Option(
+            "--queue-size",
+            min=1,
+            help="Downloaded files allowed to wait for transcription before downloads pause",
+        ),
+    ] = 4,
+    metrics_out: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--metrics-out",
+            help="Write per-stage timings and counters to this JSON file (and a .prom file) after every sync",
+        ),
+    ] = None,
+) -> None:
+    """Fetch only the videos channels and playlists gained since the last sync.
+
+    Each source's cursor in the job ledger remembers the newest videos seen,
+    so a channel is listed only until the first known video (usually one page)
+    and only new videos are downloaded and transcribed, in pipelined mode.
+    With --watch the process stays up and syncs again every INTERVAL, keeping
+    its API client and ledger connection warm.
+
+    Examples:
+        ytscribe sync https://www.youtube.com/@channel/videos
+        ytscribe sync --sources channels.txt --list-workers 16
+        ytscribe sync --sources channels.txt --watch 1h --transcribe-workers 4
+        ytscribe sync CHANNEL_URL --initial-limit 10 --no-retry-unfinished
+        ytscribe sync --sources channels.txt --dedup
+    """
+    from ytscribe.downloader import AudioDownloader
+    from ytscribe.fingerprint import FingerprintIndex
+    from ytscribe.sync import SourceUpdate, sync_sources
+    from ytscribe.transcriber import Transcriber
+
+    try:
+        config = get_config()
+        if not skip_transcribe:
+            config.require_api_key()
+        interval = _parse_interval(watch) if watch is not None else None
+        sources = list(urls or [])
+        if sources_file is not None:
+            sources += _read_sources(sources_file)
+        sources = list(dict.fromkeys(sources))
+        if not sources:
+            raise ValueError("Give at least one source URL or --sources FILE")
+    except (ValueError, OSError) as e:
+        typer.secho(f"Configuration error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+
+    # Created once and reused by every pass of --watch
+    metrics = Metrics()
+    ledger = Ledger(config.ledger_path)
+    fingerprints = FingerprintIndex(config.fingerprint_index_path) if dedup else None
+    downloader = AudioDownloader(
+        config.download_root, ledger, metrics, fingerprints=fingerprints
+    )
+    transcriber = None
+    if not skip_transcribe:
+        transcriber = Transcriber(
+            config,
+            ledger,
+            metrics=metrics,
+            fingerprints=fingerprints,
+            ffmpeg_slots=downloader.ffmpeg_slots,
+        )
+    transcribe_kwargs = {
+        "language": language,
+        "tag_audio_events": tag_audio_events,
+        "diarize": diarize,
+    }
+
+    def on_update(update: SourceUpdate) -> None:
+        if update.error is not None:
+            typer.secho(
+                f"  ✗ {update.source_url}: {update.error}",
+                fg=typer.colors.RED,
+                err=True,
+            )
+        elif update.entries:
+            details = f"{len(update.entries) - update.retried} new"
+            if update.retried:
+                details += f", {update.retried} unfinished"
+            if update.first_sync:
+                details += ", first sync"
+            typer.echo(f"  ✓ {update.source_url}: {details}")
+
+    def run_pass() -> None:
+        typer.echo(f"🔎 Listing {len(sources)} source(s)...")
+        started = time.monotonic()
+        updates = sync_sources(
+            downloader,
+            ledger,
+            sources,
+            workers=list_workers,
+            initial_limit=initial_limit,
+            retry_unfinished=retry_unfinished,
+            done_states=(DOWNLOADED, TRANSCRIBED)
+            if skip_transcribe
+            else (TRANSCRIBED,),
+            on_update=on_update,
+        )
+        # A video listed by two sources is fetched once
+        entries = list(
+            {entry["id"]: entry for u in updates for entry in u.entries}.values()
+        )
+        failed = sum(u.error is not None for u in updates)
+        typer.echo(
+            f"✓ Listed {len(updates) - failed} source(s) in "
+            f"{time.monotonic() - started:.1f}s: {len(entries)} video(s) to fetch"
+        )
+        if failed:
+            typer.secho(
+                f"✗ Failed to list {failed} source(s)", fg=typer.colors.RED, err=True
+            )
+        if not entries:
+            return
+        typer.echo("")
+        if transcriber is None:
+            downloaded = downloader.download_entries(
+                entries, skip_existing=True, workers=download_workers
+            )
+            typer.echo(f"\n✓ Downloaded {len(downloaded)} file(s)")
+            return
+        _fetch_pipelined(
+            entries,
+            downloader,
+            transcriber,
+            download_workers=download_workers,
+            transcribe_workers=transcribe_workers,
+            queue_size=queue_size,
+            transcribe_kwargs=transcribe_kwargs,
+            should_transcribe=_needs_transcription(ledger),
+        )
+
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                run_pass()
+            except typer.Exit:
+                if interval is None:
+                    raise
+            except Exception as e:
+                typer.secho(f"Error: {e}", fg=typer.colors.RED, err=True)
+                if interval is None:
+                    raise typer.Exit(1)
+            finally:
+                if metrics_out is not None:
+                    _write_metrics(metrics, metrics_out)
+            if interval is None:
+                return
+            wait = max(interval - (time.monotonic() - started), 0.0)
+            typer.echo(f"\n💤 Next sync in {wait:.0f}s (Ctrl+C to stop)\n")
+            time.sleep(wait)
+    except KeyboardInterrupt:
+        typer.echo("\nStopped.")
+    finally:
+        ledger.close()
+        if fingerprints is not None:
+            fingerprints.close()
+
+
+@app.command()
+def batch(
+    sources_file: Annotated[
+        str,
+        typer.Argument(
+            help="File with one source per line, 'URL [WEIGHT]' (# starts a comment), or - for stdin"
+        ),
+    ],
+    schedule: Annotated[
+        str,
+        typer.Option(
+            "--schedule",
+            help="'round-robin' (one video per source in turn) or 'weighted' (WEIGHT videos per turn)",
+        ),
+    ] = "round-robin",
+    active_sources: Annotated[
+        int,
+        typer.Option(
+            "--active-sources",
+            min=1,
+            help="Sources listed and interleaved at the same time",
+        ),
+    ] = 16,
+    skip_transcribe: Annotated[
+        bool,
+        typer.Option(
+            "--skip-transcribe", help="Download audio only, skip transcription"
+        ),
+    ] = False,
+    language: Annotated[
+        Optional[str],
+        typer.Option(
+            "--language",
+            help="Language code for transcription (e.g., 'eng', 'spa'). Auto-detect if not specified.",
+        ),
+    ] = None,
+    tag_audio_events: Annotated[
+        bool,
+        typer.Option(
+            "--tag-audio-events/--no-tag-audio-events",
+            help="Tag audio events like laughter, applause",
+        ),
+    ] = True,
+    diarize: Annotated[
+        bool,
+        typer.Option(
+            "--diarize/--no-diarize",
+            help="Annotate who is speaking (speaker diarization)",
+        ),
+    ] = True,
+    no_cache: Annotated[
+        bool,
+        typer.Option(
+            "--no-cache",
+            help="Always call the API; don't read or write the local transcript cache",
+        ),
+    ] = False,
+    refresh: Annotated[
+        bool,
+        typer.Option(
+            "--refresh",
+            help="Call the API even when a cached transcript exists, and replace it",
+        ),
+    ] = False,
+    dedup: Annotated[
+        bool,
+        typer.Option(
+            "--dedup",
+            help="Fingerprint the audio of each download and reuse the cached transcript of a reupload, or of the video a clip was cut from, instead of calling the API",
+        ),
+    ] = False,
+    download_workers: Annotated[
+        int,
+        typer.Option(
+            "--download-workers",
+            min=1,
+            help="Downloads (and post-processing) running at once across all sources",
+        ),
+    ] = 1,
+    transcribe_workers: Annotated[
+        int,
+        typer.Option(
+            "--transcribe-workers",
+            min=1,
+            help="Transcription requests in flight at once across all sources",
+        ),
+    ] = 1,
+    chunk_minutes: Annotated[
+        Optional[float],
+        typer.Option(
+            "--chunk-minutes",
+            min=1,
+            help="Split files longer than this at silences and transcribe the chunks in parallel (files over the 3 GB / 10 h API limit are always split)",
+        ),
+    ] = None,
+    queue_size: Annotated[
+        int,
+        typer.Option(
+            "--queue-size",
+            min=1,
+            help="Downloaded files allowed to wait for transcription before downloads pause",
+        ),
+    ] = 4,
+    adaptive_concurrency: Annotated[
+        bool,
+        typer.Option(
+            "--adaptive-concurrency",
+            help="Treat --transcribe-workers as a ceiling: start with one request in flight, add more while requests succeed and halve on 429s",
+        ),
+    ] = False,
+    retries: Annotated[
+        int,
+        typer.Option(
+            "--retries",
+            min=0,
+            help="Retries per download and API request on transient errors and throttling (with backoff, honouring Retry-After)",
+        ),
+    ] = 4,
+    metrics_out: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--metrics-out",
+            help="Write per-stage timings and counters to this JSON file, plus a Prometheus textfile (.prom) next to it",
+        ),
+    ] = None,
+) -> None:
+    """Download and transcribe the videos of many sources in one run.
+
+    All sources are listed lazily and interleaved, each video is fetched once
+    even if several sources list it, and videos the job ledger already has
+    transcribed are skipped. Download and transcription run as one pipeline
+    under global worker limits, and the run ends with a summary per source.
+
+    Examples:
+        ytscribe batch urls.txt --download-workers 4 --transcribe-workers 4
+        ytscribe batch urls.txt --schedule weighted
+        ytscribe batch urls.txt --dedup --chunk-minutes 30
+        cat urls.txt | ytscribe batch - --skip-transcribe
+    """
+    from ytscribe.batch import SourceScheduler, parse_sources
+    from ytscribe.downloader import AudioDownloader
+    from ytscribe.fingerprint import FingerprintIndex
+    from ytscribe.retry import AdaptiveLimiter
+    from ytscribe.transcriber import Transcriber
+
+    metrics = Metrics()
+    ledger: Optional[Ledger] = None
+    fingerprints: Optional[FingerprintIndex] = None
+    try:
+        config = get_config()
+        if not skip_transcribe:
+            config.require_api_key()
+        if sources_file == "-":
+            sources = parse_sources(sys.stdin)
+        else:
+            with open(sources_file, encoding="utf-8") as f:
+                sources = parse_sources(f)
+        if not sources:
+            raise ValueError(f"No source URLs in {sources_file}")
+        ledger = Ledger(config.ledger_path)
+        fingerprints = (
+            FingerprintIndex(config.fingerprint_index_path) if dedup else None
+        )
+        downloader = AudioDownloader(
+            config.download_root,
+            ledger,
+            metrics,
+            attempts=retries + 1,
+            fingerprints=fingerprints,
+        )
+        scheduler = SourceScheduler(
+            downloader, sources, schedule=schedule, max_active=active_sources
+        )
+    except (ValueError, OSError) as e:
+        if ledger is not None:
+            ledger.close()
+        if fingerprints is not None:
+            fingerprints.close()
+        typer.secho(f"Configuration error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+
+    typer.echo(
+        f"📚 Batch of {len(sources)} source(s), {schedule} scheduling, "
+        f"{active_sources} listed at a time\n"
+    )
+    started = time.monotonic()
+    try:
+        if skip_transcribe:
+            downloaded = downloader.download_entries(
+                scheduler, skip_existing=True, workers=download_workers
+            )
+            typer.echo(f"\n✓ Downloaded {len(downloaded)} file(s)")
+        else:
+            _fetch_pipelined(
+                scheduler,
+                downloader,
+                Transcriber(
+                    config,
+                    ledger,
+                    chunk_minutes=chunk_minutes,
+                    metrics=metrics,
+                    limiter=(
+                        AdaptiveLimiter(transcribe_workers)
+                        if adaptive_concurrency
+                        else None
+                    ),
+                    attempts=retries + 1,
+                    fingerprints=fingerprints,
+                    ffmpeg_slots=downloader.ffmpeg_slots,
+                ),
+                download_workers=download_workers,
+                transcribe_workers=transcribe_workers,
+                queue_size=queue_size,
+                transcribe_kwargs={
+                    "language": language,
+                    "tag_audio_events": tag_audio_events,
+                    "diarize": diarize,
+                    "use_cache": not no_cache,
+                    "refresh": refresh,
+                },
+                should_transcribe=_needs_transcription(ledger),
+            )
+        _echo_batch_summary(
+            scheduler, ledger, skip_transcribe, time.monotonic() - started
+        )
+    except typer.Exit:
+        raise
+    except Exception as e:
+        typer.secho(f"Error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+    finally:
+        ledger.close()
+        if fingerprints is not None:
+            fingerprints.close()
+        if metrics_out is not None:
+            _write_metrics(metrics, metrics_out)
+
+
+def _echo_batch_summary(
+    scheduler: "SourceScheduler", ledger: Ledger, skip_transcribe: bool, seconds: float
+) -> None:
+    """Print one line per batch source with the final ledger state of its videos."""
+    done_states = {DOWNLOADED, TRANSCRIBED} if skip_transcribe else {TRANSCRIBED}
+    done_label = "downloaded" if skip_transcribe else "transcribed"
+    typer.echo(f"\n📊 Batch summary ({_format_hms(seconds)}):")
+    typer.echo(
+        f"  {'source':<50} {'videos':>7} {'dupes':>6} {done_label:>12} {'failed':>7}"
+    )
+    totals = [0, 0, 0, 0]
+    listing_errors = 0
+    for url, stats in scheduler.stats.items():
+        states = [
+            (ledger.get(video_id) or {}).get("state") for video_id in stats.video_ids
+        ]
+        row = [
+            stats.scheduled,
+            stats.duplicates,
+            sum(state in done_states for state in states),
+            states.count(FAILED),
+        ]
+        totals = [total + value for total, value in zip(totals, row)]
+        label = url if len(url) <= 50 else url[:49] + "…"
+        line = f"  {label:<50} {row[0]:>7} {row[1]:>6} {row[2]:>12} {row[3]:>7}"
+        if stats.error is not None:
+            listing_errors += 1
+            typer.secho(line + "  (listing failed)", fg=typer.colors.RED)
+        else:
+            typer.echo(line)
+    typer.secho(
+        f"  {'total':<50} {totals[0]:>7} {totals[1]:>6} {totals[2]:>12} {totals[3]:>7}",
+        bold=True,
+    )
+    if listing_errors:
+        typer.secho(
+            f"✗ Listing failed for {listing_errors} source(s)",
+            fg=typer.colors.RED,
+            err=True,
+        )
+
+
+@app.command()
+def status(
+    source: Annotated[
+        Optional[str],
+        typer.Option("--source", help="Only show videos listed from this URL"),
+    ] = None,
+    state: Annotated[
+        Optional[str],
+        typer.Option(
+            "--state",
+            help=f"Only list videos in this state ({', '.join(STATES)})",
+        ),
+    ] = None,
+    limit: Annotated[
+        int, typer.Option("--limit", min=1, help="Maximum number of videos to list")
+    ] = 20,
+) -> None:
+    """Show job ledger progress: videos per state and recent failures.
+
+    Examples:
+        ytscribe status
+        ytscribe status --source PLAYLIST_URL
+        ytscribe status --state transcribing
+    """
+    try:
+        config = get_config()
+    except ValueError as e:
+        typer.secho(f"Configuration error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+
+    if state is not None and state not in STATES:
+        typer.secho(
+            f"Unknown state '{state}'. Choose from: {', '.join(STATES)}",
+            fg=typer.colors.RED,
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    if not config.ledger_path.exists():
+        typer.echo(f"No job ledger yet at {config.ledger_path}")
+        return
+
+    ledger = Ledger(config.ledger_path)
+    try:
+        counts = ledger.counts(source)
+        # Default to listing failures, the rows most worth looking at
+        list_state = state or "failed"
+        rows = ledger.rows(state=list_state, source_url=source, limit=limit)
+    finally:
+        ledger.close()
+
+    typer.echo(f"Ledger: {config.ledger_path}\n")
+    for name in STATES:
+        typer.echo(f"  {name:<13} {counts[name]:>6}")
+
+    if rows:
+        typer.echo(f"\n{list_state.capitalize()} videos (most recent first):")
+    for row in rows:
+        line = f"  {row['video_id']}  {row['title'] or ''}".rstrip()
+        if row["error"]:
+            line += f"\n    ✗ {row['failed_stage']}: {row['error']}"
+        typer.echo(line)
+
+
+@app.command()
+def receive(
+    host: Annotated[
+        str, typer.Option("--host", help="Interface to listen on")
+    ] = "127.0.0.1",
+    port: Annotated[int, typer.Option("--port", help="Port to listen on")] = 8787,
+    path: Annotated[
+        str, typer.Option("--path", help="URL path ElevenLabs posts callbacks to")
+    ] = "/webhook/speech-to-text",
+    exit_when_done: Annotated[
+        bool,
+        typer.Option(
+            "--exit-when-done",
+            help="Stop once no submitted transcriptions are pending",
+        ),
+    ] = False,
+) -> None:
+    """Receive webhook callbacks and write transcripts for submitted files.
+
+    Verifies each callback with ELEVENLABS_WEBHOOK_SECRET. Expose the port
+    over HTTPS (e.g. a reverse proxy or tunnel) and register that URL as an
+    ElevenLabs webhook for speech-to-text events.
+
+    Examples:
+        ytscribe receive
+        ytscribe receive --host 0.0.0.0 --port 9000 --exit-when-done
+    """
+    from ytscribe.transcriber import Transcriber
+    from ytscribe.webhook import WebhookReceiver
+
+    try:
+        config = get_config()
+        ledger = Ledger(config.ledger_path)
+        receiver = WebhookReceiver(
+            Transcriber(config, ledger),
+            config.webhook_secret or "",
+            host=host,
+            port=port,
+            path=path,
+            on_result=_echo_transcribed,
+            on_error=lambda audio_file, error: typer.secho(
+                f"  ✗ Error ({audio_file.name}): {error}",
+                fg=typer.colors.RED,
+                err=True,
+            ),
+        )
+    except (ValueError, OSError) as e:
+        typer.secho(f"Configuration error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+
+    receiver.start()
+    typer.echo(f"📬 Listening for webhook callbacks on {receiver.url}")
+    typer.echo(f"   {receiver.pending()} transcription(s) pending\n")
+    try:
+        if exit_when_done:
+            receiver.wait_until_idle()
+            typer.secho(
+                "\n✓ All submitted transcriptions received", fg=typer.colors.GREEN
+            )
+        else:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        typer.echo(f"\n⏹  Stopped; {receiver.pending()} transcription(s) still pending")
+    finally:
+        receiver.stop()
+        ledger.close()
+
+
+@app.command()
+def serve(
+    host: Annotated[
+        str, typer.Option("--host", help="Interface to listen on")
+    ] = "127.0.0.1",
+    port: Annotated[int, typer.Option("--port", help="Port to listen on")] = 8788,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers",
+            min=1,
+            help="Videos downloaded and transcribed at once, across all jobs",
+        ),
+    ] = 2,
+    skip_transcribe: Annotated[
+        bool,
+        typer.Option(
+            "--skip-transcribe", help="Only download audio; no API key needed"
+        ),
+    ] = False,
+    no_cache: Annotated[
+        bool,
+        typer.Option(
+            "--no-cache",
+            help="Always call the API; don't read or write the local transcript cache",
+        ),
+    ] = False,
+    chunk_minutes: Annotated[
+        Optional[float],
+        typer.Option(
+            "--chunk-minutes",
+            min=1,
+            help="Split files longer than this at silences and transcribe the chunks in parallel",
+        ),
+    ] = None,
+    adaptive_concurrency: Annotated[
+        bool,
+        typer.Option(
+            "--adaptive-concurrency",
+            help="Treat --workers as a ceiling for API requests in flight and adapt to 429s",
+        ),
+    ] = False,
+    retries: Annotated[
+        int,
+        typer.Option(
+            "--retries",
+            min=0,
+            help="Retries per download and API request on transient errors and throttling",
+        ),
+    ] = 4,
+    metrics_out: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--metrics-out",
+            help="On shutdown, write per-stage timings and counters to this JSON file (plus .prom)",
+        ),
+    ] = None,
+    job_retention: Annotated[
+        float,
+        typer.Option(
+            "--job-retention",
+            min=0,
+            help="Hours a finished job stays in GET /jobs before it is forgotten",
+        ),
+    ] = 24.0,
+) -> None:
+    """Run a long-lived job server with a local HTTP API.
+
+    yt-dlp, the ElevenLabs SDK and the API client are loaded once and kept
+    warm, so each submitted URL costs only its own download and transcription.
+    Submit with `POST /jobs` ({"url": ...}), poll `GET /jobs/<id>` for status
+    and transcript paths. Jobs are kept in memory for --job-retention hours
+    after they finish; videos are tracked in the job ledger as with fetch.
+
+    Examples:
+        ytscribe serve
+        ytscribe serve --port 9000 --workers 4 --adaptive-concurrency
+        curl -s localhost:8788/jobs -d '{"url": "https://youtu.be/VIDEO_ID"}'
+    """
+    import signal
+
+    from ytscribe.downloader import AudioDownloader
+    from ytscribe.retry import AdaptiveLimiter
+    from ytscribe.server import JobServer
+    from ytscribe.transcriber import Transcriber
+
+    metrics = Metrics()
+    try:
+        config = get_config()
+        ledger = Ledger(config.ledger_path)
+        downloader = AudioDownloader(
+            config.download_root, ledger, metrics, attempts=retries + 1
+        )
+        transcriber = None
+        if not skip_transcribe:
+            transcriber = Transcriber(
+                config,
+                ledger,
+                chunk_minutes=chunk_minutes,
+                metrics=metrics,
+                limiter=AdaptiveLimiter(workers) if adaptive_concurrency else None,
+                attempts=retries + 1,
+            )
+            # Import the SDK and build the client now rather than on the first job
+            transcriber.client
+        server = JobServer(
+            downloader,
+            transcriber,
+            host=host,
+            port=port,
+            workers=workers,
+            use_cache=not no_cache,
+            job_retention=job_retention * 3600,
+        )
+    except (ValueError, OSError) as e:
+        typer.secho(f"Configuration error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+
+    server.start()
+    typer.echo(f"🛰  Serving the job API on {server.url} ({workers} worker(s))")
+    typer.echo(f'   Submit: curl -s {server.url}/jobs -d \'{{"url": "URL"}}\'\n')
+    stopping = threading.Event()
+    # Service managers stop daemons with SIGTERM
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    try:
+        stopping.wait()
+    except KeyboardInterrupt:
+        pass
+    typer.echo("\n⏹  Stopping; finishing the videos in progress...")
+    server.stop()
+    ledger.close()
+    if metrics_out is not None:
+        _write_metrics(metrics, metrics_out)
+
+
+@app.command()
+def index(
+    rebuild: Annotated[
+        bool,
+        typer.Option("--rebuild", help="Re-index every transcript from scratch"),
+    ] = False,
+) -> None:
+    """Build or update the full-text search index over saved transcripts.
+
+    Only transcripts whose files changed since the last build are re-read.
+
+    Examples:
+        ytscribe index
+        ytscribe index --rebuild
+    """
+    from ytscribe.search import SearchIndex
+
+    try:
+        config = get_config()
+    except ValueError as e:
+        typer.secho(f"Configuration error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+
+    def on_progress(action: str, path: Path) -> None:
+        if action.startswith("failed"):
+            typer.secho(f"  ✗ {path}: {action}", fg=typer.colors.RED, err=True)
+        else:
+            typer.echo(f"  {action:<8} {path}")
+
+    search_index = SearchIndex(config.search_index_path)
+    started = time.monotonic()
+    try:
+        stats = search_index.update(
+            config.transcript_root, rebuild=rebuild, on_progress=on_progress
+        )
+        total = search_index.document_count()
+    finally:
+        search_index.close()
+
+    typer.secho(
+        f"\n✓ Indexed {stats.added} new, {stats.updated} changed, "
+        f"removed {stats.removed}, {stats.unchanged} unchanged "
+        f"({total} transcript(s), {time.monotonic() - started:.1f}s)",
+        fg=typer.colors.GREEN,
+    )
+    if stats.failed:
+        typer.secho(
+            f"✗ Failed to index {stats.failed} file(s)", fg=typer.colors.RED, err=True
+        )
+
+
+@app.command()
+def search(
+    query: Annotated[str, typer.Argument(help="Word or phrase to find")],
+    limit: Annotated[
+        int, typer.Option("--limit", min=1, help="Maximum number of hits")
+    ] = 20,
+    speaker: Annotated[
+        Optional[str],
+        typer.Option("--speaker", help="Only show hits from this speaker ID"),
+    ] = None,
+) -> None:
+    """Search the transcript index for a word or phrase.
+
+    Multi-word queries match only where the words appear consecutively.
+    Run `ytscribe index` first (and after new transcripts are added).
+
+    Examples:
+        ytscribe search "machine learning"
+        ytscribe search budget --speaker speaker_1 --limit 50
+    """
+    from ytscribe.search import SearchIndex
+
+    try:
+        config = get_config()
+    except ValueError as e:
+        typer.secho(f"Configuration error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+
+    if not config.search_index_path.exists():
+        typer.echo("No search index yet. Run `ytscribe index` first.")
+        raise typer.Exit(1)
+
+    search_index = SearchIndex(config.search_index_path)
+    started = time.monotonic()
+    try:
+        hits = search_index.search(query, limit=limit, speaker=speaker)
+    finally:
+        search_index.close()
+    elapsed_ms = (time.monotonic() - started) * 1000
+
+    for hit in hits:
+        timestamp = _format_hms(hit.start) if hit.start is not None else "--:--:--"
+        typer.secho(
+            f"{hit.video_id}  {timestamp}  {hit.speaker or ''}".rstrip(), bold=True
+        )
+        typer.echo(f"  {hit.snippet}")
+        typer.echo(f"  {hit.url}")
+    typer.echo(f"\n{len(hits)} hit(s) in {elapsed_ms:.0f} ms")
+
+
+def _format_hms(seconds: float) -> str:
+    """Format seconds as HH:MM:SS."""
+    total = int(seconds)
+    return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+
+
+@app.command()
+def export(
+    paths: Annotated[
+        Optional[list[Path]],
+        typer.Argument(
+            help="Transcript files (.json, .json.gz/.zst or .words) or directories. Defaults to TRANSCRIPT_ROOT."
+        ),
+    ] = None,
+    formats: Annotated[
+        str,
+        typer.Option(
+            "--format", "-f", help="Comma-separated output formats: md, srt, vtt, txt"
+        ),
+    ] = "md",
+    workers: Annotated[
+        Optional[int],
+        typer.Option(
+            "--workers", min=1, help="Worker processes (default: number of CPUs)"
+        ),
+    ] = None,
+) -> None:
+    """Re-render saved transcripts as Markdown, SRT, VTT or plain text.
+
+    Outputs are written next to each transcript. Useful after changing the
+    Markdown layout or to add subtitles to transcripts fetched earlier.
+
+    Examples:
+        ytscribe export --format srt,vtt
+        ytscribe export data/transcripts/Channel --format md,txt --workers 4
+        ytscribe export data/transcripts/Channel/20240101_VIDEO_ID.json -f srt
+    """
+    from ytscribe.exporters import export_many, parse_formats
+    from ytscribe.search import find_transcripts
+    from ytscribe.storage import strip_compression
+
+    try:
+        config = get_config()
+        format_names = parse_formats(formats)
+    except ValueError as e:
+        typer.secho(f"Configuration error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+    if not format_names:
+        typer.secho("No export format given", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+
+    transcript_paths: list[Path] = []
+    for path in paths or [config.transcript_root]:
+        if path.is_dir():
+            transcript_paths.extend(find_transcripts(path))
+        else:
+            transcript_paths.append(path)
+    if not transcript_paths:
+        typer.echo("No transcripts found.")
+        return
+
+    # Name the audio file where fetch would have saved it
+    audio_paths: list[Optional[Path]] = [
+        config.download_root / path.parent.name / f"{strip_compression(path).stem}.opus"
+        for path in transcript_paths
+    ]
+
+    def on_exported(path: Path, outputs: dict[str, Path]) -> None:
+        typer.echo(f"  ✓ {path.name} → {', '.join(p.suffix for p in outputs.values())}")
+
+    def on_error(path: Path, error: Exception) -> None:
+        typer.secho(f"  ✗ Error ({path.name}): {error}", fg=typer.colors.RED, err=True)
+
+    started = time.monotonic()
+    results = export_many(
+        transcript_paths,
+        format_names,
+        audio_paths,
+        workers=workers,
+        on_exported=on_exported,
+        on_error=on_error,
+    )
+    failed = sum(isinstance(r, Exception) for r in results)
+    typer.secho(
+        f"\n✓ Exported {len(results) - failed} transcript(s) "
+        f"in {time.monotonic() - started:.1f}s",
+        fg=typer.colors.GREEN,
+    )
+    if failed:
+        typer.secho(
+            f"✗ Failed to export {failed} file(s)", fg=typer.colors.RED, err=True
+        )
+        raise typer.Exit(1)
+
+
+@app.command("export-json")
+def export_json_command(
+    paths: Annotated[
+        list[Path], typer.Argument(help="Columnar transcript files (.words)")
+    ],
+) -> None:
+    """Export columnar transcripts as the usual JSON files (written alongside).
+
+    Examples:
+        ytscribe export-json data/transcripts/Channel/20240101_VIDEO_ID.words
+    """
+    from ytscribe.columnar import export_json
+
+    failed = 0
+    for path in paths:
+        try:
+            json_path = export_json(path, path.with_suffix(".json"))
+        except (OSError, ValueError) as e:
+            typer.secho(f"  ✗ Error ({path.name}): {e}", fg=typer.colors.RED, err=True)
+            failed += 1
+            continue
+        typer.echo(f"  ✓ Saved: {json_path}")
+    if failed:
+        raise typer.Exit(1)
 
 
 def main() -> None:
     """Entry point for the CLI application."""
+    # Keep `ytscribe URL` working alongside subcommands by forwarding to fetch
+    args = sys.argv[1:]
+    commands = {
+        command.name or command.callback.__name__ for command in app.registered_commands
+    }
+    if args and not args[0].startswith("-") and args[0] not in commands:
+        sys.argv.insert(1, "fetch")
     app()
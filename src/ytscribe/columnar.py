@@ -0,0 +1,379 @@
+"""Compact columnar storage for word-level transcripts.
+
+The `words` list of a transcript is stored as parallel typed arrays instead of
+one JSON object per word: start/end/logprob as float64 columns, speaker and
+type as small integer codes into per-file dictionaries, and text as an offsets
+array plus one UTF-8 blob. The body can be gzip or zstd compressed; uncompressed
+files are memory-mapped on load so columns are read without copying.
+
+File layout (little-endian):
+    magic "YTSW", version (u8), compression (u8), 2 pad bytes,
+    header length (u32), JSON header, body.
+"""
+
+import gzip
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from ytscribe.storage import atomic_write, write_transcript_json
+
+try:
+    from compression import zstd
+except ImportError:  # Python < 3.14
+    zstd = None
+
+COLUMNAR_SUFFIX = ".words"
+
+_MAGIC = b"YTSW"
+_VERSION = 1
+_PREAMBLE = struct.Struct("<4sBBxxI")
+_ALIGN = 8
+
+_COMPRESSION_CODES = {"none": 0, "gzip": 1, "zstd": 2}
+_COMPRESSION_NAMES = {code: name for name, code in _COMPRESSION_CODES.items()}
+
+# Word keys stored as columns; anything else is kept in the header as extras
+_FLOAT_FIELDS = ("start", "end", "logprob")
+_CODED_FIELDS = {"speaker_id": "H", "type": "B"}
+_WORD_FIELDS = ("text", "start", "end", "type", "speaker_id", "logprob")
+
+_NAN = float("nan")
+
+
+def default_compression() -> str:
+    """Best available compression: zstd on Python 3.14+, else gzip."""
+    return "zstd" if zstd is not None else "gzip"
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    """Compress a body with the named codec."""
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if compression == "zstd":
+        if zstd is None:
+            raise ValueError("zstd compression needs Python 3.14+ (compression.zstd)")
+        return zstd.compress(data)
+    return data
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    """Decompress a body with the named codec."""
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        if zstd is None:
+            raise ValueError("File is zstd compressed; reading it needs Python 3.14+")
+        return zstd.decompress(data)
+    return data
+
+
+def _little_endian(column: array) -> bytes:
+    """Serialize an array in little-endian byte order."""
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def write_columnar(
+    transcript: dict[str, Any], path: Path, compression: Optional[str] = None
+) -> Path:
+    """Write a transcript in the columnar format.
+
+    Args:
+        transcript: Transcript dictionary (ElevenLabs response shape).
+        path: Destination file.
+        compression: 'none', 'gzip' or 'zstd' (None picks default_compression()).
+
+    Returns:
+        The path written.
+
+    Raises:
+        ValueError: If the compression is unknown or unavailable.
+    """
+    compression = compression or default_compression()
+    if compression not in _COMPRESSION_CODES:
+        raise ValueError(
+            f"Unknown compression '{compression}'. "
+            f"Choose from: {', '.join(_COMPRESSION_CODES)}"
+        )
+
+    words = transcript.get("words") or []
+    floats = {field: array("d") for field in _FLOAT_FIELDS}
+    codes = {field: array(typecode) for field, typecode in _CODED_FIELDS.items()}
+    dictionaries: dict[str, list[Optional[str]]] = {f: [None] for f in _CODED_FIELDS}
+    lookups: dict[str, dict[Optional[str], int]] = {f: {None: 0} for f in _CODED_FIELDS}
+    offsets = array("I", [0])
+    blob = bytearray()
+    present: set[str] = set()
+    extras: dict[str, dict[str, Any]] = {}
+    null_fields: dict[str, None] = {}
+
+    for idx, word in enumerate(words):
+        present.update(key for key in _WORD_FIELDS if key in word)
+        for field in _FLOAT_FIELDS:
+            value = word.get(field)
+            floats[field].append(_NAN if value is None else value)
+        for field in _CODED_FIELDS:
+            value = word.get(field)
+            code = lookups[field].get(value)
+            if code is None:
+                code = lookups[field][value] = len(dictionaries[field])
+                dictionaries[field].append(value)
+            codes[field].append(code)
+        blob += (word.get("text") or "").encode("utf-8")
+        offsets.append(len(blob))
+
+        extra = {}
+        for key, value in word.items():
+            if key in _WORD_FIELDS:
+                continue
+            # Keys that are mostly null (e.g. 'characters') cost nothing per word
+            if value is None:
+                null_fields.setdefault(key)
+            else:
+                extra[key] = value
+        if extra:
+            extras[str(idx)] = extra
+
+    # Lay the columns out back to back, each aligned for zero-copy casts
+    body = bytearray()
+    sections: dict[str, list[int]] = {}
+    columns = [
+        *((field, floats[field]) for field in _FLOAT_FIELDS),
+        *((field, codes[field]) for field in _CODED_FIELDS),
+        ("text_offsets", offsets),
+    ]
+    for name, column in columns:
+        body += b"\0" * (-len(body) % _ALIGN)
+        data = _little_endian(column)
+        sections[name] = [len(body), len(data)]
+        body += data
+    sections["text"] = [len(body), len(blob)]
+    body += blob
+
+    text = transcript.get("text")
+    joined = "".join(word.get("text") or "" for word in words)
+    header = {
+        "count": len(words),
+        "fields": [field for field in _WORD_FIELDS if field in present],
+        "dictionaries": dictionaries,
+        "sections": sections,
+        "null_fields": list(null_fields),
+        "extras": extras,
+        # Only stored when it isn't simply the concatenated word texts
+        "text": None if text == joined else text,
+        "meta": {k: v for k, v in transcript.items() if k not in ("words", "text")},
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    header_bytes += b" " * (-(_PREAMBLE.size + len(header_bytes)) % _ALIGN)
+
+    payload = _compress(bytes(body), compression)
+    with atomic_write(path, binary=True) as f:
+        f.write(
+            _PREAMBLE.pack(
+                _MAGIC, _VERSION, _COMPRESSION_CODES[compression], len(header_bytes)
+            )
+        )
+        f.write(header_bytes)
+        f.write(payload)
+    return path
+
+
+class ColumnarTranscript:
+    """A columnar transcript opened for reading.
+
+    Uncompressed files are memory-mapped and their columns are views into the
+    map; compressed files are decompressed into memory once.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open a columnar transcript file.
+
+        Args:
+            path: File written by write_columnar.
+
+        Raises:
+            ValueError: If the file is not a columnar transcript, or is
+                truncated or corrupt.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load()
+        except Exception as e:
+            # Don't leave the map open behind a half-built object
+            self.close()
+            if isinstance(e, ValueError):
+                raise
+            raise ValueError(f"Corrupt columnar transcript: {path} ({e!r})") from e
+
+    def _load(self) -> None:
+        """Parse the header and set up the column views."""
+        magic, version, compression_code, header_len = _PREAMBLE.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a columnar transcript (v{_VERSION}): {self.path}")
+
+        body_start = _PREAMBLE.size + header_len
+        self.header = json.loads(self._mmap[_PREAMBLE.size : body_start])
+        self.compression = _COMPRESSION_NAMES[compression_code]
+        if self.compression == "none":
+            self._body = memoryview(self._mmap)[body_start:]
+        else:
+            self._body = memoryview(
+                _decompress(self._mmap[body_start:], self.compression)
+            )
+
+        sections = self.header["sections"]
+        self.starts = self._column(sections["start"], "d")
+        self.ends = self._column(sections["end"], "d")
+        self.logprobs = self._column(sections["logprob"], "d")
+        self.speaker_codes = self._column(sections["speaker_id"], "H")
+        self.type_codes = self._column(sections["type"], "B")
+        self.text_offsets = self._column(sections["text_offsets"], "I")
+        offset, length = sections["text"]
+        self._text = self._body[offset : offset + length]
+
+        self.speakers: list[Optional[str]] = self.header["dictionaries"]["speaker_id"]
+        self.types: list[Optional[str]] = self.header["dictionaries"]["type"]
+
+    def _column(self, section: list[int], typecode: str) -> Any:
+        """View one column of the body as a typed sequence."""
+        offset, length = section
+        if offset + length > len(self._body):
+            raise ValueError(f"Column runs past the end of {self.path}")
+        view = self._body[offset : offset + length]
+        # The cast holds the buffer itself; an unreleased slice would keep
+        # close() from unmapping the file if the cast fails
+        try:
+            if sys.byteorder == "big":
+                column = array(typecode, view.tobytes())
+                column.byteswap()
+                return column
+            return view.cast(typecode)
+        finally:
+            view.release()
+
+    def __len__(self) -> int:
+        return self.header["count"]
+
+    def __enter__(self) -> "ColumnarTranscript":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the column views and the memory map."""
+        for name in (
+            "starts",
+            "ends",
+            "logprobs",
+            "speaker_codes",
+            "type_codes",
+            "text_offsets",
+            "_text",
+            "_body",
+        ):
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def text_at(self, index: int) -> str:
+        """Text of one word."""
+        start, end = self.text_offsets[index], self.text_offsets[index + 1]
+        return bytes(self._text[start:end]).decode("utf-8")
+
+    def _build_word(self, values: dict[str, Any], index: int) -> dict[str, Any]:
+        """Assemble a word dictionary from its decoded column values."""
+        word = {}
+        for field in self.header["fields"]:
+            value = values[field]
+            # NaN marks a missing float (NaN != NaN)
+            word[field] = None if value != value else value
+        word.update(dict.fromkeys(self.header["null_fields"]))
+        word.update(self.header["extras"].get(str(index), {}))
+        return word
+
+    def word(self, index: int) -> dict[str, Any]:
+        """Rebuild one word dictionary."""
+        values = {
+            "text": self.text_at(index),
+            "start": self.starts[index],
+            "end": self.ends[index],
+            "type": self.types[self.type_codes[index]],
+            "speaker_id": self.speakers[self.speaker_codes[index]],
+            "logprob": self.logprobs[index],
+        }
+        return self._build_word(values, index)
+
+    def iter_words(self) -> Iterator[dict[str, Any]]:
+        """Yield word dictionaries in order."""
+        # Decode whole columns at once rather than indexing word by word
+        text = bytes(self._text)
+        offsets = self.text_offsets.tolist()
+        columns = zip(
+            self.starts.tolist(),
+            self.ends.tolist(),
+            self.type_codes.tolist(),
+            self.speaker_codes.tolist(),
+            self.logprobs.tolist(),
+        )
+        for index, (start, end, type_code, speaker_code, logprob) in enumerate(columns):
+            values = {
+                "text": text[offsets[index] : offsets[index + 1]].decode("utf-8"),
+                "start": start,
+                "end": end,
+                "type": self.types[type_code],
+                "speaker_id": self.speakers[speaker_code],
+                "logprob": logprob,
+            }
+            yield self._build_word(values, index)
+
+    @property
+    def text(self) -> str:
+        """Full transcript text."""
+        if self.header["text"] is not None:
+            return self.header["text"]
+        return bytes(self._text).decode("utf-8")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Rebuild the full transcript dictionary (the JSON export)."""
+        return {
+            **self.header["meta"],
+            "text": self.text,
+            "words": list(self.iter_words()),
+        }
+
+
+def load_columnar(path: Path) -> ColumnarTranscript:
+    """Open a columnar transcript (see ColumnarTranscript)."""
+    return ColumnarTranscript(path)
+
+
+def export_json(columnar_path: Path, json_path: Path) -> Path:
+    """Write a columnar transcript back out as the usual JSON file.
+
+    Words are streamed from the columns to the file one at a time rather than
+    rebuilt as a list first.
+
+    Args:
+        columnar_path: File written by write_columnar.
+        json_path: Destination JSON file.
+
+    Returns:
+        The JSON path written.
+    """
+    with load_columnar(columnar_path) as transcript:
+        return write_transcript_json(
+            {**transcript.header["meta"], "text": transcript.text},
+            json_path,
+            words=transcript.iter_words(),
+        )
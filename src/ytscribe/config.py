@@ -1,53 +1,117 @@
 """Configuration management for ytscribe.
 
-Loads settings from environment variables and ensures required directories exist.
+Loads settings from environment variables (and a .env file, on first use).
+Settings only some commands need, like the API key, are checked by the stage
+that uses them, so e.g. `ytscribe search` works without one.
 """
 
 import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
-from dotenv import load_dotenv
+from ytscribe.storage import check_compression
 
-# Load .env file if present
-load_dotenv()
+# Formats the raw transcript can be saved in
+TRANSCRIPT_STORES = ("json", "columnar")
 
 
 @dataclass
 class Config:
     """Application configuration loaded from environment variables."""
 
-    elevenlabs_api_key: str
+    elevenlabs_api_key: Optional[str]
     download_root: Path
     transcript_root: Path
+    cache_root: Path = Path("data/cache")
+    cache_max_bytes: int = 2048 * 1024 * 1024
+    ledger_path: Path = Path("data/ytscribe.sqlite3")
+    search_index_path: Path = Path("data/search.sqlite3")
+    fingerprint_index_path: Path = Path("data/fingerprints.sqlite3")
+    webhook_secret: Optional[str] = None
+    elevenlabs_base_url: Optional[str] = None
+    transcript_store: str = "json"
+    transcript_compression: Optional[str] = None
+    # Formats written besides Markdown (see ytscribe.exporters.EXPORT_FORMATS)
+    export_formats: tuple[str, ...] = ()
 
     @classmethod
     def from_env(cls) -> "Config":
         """Load configuration from environment variables.
 
         Raises:
-            ValueError: If ELEVENLABS_API_KEY is not set.
+            ValueError: If CACHE_MAX_MB, TRANSCRIPT_STORE or EXPORT_FORMATS is
+                invalid.
         """
-        api_key = os.getenv("ELEVENLABS_API_KEY")
-        if not api_key:
+        download_root = Path(os.getenv("DOWNLOAD_ROOT", "data/audio"))
+        transcript_root = Path(os.getenv("TRANSCRIPT_ROOT", "data/transcripts"))
+        cache_root = Path(os.getenv("CACHE_ROOT", "data/cache"))
+        # The job ledger lives next to the audio root unless configured
+        ledger_path = Path(
+            os.getenv("LEDGER_PATH", str(download_root.parent / "ytscribe.sqlite3"))
+        )
+        search_index_path = Path(
+            os.getenv("SEARCH_INDEX_PATH", str(download_root.parent / "search.sqlite3"))
+        )
+        fingerprint_index_path = Path(
+            os.getenv(
+                "FINGERPRINT_INDEX_PATH",
+                str(download_root.parent / "fingerprints.sqlite3"),
+            )
+        )
+
+        try:
+            cache_max_mb = int(os.getenv("CACHE_MAX_MB", "2048"))
+        except ValueError:
+            raise ValueError("CACHE_MAX_MB must be an integer number of megabytes")
+
+        transcript_store = os.getenv("TRANSCRIPT_STORE", "json")
+        if transcript_store not in TRANSCRIPT_STORES:
             raise ValueError(
-                "ELEVENLABS_API_KEY environment variable is required. "
-                "Please set it in your .env file or environment."
+                f"TRANSCRIPT_STORE must be one of: {', '.join(TRANSCRIPT_STORES)}"
             )
 
-        download_root = Path(os.getenv("DOWNLOAD_ROOT", "data/audio"))
-        transcript_root = Path(os.getenv("TRANSCRIPT_ROOT", "data/transcripts"))
+        transcript_compression = os.getenv("TRANSCRIPT_COMPRESSION") or None
+        try:
+            check_compression(transcript_compression)
+        except ValueError as e:
+            raise ValueError(f"TRANSCRIPT_COMPRESSION: {e}")
 
-        # Ensure directories exist
-        download_root.mkdir(parents=True, exist_ok=True)
-        transcript_root.mkdir(parents=True, exist_ok=True)
+        export_formats: list[str] = []
+        if os.getenv("EXPORT_FORMATS"):
+            from ytscribe.exporters import parse_formats
+
+            export_formats = parse_formats(os.environ["EXPORT_FORMATS"])
 
         return cls(
-            elevenlabs_api_key=api_key,
+            elevenlabs_api_key=os.getenv("ELEVENLABS_API_KEY") or None,
             download_root=download_root,
             transcript_root=transcript_root,
+            cache_root=cache_root,
+            cache_max_bytes=cache_max_mb * 1024 * 1024,
+            ledger_path=ledger_path,
+            search_index_path=search_index_path,
+            fingerprint_index_path=fingerprint_index_path,
+            webhook_secret=os.getenv("ELEVENLABS_WEBHOOK_SECRET") or None,
+            elevenlabs_base_url=os.getenv("ELEVENLABS_BASE_URL") or None,
+            transcript_store=transcript_store,
+            transcript_compression=transcript_compression,
+            export_formats=tuple(name for name in export_formats if name != "md"),
         )
 
+    def require_api_key(self) -> str:
+        """Get the ElevenLabs API key, for stages that call the API.
+
+        Raises:
+            ValueError: If ELEVENLABS_API_KEY is not set.
+        """
+        if not self.elevenlabs_api_key:
+            raise ValueError(
+                "ELEVENLABS_API_KEY environment variable is required. "
+                "Please set it in your .env file or environment."
+            )
+        return self.elevenlabs_api_key
+
 
 # Global config instance - lazy loaded when needed
 _config: Config | None = None
@@ -56,13 +120,18 @@ _config: Config | None = None
 def get_config() -> Config:
     """Get the global configuration instance.
 
+    The .env file (if present) is loaded on the first call.
+
     Returns:
         Config: The application configuration.
 
     Raises:
-        ValueError: If ELEVENLABS_API_KEY is not set.
+        ValueError: If a setting is invalid.
     """
     global _config
     if _config is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
         _config = Config.from_env()
     return _config
@@ -3,24 +3,177 @@
 Downloads audio from YouTube videos and playlists, preferring Opus format (itag 250).
 """
 
+import os
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, ContextManager, Iterable, Iterator, Optional
+from urllib.parse import parse_qs, urlparse
 
 import yt_dlp
+from yt_dlp.networking.exceptions import TransportError
+from yt_dlp.postprocessor import PostProcessor
+from yt_dlp.utils import PostProcessingError
+
+from ytscribe.audio import convert_to_opus, probe_codec
+from ytscribe.fingerprint import FingerprintIndex, compute_fingerprint
+from ytscribe.ledger import Ledger
+from ytscribe.metrics import Metrics
+from ytscribe.retry import CircuitBreaker, Retrier
+
+# Bitrate used when the downloaded audio has to be re-encoded
+TRANSCODE_BITRATE = "64k"
+
+# Streams that can't be downloaded yet; they are listed again once they end
+_NOT_YET_AVAILABLE = ("is_upcoming", "is_live")
+
+
+def lists_newest_first(url: str) -> bool:
+    """Check whether a URL lists videos newest first.
+
+    Channels, their tabs and uploads playlists (list=UU...) put new videos at
+    the top; ordinary playlists append them at the end.
+    """
+    playlist_ids = parse_qs(urlparse(url).query).get("list")
+    return not playlist_ids or playlist_ids[0].startswith("UU")
+
+
+class OpusPostProcessor(PostProcessor):
+    """Turns a downloaded audio file into `{output}.opus` as cheaply as possible.
+
+    yt-dlp's FFmpegExtractAudio probes and rewrites every file. Here the codec
+    of the selected format decides: a file already in an Ogg .opus container is
+    renamed, other Opus audio (e.g. itag 250 in WebM) is remuxed with a stream
+    copy, and only other codecs are re-encoded.
+    """
+
+    def __init__(
+        self,
+        destination: Path,
+        threads: Optional[int] = None,
+        slot: Optional[ContextManager[Any]] = None,
+    ) -> None:
+        """Set up the conversion of one download.
+
+        Args:
+            destination: Path of the .opus file to produce.
+            threads: FFmpeg threads per conversion.
+            slot: Held while FFmpeg runs, to bound concurrent FFmpeg processes.
+        """
+        super().__init__()
+        self.destination = destination
+        self.threads = threads
+        self.slot = slot if slot is not None else nullcontext()
+        # 'rename', 'copy' or 'transcode' once run
+        self.mode: Optional[str] = None
+
+    def run(self, info: dict[str, Any]) -> tuple[list[str], dict[str, Any]]:
+        source = Path(info["filepath"])
+        codec = (info.get("acodec") or "").split(".")[0].lower()
+        if codec in ("", "none"):
+            # Not in the format metadata (e.g. non-YouTube sources)
+            codec = probe_codec(source) or ""
+
+        if codec == "opus" and info.get("ext") == "opus":
+            self.mode = "rename"
+            os.replace(source, self.destination)
+            to_delete = []
+        else:
+            self.mode = "copy" if codec == "opus" else "transcode"
+            action = "Remuxing" if self.mode == "copy" else "Re-encoding"
+            self.to_screen(f"{action} audio into {self.destination}")
+            with self.slot:
+                try:
+                    convert_to_opus(
+                        source,
+                        self.destination,
+                        copy=self.mode == "copy",
+                        bitrate=TRANSCODE_BITRATE,
+                        threads=self.threads,
+                    )
+                except (OSError, RuntimeError) as e:
+                    raise PostProcessingError(str(e))
+            to_delete = [str(source)]
+
+        info["filepath"] = str(self.destination)
+        info["ext"] = "opus"
+        return to_delete, info
 
 
 class AudioDownloader:
     """Downloads audio from YouTube using yt-dlp with format preferences."""
 
-    def __init__(self, output_root: Path) -> None:
+    def __init__(
+        self,
+        output_root: Path,
+        ledger: Optional[Ledger] = None,
+        metrics: Optional[Metrics] = None,
+        ffmpeg_threads: Optional[int] = None,
+        ffmpeg_jobs: Optional[int] = None,
+        attempts: int = 5,
+        fingerprints: Optional[FingerprintIndex] = None,
+    ) -> None:
         """Initialize the downloader.
 
         Args:
             output_root: Root directory for downloaded audio files.
+            ledger: Job ledger to record progress in. When set, already
+                downloaded videos are found by ID lookup instead of probing
+                the filesystem.
+            metrics: Run metrics to record stage timings and counters in.
+            ffmpeg_threads: Threads per FFmpeg conversion (None lets FFmpeg
+                choose).
+            ffmpeg_jobs: Maximum FFmpeg conversions running at once across
+                download workers (None: one per worker).
+            attempts: Tries per metadata extraction and per download before
+                giving up on transient errors and throttling.
+            fingerprints: Index to add each file's acoustic fingerprint to
+                (see ytscribe.fingerprint), including files downloaded
+                earlier. None skips fingerprinting.
         """
         self.output_root = output_root
+        self.ledger = ledger
+        self.fingerprints = fingerprints
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.ffmpeg_threads = ffmpeg_threads
+        # Shared with the transcriber's fingerprinting (see Transcriber)
+        self.ffmpeg_slots = (
+            threading.BoundedSemaphore(ffmpeg_jobs) if ffmpeg_jobs else None
+        )
         self.output_root.mkdir(parents=True, exist_ok=True)
+        # One breaker for all download workers: YouTube throttles per client
+        self.retrier = Retrier(
+            "download",
+            CircuitBreaker("YouTube", metrics=self.metrics),
+            metrics=self.metrics,
+            attempts=attempts,
+            transient_types=(TransportError,),
+        )
+
+        # Output directories already created, shared across download workers
+        self._dir_lock = threading.Lock()
+        self._created_dirs: set[Path] = set()
+        # Per-thread YoutubeDL for metadata, see _metadata_client
+        self._local = threading.local()
+
+    def _metadata_client(self) -> yt_dlp.YoutubeDL:
+        """This thread's YoutubeDL instance for metadata extraction.
+
+        The instance is kept for the downloader's lifetime, so its extractors
+        reuse the YouTube player code and API data they fetched for earlier
+        videos instead of fetching them again for every video. YoutubeDL is
+        not thread-safe, hence one per worker thread.
+        """
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = self._local.ydl = yt_dlp.YoutubeDL(
+                {"quiet": True, "no_warnings": True}
+            )
+        return ydl
 
     def _get_format_selector(self) -> str:
         """Get the format selector string for yt-dlp.
@@ -34,21 +187,16 @@ class AudioDownloader:
         # then fall back to best audio available
         return "250/bestaudio[abr<=70][acodec^=opus]/bestaudio"
 
-    def _get_output_template(self, info: dict[str, Any]) -> str:
-        """Generate output file path template based on video metadata.
-
-        Creates paths like: {output_root}/{channel_or_playlist}/{upload_date}_{video_id}.opus
+    def _get_output_dir(self, info: dict[str, Any]) -> Path:
+        """Get (and create) the channel or playlist directory for a video.
 
         Args:
-            info: Video info dictionary from yt-dlp.
+            info: Video info dictionary from yt-dlp (full or flat).
 
         Returns:
-            Output file path as string.
+            Output directory path.
         """
-        # Extract metadata
-        video_id = info.get("id", "unknown")
-        upload_date = info.get("upload_date", "00000000")
-        channel = info.get("channel", info.get("uploader", "unknown_channel"))
+        channel = info.get("channel") or info.get("uploader") or "unknown_channel"
         playlist = info.get("playlist_title")
 
         # Sanitize directory name (remove special chars that might cause issues)
@@ -58,13 +206,72 @@ class AudioDownloader:
         )
         dir_name = dir_name.strip().replace(" ", "_")
 
-        # Create subdirectory
+        # Create subdirectory (once, even when several workers share it)
         output_dir = self.output_root / dir_name
-        output_dir.mkdir(parents=True, exist_ok=True)
+        with self._dir_lock:
+            if output_dir not in self._created_dirs:
+                output_dir.mkdir(parents=True, exist_ok=True)
+                self._created_dirs.add(output_dir)
+
+        return output_dir
+
+    def _get_output_template(self, info: dict[str, Any]) -> str:
+        """Generate output file path template based on video metadata.
+
+        Creates paths like: {output_root}/{channel_or_playlist}/{upload_date}_{video_id}.opus
+
+        Args:
+            info: Video info dictionary from yt-dlp.
+
+        Returns:
+            Output file path as string.
+        """
+        video_id = info.get("id", "unknown")
+        upload_date = info.get("upload_date") or "00000000"
 
         # Format: YYYYMMDD_VIDEO_ID (extension will be added by yt-dlp/ffmpeg)
         filename = f"{upload_date}_{video_id}"
-        return str(output_dir / filename)
+        return str(self._get_output_dir(info) / filename)
+
+    def _find_existing(self, entry: dict[str, Any]) -> Optional[Path]:
+        """Find an already-downloaded audio file for an entry.
+
+        Uses the ledger when available and its file is still there. Otherwise
+        (or for files downloaded before the ledger existed, or since moved or
+        deleted) the filesystem is checked; flat playlist
+        entries carry no upload date, so the file is matched by video ID
+        within the output directory.
+
+        Args:
+            entry: Video info dictionary from yt-dlp (full or flat).
+
+        Returns:
+            Path to the existing audio file, or None.
+        """
+        video_id = entry.get("id")
+        if self.ledger is not None and video_id:
+            row = self.ledger.get(video_id)
+            if row and row["audio_path"] and row["downloaded_at"]:
+                recorded = Path(row["audio_path"])
+                if recorded.exists():
+                    return recorded
+
+        if entry.get("upload_date"):
+            candidate = Path(f"{self._get_output_template(entry)}.opus")
+            existing = candidate if candidate.exists() else None
+        elif video_id:
+            existing = next(
+                self._get_output_dir(entry).glob(f"*_{video_id}.opus"), None
+            )
+        else:
+            existing = None
+
+        # Backfill the ledger so the next run finds it by ID
+        if existing is not None and self.ledger is not None and video_id:
+            self.ledger.mark_downloaded(
+                video_id, existing, duration=entry.get("duration")
+            )
+        return existing
 
     def _progress_hook(self, d: dict[str, Any]) -> None:
         """Progress callback for yt-dlp downloads.
@@ -83,91 +290,463 @@ class AudioDownloader:
         elif d["status"] == "error":
             print("\n  ✗ Download error", file=sys.stderr)
 
-    def download(self, url: str, skip_existing: bool = True) -> list[Path]:
-        """Download audio from a YouTube URL (video or playlist).
+    def _make_line_progress_hook(
+        self, label: str, step: int = 25
+    ) -> Callable[[dict[str, Any]], None]:
+        """Create a line-based progress callback for parallel downloads.
+
+        Carriage-return progress from several workers would overwrite each
+        other, so each worker prints full lines tagged with its label, at most
+        once per `step` percent.
 
         Args:
-            url: YouTube video or playlist URL.
-            skip_existing: Skip downloads if file already exists.
+            label: Prefix identifying the worker and video.
+            step: Percentage interval between progress lines.
 
         Returns:
-            List of downloaded file paths.
+            Progress hook for yt-dlp.
+        """
+        last_reported = -step
+
+        def hook(d: dict[str, Any]) -> None:
+            nonlocal last_reported
+            if d["status"] == "downloading":
+                total = d.get("total_bytes") or d.get("total_bytes_estimate")
+                if not total:
+                    return
+                percent = int(d.get("downloaded_bytes", 0) * 100 / total)
+                if percent - last_reported >= step:
+                    last_reported = percent - percent % step
+                    speed = d.get("_speed_str", "N/A").strip()
+                    print(f"  {label} Downloading: {percent}% | Speed: {speed}")
+            elif d["status"] == "finished":
+                print(f"  {label} ✓ Download complete: {d.get('filename', 'unknown')}")
+            elif d["status"] == "error":
+                print(f"  {label} ✗ Download error", file=sys.stderr)
+
+        return hook
+
+    def iter_entries(self, url: str) -> Iterator[dict[str, Any]]:
+        """Lazily enumerate the videos behind a YouTube URL.
+
+        Playlists and channels are listed flat (ID, title and URL only) and
+        yielded page by page, so the first download can start long before a
+        large channel has been enumerated. Full metadata for each video is
+        resolved later, by download_entry, in the same pass as its download.
+
+        Args:
+            url: YouTube video, playlist or channel URL.
+
+        Yields:
+            Video info dictionaries: full metadata for a single video, flat
+            entries (with 'playlist_title' set) for playlist items.
 
         Raises:
-            yt_dlp.utils.DownloadError: If download fails.
+            ValueError: If no video information could be extracted.
         """
-        downloaded_files: list[Path] = []
-
-        # First pass: Extract metadata without downloading
         print(f"📋 Extracting metadata from: {url}")
-        with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True}) as ydl:
+        ydl_opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "extract_flat": "in_playlist",
+            "lazy_playlist": True,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             try:
-                info = ydl.extract_info(url, download=False)
+                info = ydl.extract_info(url, download=False, process=False)
             except Exception as e:
                 print(f"✗ Failed to extract metadata: {e}", file=sys.stderr)
                 raise
 
-        if not info:
-            raise ValueError("Failed to extract video information")
+            if not info:
+                raise ValueError("Failed to extract video information")
+
+            count = info.get("playlist_count")
+            if info.get("_type") not in ("playlist", "multi_video"):
+                print("📦 Found 1 video(s) to download\n")
+            elif count:
+                print(f"📦 Found {count} video(s) to download\n")
+            else:
+                print("📦 Streaming playlist entries\n")
+
+            count = 0
+            for entry in self._iter_info(ydl, info):
+                count += 1
+                if self.ledger is not None and entry.get("id"):
+                    self.ledger.record_enumerated(entry, url)
+                yield entry
+
+            if self.ledger is not None:
+                self.ledger.mark_source_complete(url, count)
+
+    def iter_new_entries(
+        self,
+        url: str,
+        is_known: Callable[[str], bool],
+        since: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Lazily list only the videos a source gained since an earlier run.
+
+        For newest-first sources (see lists_newest_first) listing stops at the
+        first known video, or the first uploaded before `since`, so usually
+        only the first page of a channel is requested. Other playlists are
+        listed in full and their known videos skipped. Upcoming and live
+        streams are skipped without being recorded.
 
-        # Handle playlist vs single video
-        entries = info.get("entries", [info])
-        total_videos = len(entries) if isinstance(entries, list) else 1
+        Args:
+            url: YouTube channel, playlist or video URL.
+            is_known: Returns True for video IDs listed by an earlier run.
+            since: Upload date (YYYYMMDD) of the newest video already seen,
+                used when the listing includes upload dates.
+            limit: Stop after this many new videos.
 
-        print(f"📦 Found {total_videos} video(s) to download\n")
+        Yields:
+            Flat entries (or full metadata for a single video) of new videos.
 
-        # Download each video
-        for idx, entry in enumerate(
-            entries if isinstance(entries, list) else [info], 1
-        ):
+        Raises:
+            ValueError: If no video information could be extracted.
+        """
+        ydl_opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "extract_flat": "in_playlist",
+            "lazy_playlist": True,
+        }
+        newest_first = lists_newest_first(url)
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            if not info:
+                raise ValueError("Failed to extract video information")
+
+            count = 0
+            for entry in self._iter_info(ydl, info):
+                video_id = entry.get("id")
+                if not video_id or entry.get("live_status") in _NOT_YET_AVAILABLE:
+                    continue
+                upload_date = entry.get("upload_date")
+                if is_known(video_id) or (
+                    since and upload_date and upload_date < since
+                ):
+                    if newest_first:
+                        return
+                    continue
+                if self.ledger is not None:
+                    self.ledger.record_enumerated(entry, url)
+                yield entry
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def _iter_info(
+        self, ydl: yt_dlp.YoutubeDL, info: dict[str, Any]
+    ) -> Iterator[dict[str, Any]]:
+        """Yield video entries from an unprocessed info dict, expanding nested playlists.
+
+        Args:
+            ydl: YoutubeDL instance used for flat extraction.
+            info: Unprocessed info dictionary from extract_info(process=False).
+
+        Yields:
+            Video info dictionaries.
+        """
+        # URL results point at another page (e.g. a channel's Videos tab)
+        while info.get("_type") == "url" and info.get("ie_key") != "Youtube":
+            info = ydl.extract_info(
+                info["url"], download=False, process=False, ie_key=info.get("ie_key")
+            )
+
+        if info.get("_type") not in ("playlist", "multi_video"):
+            yield info
+            return
+
+        playlist_title = info.get("title")
+        playlist_count = info.get("playlist_count")
+        for entry in info.get("entries") or []:
             if not entry:
                 continue
+            if entry.get("_type") in ("playlist", "multi_video") or (
+                entry.get("_type") == "url" and entry.get("ie_key") != "Youtube"
+            ):
+                yield from self._iter_info(ydl, entry)
+                continue
+            entry.setdefault("playlist_title", playlist_title)
+            entry.setdefault("n_entries", playlist_count)
+            yield entry
+
+    def _resolve_entry(self, entry: dict[str, Any]) -> dict[str, Any]:
+        """Resolve full metadata for a flat playlist entry.
+
+        Args:
+            entry: Video info dictionary (full or flat).
 
-            # Generate output path (FFmpeg will add .opus extension)
-            output_path_str = self._get_output_template(entry)
-            output_path_with_ext = Path(f"{output_path_str}.opus")
+        Returns:
+            Full video info dictionary, keeping the entry's playlist title.
+        """
+        if entry.get("_type") != "url":
+            return entry
 
-            # Check if file already exists
-            if skip_existing and output_path_with_ext.exists():
-                print(
-                    f"[{idx}/{total_videos}] ⏭  Skipping (already exists): {output_path_with_ext.name}"
+        info = self._metadata_client().extract_info(
+            entry["url"], download=False, ie_key=entry.get("ie_key")
+        )
+        if not info:
+            raise ValueError(f"Failed to extract video information: {entry['url']}")
+        if entry.get("playlist_title"):
+            info["playlist_title"] = entry["playlist_title"]
+        return info
+
+    def download_entry(
+        self,
+        entry: dict[str, Any],
+        idx: int,
+        total: Optional[int],
+        skip_existing: bool = True,
+        progress_label: Optional[str] = None,
+    ) -> Optional[Path]:
+        """Download audio for a single entry.
+
+        Flat entries are resolved to full metadata first; the resolved info is
+        then downloaded directly, without extracting the video a second time.
+
+        Args:
+            entry: Video info dictionary from iter_entries.
+            idx: 1-based position of the entry (for progress output).
+            total: Total number of entries (for progress output). Defaults to
+                the playlist count recorded on the entry, if any.
+            skip_existing: Skip download if file already exists.
+            progress_label: Worker label for line-based progress output. When
+                None, progress is redrawn in place on a single line.
+
+        Returns:
+            Path to the audio file, or None if the download failed.
+        """
+        total = total or entry.get("n_entries")
+        position = f"{idx}/{total or '?'}"
+
+        # Check if file already exists (no network access needed)
+        if skip_existing:
+            existing = self._find_existing(entry)
+            if existing is not None:
+                print(f"[{position}] ⏭  Skipping (already exists): {existing.name}")
+                self._add_fingerprint(entry.get("id"), existing)
+                return existing
+
+        try:
+            with self.metrics.span("metadata", entry.get("id")):
+                info = self.retrier.call(lambda: self._resolve_entry(entry))
+        except Exception as e:
+            print(f"[{position}] ✗ Failed to extract metadata: {e}", file=sys.stderr)
+            self.metrics.inc("failures_total", stage="metadata")
+            self._record_failure(entry, e)
+            return None
+
+        # Generate output path (FFmpeg will add .opus extension)
+        output_path_str = self._get_output_template(info)
+        output_path_with_ext = Path(f"{output_path_str}.opus")
+
+        # Single print call so parallel workers don't split the block
+        print(
+            f"[{position}] 🎵 Downloading: {info.get('title', 'Unknown')}\n"
+            f"  Channel: {info.get('channel', 'Unknown')}\n"
+            f"  Video ID: {info.get('id', 'Unknown')}"
+        )
+
+        started = time.monotonic()
+        try:
+            # Timed from yt-dlp's hooks, so only profiled as a block here
+            with self.metrics.profiler.stage("download", info.get("id")):
+                self.retrier.call(
+                    lambda: self._fetch_audio(info, output_path_str, progress_label)
                 )
-                downloaded_files.append(output_path_with_ext)
-                continue
+        except Exception as e:
+            print(f"  ✗ Failed to download: {e}", file=sys.stderr)
+            self.metrics.inc("failures_total", stage="download")
+            self._record_failure(info, e)
+            return None
+
+        if self.ledger is not None and info.get("id"):
+            self.ledger.mark_downloaded(
+                info["id"],
+                output_path_with_ext,
+                time.monotonic() - started,
+                duration=info.get("duration"),
+            )
+        self._add_fingerprint(info.get("id"), output_path_with_ext)
+        return output_path_with_ext
+
+    def _add_fingerprint(self, video_id: Optional[str], audio_path: Path) -> None:
+        """Fingerprint a downloaded file into the index, unless it is there.
+
+        Runs in the download worker, within the FFmpeg job limit. A file that
+        can't be fingerprinted is still transcribed, just never matched.
+        """
+        if self.fingerprints is None or not video_id:
+            return
+        if self.fingerprints.has(video_id):
+            return
+        try:
+            with self.ffmpeg_slots or nullcontext():
+                with self.metrics.span("fingerprint", video_id):
+                    fingerprint = compute_fingerprint(audio_path)
+        except (OSError, RuntimeError) as e:
+            print(f"  ⚠️  Could not fingerprint {audio_path.name}: {e}", file=sys.stderr)
+            return
+        self.fingerprints.add(video_id, audio_path, fingerprint)
+
+    def _fetch_audio(
+        self,
+        info: dict[str, Any],
+        output_template: str,
+        progress_label: Optional[str] = None,
+    ) -> None:
+        """Download and convert the audio of a resolved video.
+
+        Records 'download' and 'postprocess' spans, split at the point yt-dlp
+        hands the file to the post-processor (see OpusPostProcessor).
+
+        Args:
+            info: Full video info dictionary from _resolve_entry.
+            output_template: Output path without extension; the audio is
+                written to `{output_template}.opus`.
+            progress_label: Worker label for line-based progress output.
+        """
+        if progress_label is None:
+            progress_hook = self._progress_hook
+        else:
+            progress_hook = self._make_line_progress_hook(progress_label)
+
+        video_id = info.get("id")
+        started = time.monotonic()
+        downloaded_bytes = 0
+        postprocess_started: Optional[float] = None
+
+        def track_download(d: dict[str, Any]) -> None:
+            nonlocal downloaded_bytes
+            if d["status"] == "finished":
+                downloaded_bytes += d.get("downloaded_bytes") or d.get("total_bytes", 0)
+
+        def track_postprocess(d: dict[str, Any]) -> None:
+            nonlocal postprocess_started
+            if d["status"] == "started" and postprocess_started is None:
+                postprocess_started = time.monotonic()
+
+        # Download options
+        ydl_opts = {
+            "format": self._get_format_selector(),
+            "outtmpl": output_template,
+            "quiet": False,
+            "no_warnings": False,
+            # yt-dlp's own progress bar would interleave between workers
+            "noprogress": progress_label is not None,
+            "progress_hooks": [progress_hook, track_download],
+            "postprocessor_hooks": [track_postprocess],
+            # Don't embed metadata to keep files small
+            "writethumbnail": False,
+            "embedthumbnail": False,
+        }
+        postprocessor = OpusPostProcessor(
+            Path(f"{output_template}.opus"), self.ffmpeg_threads, self.ffmpeg_slots
+        )
 
-            # Download options
-            ydl_opts = {
-                "format": self._get_format_selector(),
-                "outtmpl": output_path_str,
-                "quiet": False,
-                "no_warnings": False,
-                "progress_hooks": [self._progress_hook],
-                # Audio processing
-                "postprocessors": [
-                    {
-                        "key": "FFmpegExtractAudio",
-                        "preferredcodec": "opus",
-                        "preferredquality": "64",
-                    }
-                ],
-                # Don't embed metadata to keep files small
-                "writethumbnail": False,
-                "embedthumbnail": False,
-            }
-
-            print(
-                f"[{idx}/{total_videos}] 🎵 Downloading: {entry.get('title', 'Unknown')}"
+        # Same path as yt-dlp --load-info-json: reuse the extracted info
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.add_post_processor(postprocessor, when="post_process")
+            ydl.process_ie_result(info, download=True)
+
+        finished = time.monotonic()
+        download_finished = postprocess_started or finished
+        self.metrics.record(
+            "download", started, download_finished, video_id, bytes=downloaded_bytes
+        )
+        self.metrics.inc("bytes_downloaded_total", downloaded_bytes)
+        if postprocess_started is not None:
+            output = Path(f"{output_template}.opus")
+            self.metrics.record(
+                "postprocess",
+                postprocess_started,
+                finished,
+                video_id,
+                bytes=output.stat().st_size if output.exists() else 0,
+                mode=postprocessor.mode,
             )
-            print(f"  Channel: {entry.get('channel', 'Unknown')}")
-            print(f"  Video ID: {entry.get('id', 'Unknown')}")
+            self.metrics.inc("postprocess_total", mode=postprocessor.mode)
 
-            try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([entry.get("webpage_url", url)])
-                downloaded_files.append(output_path_with_ext)
-            except Exception as e:
-                print(f"  ✗ Failed to download: {e}", file=sys.stderr)
-                # Continue with other videos in playlist
-                continue
+    def _record_failure(self, entry: dict[str, Any], error: Exception) -> None:
+        """Record a failed download in the ledger, if there is one."""
+        if self.ledger is not None and entry.get("id"):
+            self.ledger.mark_failed(entry["id"], "download", str(error))
+
+    def download(
+        self, url: str, skip_existing: bool = True, workers: int = 1
+    ) -> list[Path]:
+        """Download audio from a YouTube URL (video or playlist).
+
+        Args:
+            url: YouTube video or playlist URL.
+            skip_existing: Skip downloads if file already exists.
+            workers: Number of entries to download concurrently. Each worker
+                runs its own yt-dlp instance (and FFmpeg post-processing).
+
+        Returns:
+            List of downloaded file paths, in playlist order.
 
+        Raises:
+            yt_dlp.utils.DownloadError: If metadata extraction fails.
+        """
+        return self.download_entries(self.iter_entries(url), skip_existing, workers)
+
+    def download_entries(
+        self,
+        entries: Iterable[dict[str, Any]],
+        skip_existing: bool = True,
+        workers: int = 1,
+    ) -> list[Path]:
+        """Download audio for already-enumerated entries.
+
+        Args:
+            entries: Video info dictionaries, e.g. from iter_entries.
+            skip_existing: Skip downloads if file already exists.
+            workers: Number of entries to download concurrently.
+
+        Returns:
+            List of downloaded file paths, in input order.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        numbered = enumerate(entries, 1)
+
+        if workers == 1:
+            results: Iterable[Optional[Path]] = (
+                self.download_entry(entry, idx, None, skip_existing)
+                for idx, entry in numbered
+            )
+            return [path for path in results if path is not None]
+
+        def run(idx: int, entry: dict[str, Any]) -> Optional[Path]:
+            label = f"[{threading.current_thread().name} {entry.get('id', idx)}]"
+            return self.download_entry(
+                entry, idx, None, skip_existing, progress_label=label
+            )
+
+        downloaded_files: list[Path] = []
+        in_flight: deque[Future[Optional[Path]]] = deque()
+
+        # Submit at most 2 entries per worker ahead, so enumeration stays lazy,
+        # and collect results in submission order to preserve playlist order
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="dl"
+        ) as executor:
+            for idx, entry in numbered:
+                in_flight.append(executor.submit(run, idx, entry))
+                if len(in_flight) >= workers * 2:
+                    path = in_flight.popleft().result()
+                    if path is not None:
+                        downloaded_files.append(path)
+            for future in in_flight:
+                path = future.result()
+                if path is not None:
+                    downloaded_files.append(path)
+
+        # Failed downloads are reported by download_entry and left out here
         return downloaded_files
@@ -0,0 +1,480 @@
+"""Render transcripts to Markdown, SRT, VTT and plain text in one pass.
+
+The `words` list is walked once and every word is handed to each requested
+writer, which streams its output to an open file as it goes: Markdown and text
+writers group words into speaker turns, subtitle writers into cues limited by
+duration and length. Only the current turn or cue is held in memory. Files are
+renamed into place only after every writer has finished.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, TextIO
+
+from ytscribe.columnar import COLUMNAR_SUFFIX, load_columnar
+from ytscribe.storage import atomic_write, load_transcript_json, strip_compression
+
+# Output formats and the file suffix each is written with
+EXPORT_FORMATS = {"md": ".md", "srt": ".srt", "vtt": ".vtt", "txt": ".txt"}
+
+# Subtitle cue limits (common broadcast guidelines: two lines of 42 characters)
+MAX_CUE_SECONDS = 6.0
+MAX_CUE_CHARS = 84
+MAX_LINE_CHARS = 42
+
+# A pause this long starts a new cue even within the limits
+_CUE_GAP_SECONDS = 1.5
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format a time as MM:SS.mmm (as in the Markdown transcript)."""
+    minutes = int(seconds // 60)
+    return f"{minutes:02d}:{seconds % 60:06.3f}"
+
+
+def _format_clock(seconds: float, separator: str) -> str:
+    """Format a time as HH:MM:SS<separator>mmm for subtitle files."""
+    millis = round(max(seconds, 0.0) * 1000)
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def _wrap_cue(text: str) -> str:
+    """Break cue text into two lines at the space closest to the middle."""
+    if len(text) <= MAX_LINE_CHARS:
+        return text
+    middle = len(text) // 2
+    spaces = [i for i, char in enumerate(text) if char == " "]
+    if not spaces:
+        return text
+    split = min(spaces, key=lambda i: abs(i - middle))
+    return f"{text[:split]}\n{text[split + 1 :]}"
+
+
+class TranscriptWriter:
+    """Base class for a streaming output format.
+
+    Subclasses get every word, in order, through add(), and write their
+    output to the file as they go; finish() flushes whatever is pending.
+    """
+
+    def __init__(
+        self, file: TextIO, transcript: dict[str, Any], audio_path: Path
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            file: Open text file to write to.
+            transcript: Transcript metadata (language etc.; words not needed).
+            audio_path: Audio file the transcript is for.
+        """
+        self.file = file
+        self.transcript = transcript
+        self.audio_path = audio_path
+
+    def start(self) -> None:
+        """Write anything that comes before the first word."""
+
+    def add(self, word: dict[str, Any]) -> None:
+        """Consume the next word (or spacing, or audio event)."""
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        """Write anything still pending after the last word."""
+
+
+class _TurnWriter(TranscriptWriter):
+    """Groups words into speaker turns and writes one turn at a time."""
+
+    def __init__(
+        self, file: TextIO, transcript: dict[str, Any], audio_path: Path
+    ) -> None:
+        super().__init__(file, transcript, audio_path)
+        self._speaker: Optional[str] = None
+        self._turn_start: Optional[float] = None
+        self._parts: list[str] = []
+
+    def add(self, word: dict[str, Any]) -> None:
+        speaker = word.get("speaker_id")
+        # Spacing carries no meaningful speaker; only words and events switch turns
+        if word.get("type") != "spacing" and speaker != self._speaker:
+            self._flush()
+            self._speaker = speaker
+        if self._turn_start is None and word.get("type") != "spacing":
+            self._turn_start = word.get("start")
+        self._parts.append(word.get("text") or "")
+
+    def finish(self) -> None:
+        self._flush()
+
+    def _flush(self) -> None:
+        text = "".join(self._parts).strip()
+        if text:
+            self.write_turn(self._speaker, self._turn_start, text)
+        self._parts = []
+        self._turn_start = None
+
+    def write_turn(
+        self, speaker: Optional[str], start: Optional[float], text: str
+    ) -> None:
+        """Write one finished turn."""
+        raise NotImplementedError
+
+
+class MarkdownWriter(_TurnWriter):
+    """Markdown transcript with metadata, speaker turns and audio events."""
+
+    def __init__(
+        self, file: TextIO, transcript: dict[str, Any], audio_path: Path
+    ) -> None:
+        super().__init__(file, transcript, audio_path)
+        # Listed after the transcript; there are few per file
+        self._events: list[dict[str, Any]] = []
+
+    def start(self) -> None:
+        self.file.write(f"# Transcript: {self.audio_path.name}\n\n")
+        self.file.write("## Metadata\n\n")
+        self.file.write(f"- **Audio File:** `{self.audio_path}`\n")
+        self.file.write(
+            f"- **Language:** {self.transcript.get('language_code', 'unknown')}\n"
+        )
+        self.file.write(
+            "- **Language Probability:** "
+            f"{self.transcript.get('language_probability') or 0:.2f}\n\n"
+        )
+        self.file.write("## Full Transcript\n\n")
+
+    def add(self, word: dict[str, Any]) -> None:
+        if word.get("type") == "audio_event":
+            self._events.append(word)
+        super().add(word)
+
+    def write_turn(
+        self, speaker: Optional[str], start: Optional[float], text: str
+    ) -> None:
+        if speaker is not None:
+            timestamp = f" [{format_timestamp(start)}]" if start is not None else ""
+            self.file.write(f"**{speaker}**{timestamp}\n")
+        self.file.write(f"{text}\n\n")
+
+    def finish(self) -> None:
+        super().finish()
+        if self._events:
+            self.file.write("## Audio Events\n\n")
+            for event in self._events:
+                start = format_timestamp(event.get("start") or 0)
+                end = format_timestamp(event.get("end") or 0)
+                self.file.write(
+                    f"- [{start} - {end}] *{event.get('text', 'unknown')}*\n"
+                )
+            self.file.write("\n")
+
+
+class TextWriter(_TurnWriter):
+    """Plain text, one paragraph per speaker turn."""
+
+    def write_turn(
+        self, speaker: Optional[str], start: Optional[float], text: str
+    ) -> None:
+        prefix = f"{speaker}: " if speaker is not None else ""
+        self.file.write(f"{prefix}{text}\n\n")
+
+
+class _CueWriter(TranscriptWriter):
+    """Groups words into subtitle cues and writes one cue at a time."""
+
+    def __init__(
+        self, file: TextIO, transcript: dict[str, Any], audio_path: Path
+    ) -> None:
+        super().__init__(file, transcript, audio_path)
+        self._parts: list[str] = []
+        self._length = 0
+        self._start: Optional[float] = None
+        self._end: Optional[float] = None
+        self._speaker: Optional[str] = None
+        self._last_speaker: Optional[str] = None
+        self._count = 0
+
+    def add(self, word: dict[str, Any]) -> None:
+        text = word.get("text") or ""
+        if word.get("type") == "spacing":
+            if self._parts:
+                self._parts.append(text)
+                self._length += len(text)
+            return
+
+        start, end = word.get("start"), word.get("end")
+        if start is None or end is None:
+            # Untimed words can't start or end a cue; keep them with the current one
+            self._parts.append(text)
+            self._length += len(text)
+            return
+
+        if self._start is not None and (
+            word.get("speaker_id") != self._speaker
+            or end - self._start > MAX_CUE_SECONDS
+            or self._length + len(text) > MAX_CUE_CHARS
+            or start - (self._end or start) > _CUE_GAP_SECONDS
+        ):
+            self._flush()
+
+        if self._start is None:
+            self._start = start
+            self._speaker = word.get("speaker_id")
+        self._end = end
+        self._parts.append(text)
+        self._length += len(text)
+
+    def finish(self) -> None:
+        self._flush()
+
+    def _flush(self) -> None:
+        text = " ".join("".join(self._parts).split())
+        if text and self._start is not None:
+            self._count += 1
+            self.write_cue(
+                self._count,
+                self._start,
+                max(self._end or self._start, self._start),
+                self._speaker,
+                _wrap_cue(text),
+            )
+            self._last_speaker = self._speaker
+        self._parts = []
+        self._length = 0
+        self._start = None
+        self._end = None
+
+    def write_cue(
+        self,
+        index: int,
+        start: float,
+        end: float,
+        speaker: Optional[str],
+        text: str,
+    ) -> None:
+        """Write one finished cue."""
+        raise NotImplementedError
+
+
+class SrtWriter(_CueWriter):
+    """SubRip subtitles; the speaker is named when it changes."""
+
+    def write_cue(
+        self,
+        index: int,
+        start: float,
+        end: float,
+        speaker: Optional[str],
+        text: str,
+    ) -> None:
+        if speaker is not None and speaker != self._last_speaker:
+            text = f"[{speaker}] {text}"
+        self.file.write(
+            f"{index}\n{_format_clock(start, ',')} --> {_format_clock(end, ',')}\n"
+            f"{text}\n\n"
+        )
+
+
+class VttWriter(_CueWriter):
+    """WebVTT subtitles with voice tags for speakers."""
+
+    def start(self) -> None:
+        self.file.write("WEBVTT\n\n")
+
+    def write_cue(
+        self,
+        index: int,
+        start: float,
+        end: float,
+        speaker: Optional[str],
+        text: str,
+    ) -> None:
+        if speaker is not None:
+            text = f"<v {speaker}>{text}"
+        self.file.write(
+            f"{_format_clock(start, '.')} --> {_format_clock(end, '.')}\n{text}\n\n"
+        )
+
+
+_WRITERS: dict[str, type[TranscriptWriter]] = {
+    "md": MarkdownWriter,
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "txt": TextWriter,
+}
+
+
+def parse_formats(value: str) -> list[str]:
+    """Parse a comma-separated list of export formats.
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    formats = [item.strip().lower() for item in value.split(",") if item.strip()]
+    unknown = [item for item in formats if item not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(
+            f"Unknown export format(s): {', '.join(unknown)}. "
+            f"Choose from: {', '.join(EXPORT_FORMATS)}"
+        )
+    return list(dict.fromkeys(formats))
+
+
+def export_transcript(
+    transcript: dict[str, Any],
+    words: Iterable[dict[str, Any]],
+    audio_path: Path,
+    destinations: dict[str, Path],
+) -> dict[str, Path]:
+    """Write several output formats in a single pass over the words.
+
+    Args:
+        transcript: Transcript dictionary (its words are not read from here).
+        words: The transcript's words, in order (e.g. a columnar iterator).
+        audio_path: Audio file the transcript is for (shown in Markdown).
+        destinations: Output path per format name (see EXPORT_FORMATS).
+
+    Returns:
+        The destinations written.
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    unknown = set(destinations) - set(_WRITERS)
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(sorted(unknown))}")
+
+    with ExitStack() as stack:
+        writers = [
+            _WRITERS[name](
+                stack.enter_context(atomic_write(path)), transcript, audio_path
+            )
+            for name, path in destinations.items()
+        ]
+
+        for writer in writers:
+            writer.start()
+        for word in words:
+            for writer in writers:
+                writer.add(word)
+        for writer in writers:
+            writer.finish()
+    return destinations
+
+
+def export_file(
+    transcript_path: Path,
+    formats: list[str],
+    audio_path: Optional[Path] = None,
+) -> dict[str, Path]:
+    """Re-render a saved JSON or columnar transcript next to the original.
+
+    Args:
+        transcript_path: A .json (optionally .gz/.zst) or .words transcript file.
+        formats: Format names to write (see EXPORT_FORMATS).
+        audio_path: Audio file to name in the Markdown header (defaults to
+            the transcript path with an .opus suffix).
+
+    Returns:
+        Output path per format.
+    """
+    base_path = strip_compression(transcript_path)
+    audio_path = audio_path or base_path.with_suffix(".opus")
+    destinations = {
+        name: base_path.with_suffix(EXPORT_FORMATS[name]) for name in formats
+    }
+
+    if transcript_path.suffix == COLUMNAR_SUFFIX:
+        with load_columnar(transcript_path) as columnar:
+            return export_transcript(
+                columnar.header["meta"],
+                columnar.iter_words(),
+                audio_path,
+                destinations,
+            )
+
+    transcript = load_transcript_json(transcript_path)
+    if not isinstance(transcript, dict) or "words" not in transcript:
+        raise ValueError(f"Not a transcript (no 'words'): {transcript_path}")
+    return export_transcript(
+        transcript, transcript["words"] or [], audio_path, destinations
+    )
+
+
+def _export_job(
+    job: tuple[Path, list[str], Optional[Path]],
+) -> dict[str, Path] | Exception:
+    """Process pool task: export one file, returning the error instead of raising."""
+    transcript_path, formats, audio_path = job
+    try:
+        return export_file(transcript_path, formats, audio_path)
+    except (OSError, ValueError, KeyError) as e:
+        return e
+
+
+def export_many(
+    transcript_paths: list[Path],
+    formats: list[str],
+    audio_paths: Optional[list[Optional[Path]]] = None,
+    workers: Optional[int] = None,
+    on_exported: Optional[Callable[[Path, dict[str, Path]], None]] = None,
+    on_error: Optional[Callable[[Path, Exception], None]] = None,
+) -> list[dict[str, Path] | Exception]:
+    """Re-render many saved transcripts across a process pool.
+
+    Rendering is CPU-bound string work, so files are spread over processes
+    rather than threads.
+
+    Args:
+        transcript_paths: .json or .words transcript files.
+        formats: Format names to write for each file.
+        audio_paths: Audio path to name in each Markdown header (see
+            export_file), in the same order as transcript_paths.
+        workers: Number of processes (default: CPU count). With one worker,
+            or one file, everything runs in this process.
+        on_exported: Called with (transcript path, outputs) per success.
+        on_error: Called with (transcript path, error) per failure.
+
+    Returns:
+        One entry per input path, in input order: the outputs written or the
+        exception that file failed with.
+    """
+    audio_paths = audio_paths or [None] * len(transcript_paths)
+    jobs = [
+        (path, formats, audio_path)
+        for path, audio_path in zip(transcript_paths, audio_paths)
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) <= 1:
+        outcomes: Iterable[dict[str, Path] | Exception] = map(_export_job, jobs)
+        return _report(transcript_paths, outcomes, on_exported, on_error)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        # Batch small files so per-task overhead doesn't dominate
+        chunksize = max(1, len(jobs) // (workers * 4))
+        outcomes = executor.map(_export_job, jobs, chunksize=chunksize)
+        return _report(transcript_paths, outcomes, on_exported, on_error)
+
+
+def _report(
+    transcript_paths: list[Path],
+    outcomes: Iterable[dict[str, Path] | Exception],
+    on_exported: Optional[Callable[[Path, dict[str, Path]], None]],
+    on_error: Optional[Callable[[Path, Exception], None]],
+) -> list[dict[str, Path] | Exception]:
+    """Collect export outcomes in order, calling the callbacks as they arrive."""
+    results = []
+    for path, outcome in zip(transcript_paths, outcomes):
+        if isinstance(outcome, Exception):
+            if on_error:
+                on_error(path, outcome)
+        elif on_exported:
+            on_exported(path, outcome)
+        results.append(outcome)
+    return results
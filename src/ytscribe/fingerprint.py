@@ -0,0 +1,482 @@
+"""Acoustic fingerprints for finding reuploads and clips of transcribed audio.
+
+A fingerprint is computed locally with FFmpeg: the decoded audio is split into
+eight bands between 150 Hz and 1.8 kHz, each band's energy is smoothed and
+sampled 16 times a second, and every frame is reduced to 7 bits, one per pair
+of neighbouring bands: whether the energy difference between the two grew or
+shrank since two frames earlier. Re-encoding, resampling and volume changes
+flip few of these bits, so a reupload, or a clip cut from a longer video,
+matches the original at a fixed frame offset.
+
+The index keeps the bits of every fingerprinted file, plus hashes of runs of
+frames for lookup. A lookup counts, for each (video, offset) pair, the hashes
+the query shares with the index at that offset, then compares the best
+candidates bit by bit.
+"""
+
+import math
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+# Frames per second of audio
+FRAME_RATE = 16
+
+# Matches with more differing bits than this are rejected (unrelated audio
+# differs in about half of them)
+MAX_BIT_ERROR_RATE = 0.2
+
+# Files shorter than this are neither looked up nor reused
+MIN_MATCH_SECONDS = 10.0
+
+# Audio is decoded at this rate: the bands end well below its Nyquist rate
+_SAMPLE_RATE = 4000
+_BAND_EDGES_HZ = (150.0, 1800.0)
+_BANDS = 8
+_BITS = _BANDS - 1
+
+# Band energies are smoothed below this rate, and compared with the frame this
+# many frames earlier: slow envelopes keep the bits of a clip whose frames
+# fall between the original's frames close to the original's bits
+_ENVELOPE_HZ = 1.5
+_DELTA_FRAMES = 2
+
+# Frames whose total band energy is below this (about -80 dBFS) are silent;
+# their bits are noise, so they are neither hashed nor compared
+_SILENCE_ENERGY = 1e-8
+_SILENT = 1 << _BITS
+
+# Frames per lookup hash (7 bits each, so 28-bit hashes)
+_HASH_FRAMES = 4
+
+# One in this many hashes is stored and looked up, chosen by hash value so
+# that the query and the index keep the same ones
+_HASH_SAMPLING = 4
+
+# Votes a (video, offset) pair needs before its bits are compared
+_MIN_VOTES = 4
+
+# Candidates compared bit by bit per lookup
+_MAX_CANDIDATES = 5
+
+# How far (in frames) a match may run past either end of the matched file
+_EDGE_FRAMES = FRAME_RATE
+
+# Hashes per SQL query (below SQLite's bound-parameter limit)
+_LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    video_id TEXT PRIMARY KEY,
+    audio_path TEXT NOT NULL,
+    codes BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hashes (
+    hash INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    frame INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hashes_hash ON hashes (hash);
+CREATE INDEX IF NOT EXISTS hashes_video ON hashes (video_id);
+"""
+
+
+def _filter_graph() -> str:
+    """FFmpeg filter graph writing one channel of band energy per band."""
+    low, high = _BAND_EDGES_HZ
+    ratio = (high / low) ** (1 / (_BANDS - 1))
+    width = math.log2(ratio)
+    labels = [f"[b{i}]" for i in range(_BANDS)]
+    parts = [
+        f"[0:a]aresample={_SAMPLE_RATE},aformat=channel_layouts=mono,"
+        f"asplit={_BANDS}{''.join(labels)}"
+    ]
+    for i, label in enumerate(labels):
+        parts.append(
+            f"{label}bandpass=f={low * ratio**i:.0f}:width_type=o:w={width:.3f},"
+            f"aeval=val(0)*val(0)[e{i}]"
+        )
+    energies = "".join(f"[e{i}]" for i in range(_BANDS))
+    # Smooth the squared signal into an envelope, then keep FRAME_RATE
+    # samples a second of it
+    parts.append(
+        f"{energies}amerge=inputs={_BANDS},lowpass=f={_ENVELOPE_HZ:g},"
+        f"aresample={FRAME_RATE}[out]"
+    )
+    return ";".join(parts)
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """Per-frame bit codes of one audio file.
+
+    Attributes:
+        codes: One code per frame: 7 bits, plus a flag bit for silent frames.
+    """
+
+    codes: array
+
+    @property
+    def duration(self) -> float:
+        """Length of the fingerprinted audio in seconds."""
+        return len(self.codes) / FRAME_RATE
+
+    def hashes(self) -> Iterator[tuple[int, int]]:
+        """Lookup hashes of the runs of frames without silence.
+
+        Yields:
+            Tuples of (frame the run starts at, hash), for the sampled hashes.
+        """
+        codes = self.codes
+        for frame in range(len(codes) - _HASH_FRAMES + 1):
+            value = 0
+            for code in codes[frame : frame + _HASH_FRAMES]:
+                if code & _SILENT:
+                    break
+                value = (value << _BITS) | code
+            else:
+                # Steady audio sets no bits; it matches everything
+                if value and _is_sampled(value):
+                    yield frame, value
+
+
+def _is_sampled(value: int) -> bool:
+    """Whether a hash is one of the sampled ones (see _HASH_SAMPLING)."""
+    mixed = (value * 0x9E3779B1) & 0xFFFFFFFF
+    return mixed < 0x100000000 // _HASH_SAMPLING
+
+
+def compute_fingerprint(audio_path: Path) -> Fingerprint:
+    """Fingerprint an audio file.
+
+    Args:
+        audio_path: Path to the audio file (any format FFmpeg decodes).
+
+    Returns:
+        The fingerprint.
+
+    Raises:
+        FileNotFoundError: If ffmpeg is not installed.
+        RuntimeError: If ffmpeg fails.
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            str(audio_path),
+            "-filter_complex",
+            _filter_graph(),
+            "-map",
+            "[out]",
+            "-f",
+            "f32le",
+            "-c:a",
+            "pcm_f32le",
+            "-",
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", "replace")
+        raise RuntimeError(
+            f"ffmpeg failed to fingerprint {audio_path}: {stderr[-500:]}"
+        )
+
+    energies = array("f")
+    energies.frombytes(result.stdout[: len(result.stdout) // 4 * 4])
+    if sys.byteorder == "big":
+        energies.byteswap()
+
+    codes = array("B")
+    history: list[list[float]] = []
+    for start in range(0, len(energies) - _BANDS + 1, _BANDS):
+        frame = energies[start : start + _BANDS]
+        # Log energy differences between neighbouring bands, so that the
+        # volume of the file doesn't matter
+        levels = [math.log(max(energy, 0.0) + 1e-12) for energy in frame]
+        slopes = [levels[i] - levels[i + 1] for i in range(_BITS)]
+        code = 0
+        if len(history) == _DELTA_FRAMES:
+            earlier = history.pop(0)
+            for i in range(_BITS):
+                if slopes[i] > earlier[i]:
+                    code |= 1 << i
+        if sum(frame) < _SILENCE_ENERGY:
+            code |= _SILENT
+        codes.append(code)
+        history.append(slopes)
+    return Fingerprint(codes)
+
+
+def _bit_error_rate(query: array, indexed: array, offset: int) -> tuple[float, int]:
+    """Share of differing bits where two fingerprints overlap at an offset.
+
+    Args:
+        query: Codes of the query.
+        indexed: Codes of the indexed file.
+        offset: Frame of `indexed` that the query's first frame lines up with.
+
+    Returns:
+        Tuple of (bit error rate, frames compared). Frames silent in either
+        fingerprint are skipped; with nothing to compare the rate is 1.0.
+    """
+    errors = compared = 0
+    for frame in range(max(0, -offset), min(len(query), len(indexed) - offset)):
+        a, b = query[frame], indexed[frame + offset]
+        if (a | b) & _SILENT:
+            continue
+        errors += (a ^ b).bit_count()
+        compared += 1
+    if not compared:
+        return 1.0, 0
+    return errors / (compared * _BITS), compared
+
+
+@dataclass(frozen=True)
+class Match:
+    """An indexed file that contains the audio of a query.
+
+    Attributes:
+        video_id: Video ID of the indexed file.
+        audio_path: Path of the indexed file.
+        offset: Seconds into the indexed file at which the query starts.
+        duration: Length of the query in seconds.
+        matched_duration: Length of the indexed file in seconds.
+        bit_error_rate: Share of fingerprint bits that differ.
+    """
+
+    video_id: str
+    audio_path: Path
+    offset: float
+    duration: float
+    matched_duration: float
+    bit_error_rate: float
+
+    @property
+    def exact(self) -> bool:
+        """Whether the query is the whole indexed file (e.g. a reupload)."""
+        return (
+            abs(self.offset) <= _EDGE_FRAMES / FRAME_RATE
+            and abs(self.duration - self.matched_duration) <= _EDGE_FRAMES / FRAME_RATE
+        )
+
+
+class FingerprintIndex:
+    """Thread-safe SQLite store of fingerprints, searchable by content."""
+
+    def __init__(self, path: Path) -> None:
+        """Open (and create if needed) the index database.
+
+        Args:
+            path: Path to the SQLite file.
+        """
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def has(self, video_id: str) -> bool:
+        """Whether a video has been fingerprinted."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM fingerprints WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return row is not None
+
+    def get(self, video_id: str) -> Optional[Fingerprint]:
+        """Get the stored fingerprint of a video, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT codes FROM fingerprints WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return Fingerprint(array("B", row["codes"]))
+
+    def add(self, video_id: str, audio_path: Path, fingerprint: Fingerprint) -> None:
+        """Store (or replace) the fingerprint of a video.
+
+        Args:
+            video_id: Video the audio belongs to.
+            audio_path: Path of the audio file.
+            fingerprint: Its fingerprint.
+        """
+        rows = [(value, video_id, frame) for frame, value in fingerprint.hashes()]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM hashes WHERE video_id = ?", (video_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO fingerprints "
+                    "(video_id, audio_path, codes, created_at) VALUES (?, ?, ?, ?)",
+                    (
+                        video_id,
+                        str(audio_path),
+                        fingerprint.codes.tobytes(),
+                        time.time(),
+                    ),
+                )
+                self._conn.executemany(
+                    "INSERT INTO hashes (hash, video_id, frame) VALUES (?, ?, ?)", rows
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _votes(
+        self, fingerprint: Fingerprint, exclude: Optional[str]
+    ) -> Counter[tuple[str, int]]:
+        """Count shared hashes per (video, frame offset) pair."""
+        frames_by_hash: dict[int, list[int]] = defaultdict(list)
+        for frame, value in fingerprint.hashes():
+            frames_by_hash[value].append(frame)
+
+        votes: Counter[tuple[str, int]] = Counter()
+        values = list(frames_by_hash)
+        for start in range(0, len(values), _LOOKUP_BATCH):
+            batch = values[start : start + _LOOKUP_BATCH]
+            placeholders = ", ".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT hash, video_id, frame FROM hashes "
+                    f"WHERE hash IN ({placeholders}) AND video_id IS NOT ?",
+                    (*batch, exclude),
+                ).fetchall()
+            for value, video_id, frame in rows:
+                for query_frame in frames_by_hash[value]:
+                    votes[(video_id, frame - query_frame)] += 1
+        return votes
+
+    def find(
+        self, fingerprint: Fingerprint, exclude: Optional[str] = None
+    ) -> list[Match]:
+        """Find indexed files that contain the whole query.
+
+        Args:
+            fingerprint: Fingerprint of the query audio.
+            exclude: Video ID to leave out (usually the query's own).
+
+        Returns:
+            Matches, exact ones first, then by bit error rate.
+        """
+        if fingerprint.duration < MIN_MATCH_SECONDS:
+            return []
+
+        # The best-voted offset per video; its neighbours are tried below
+        candidates: dict[str, int] = {}
+        for (video_id, offset), count in self._votes(
+            fingerprint, exclude
+        ).most_common():
+            if count < _MIN_VOTES or len(candidates) == _MAX_CANDIDATES:
+                break
+            candidates.setdefault(video_id, offset)
+
+        matches = []
+        for video_id, offset in candidates.items():
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT audio_path, codes FROM fingerprints WHERE video_id = ?",
+                    (video_id,),
+                ).fetchone()
+            if row is None:
+                continue
+            indexed = array("B", row["codes"])
+            # Frame boundaries of a clip rarely line up with the original's
+            rate, offset = min(
+                (_bit_error_rate(fingerprint.codes, indexed, shifted)[0], shifted)
+                for shifted in (offset - 1, offset, offset + 1)
+            )
+            compared = _bit_error_rate(fingerprint.codes, indexed, offset)[1]
+            contained = (
+                offset >= -_EDGE_FRAMES
+                and offset + len(fingerprint.codes) <= len(indexed) + _EDGE_FRAMES
+            )
+            if (
+                rate <= MAX_BIT_ERROR_RATE
+                and contained
+                and compared >= MIN_MATCH_SECONDS * FRAME_RATE / 2
+            ):
+                matches.append(
+                    Match(
+                        video_id=video_id,
+                        audio_path=Path(row["audio_path"]),
+                        offset=offset / FRAME_RATE,
+                        duration=fingerprint.duration,
+                        matched_duration=len(indexed) / FRAME_RATE,
+                        bit_error_rate=rate,
+                    )
+                )
+        matches.sort(key=lambda match: (not match.exact, match.bit_error_rate))
+        return matches
+
+
+def reuse_transcript(transcript: dict[str, Any], match: Match) -> dict[str, Any]:
+    """Transcript of a query audio, taken from the transcript of its match.
+
+    A reupload gets the whole transcript. For a clip, the words spoken within
+    it are kept and moved to clip time; chunk boundaries and preprocessing
+    savings of the original no longer apply and are dropped.
+
+    Args:
+        transcript: Transcript of the matched file.
+        match: The match, from FingerprintIndex.find.
+
+    Returns:
+        The transcript, with the match recorded under 'duplicate_of'.
+    """
+    source = {
+        "video_id": match.video_id,
+        "offset": round(match.offset, 3),
+        "bit_error_rate": round(match.bit_error_rate, 3),
+    }
+    if match.exact:
+        return {**transcript, "duplicate_of": source}
+
+    start, end = match.offset, match.offset + match.duration
+    words = []
+    for word in transcript.get("words") or []:
+        if word.get("start") is None or not start <= word["start"] < end:
+            continue
+        word = dict(word)
+        for key in ("start", "end"):
+            if word.get(key) is not None:
+                word[key] = round(min(max(word[key] - start, 0.0), match.duration), 3)
+        words.append(word)
+
+    # Words cut at the start leave their trailing spacing behind
+    while words and words[0].get("type") == "spacing":
+        words.pop(0)
+
+    kept = {
+        key: value
+        for key, value in transcript.items()
+        if key not in ("text", "words", "chunks", "preprocess", "duplicate_of")
+    }
+    return {
+        **kept,
+        "text": "".join(word.get("text", "") for word in words).strip(),
+        "words": words,
+        "duplicate_of": source,
+    }
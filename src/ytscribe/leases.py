@@ -0,0 +1,328 @@
+"""Expiring leases on videos, for several workers sharing one data directory.
+
+Workers on one machine or many (over a shared filesystem) can fetch the same
+playlist into the same DOWNLOAD_ROOT and TRANSCRIPT_ROOT. Before a worker
+downloads a video it claims a lease: a lock file created with O_EXCL, which
+exactly one worker can create. A heartbeat thread refreshes the lock files'
+modification times while the work is in progress. Once the worker's ledger
+shows the video as finished, the lease is replaced by a `.done` marker, and
+other workers skip the video. A lease whose file hasn't been refreshed for
+`ttl` seconds belongs to a crashed worker and is taken over by the next
+worker that tries to claim it.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from ytscribe.metrics import Metrics
+
+# Default seconds without a heartbeat after which a lease is considered dead
+DEFAULT_TTL = 300.0
+
+# How often finished leases are settled and other workers' leases re-checked
+_POLL_SECONDS = 1.0
+
+_LEASE_SUFFIX = ".lease"
+_DONE_SUFFIX = ".done"
+
+
+class LeaseSet:
+    """The leases one worker holds in a shared lease directory.
+
+    Use as a context manager, or call start() and close(): the heartbeat runs
+    in between, and close() settles every lease still held.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        worker_id: str,
+        ttl: float = DEFAULT_TTL,
+        outcome: Optional[Callable[[str, float], Optional[bool]]] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the lease set (the heartbeat starts with start()).
+
+        Args:
+            directory: Lease directory shared by all workers.
+            worker_id: Name of this worker, unique among the workers.
+            ttl: Seconds without a heartbeat after which another worker may
+                take a lease over. Must comfortably exceed clock differences
+                between machines.
+            outcome: Called with a held key and the Unix time it was claimed
+                on each heartbeat: True when the work is done (the lease
+                becomes a done marker), False when it failed (the lease is
+                released for another worker to retry), None while it is in
+                progress.
+            metrics: Run metrics to count taken-over leases in.
+
+        Raises:
+            ValueError: If worker_id is empty or ttl is not positive.
+        """
+        if not worker_id:
+            raise ValueError("Worker ID must not be empty")
+        if ttl <= 0:
+            raise ValueError("Lease TTL must be positive")
+        self.directory = directory
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self.outcome = outcome
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Held key → Unix time it was claimed
+        self._held: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def heartbeat_interval(self) -> float:
+        """Seconds between heartbeats (a third of the TTL)."""
+        return self.ttl / 3
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / (key.replace(os.sep, "_") + suffix)
+
+    def is_done(self, key: str) -> bool:
+        """Whether any worker has finished the work for a key."""
+        return self._path(key, _DONE_SUFFIX).exists()
+
+    def held(self) -> dict[str, float]:
+        """Keys this worker currently holds, with the time each was claimed."""
+        with self._lock:
+            return dict(self._held)
+
+    def claim(self, key: str) -> bool:
+        """Try to take the lease on a key.
+
+        Args:
+            key: Work item, e.g. a video ID.
+
+        Returns:
+            True if this worker now holds the lease, False if another live
+            worker holds it or the work is already done.
+        """
+        if self.is_done(key):
+            return False
+        path = self._path(key, _LEASE_SUFFIX)
+        # Second attempt after breaking an expired lease
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if not self._break_expired(key, path):
+                    return False
+                continue
+            claimed_at = time.time()
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {
+                        "worker": self.worker_id,
+                        "host": socket.gethostname(),
+                        "pid": os.getpid(),
+                        "claimed_at": claimed_at,
+                    },
+                    f,
+                )
+            with self._lock:
+                self._held[key] = claimed_at
+            return True
+        return False
+
+    def _break_expired(self, key: str, path: Path) -> bool:
+        """Remove another worker's lease if its heartbeat has stopped.
+
+        Returns:
+            True if the lease is gone (expired or released), so claiming can
+            be retried.
+        """
+        try:
+            expired = path.stat()
+        except FileNotFoundError:
+            return True
+        age = time.time() - expired.st_mtime
+        if age < self.ttl:
+            return False
+
+        # Renaming is atomic: of several workers breaking the same lease,
+        # exactly one succeeds and the rest see the file gone
+        broken = path.with_name(f"{path.name}.{uuid.uuid4().hex}.expired")
+        try:
+            os.rename(path, broken)
+        except FileNotFoundError:
+            return True
+        # Another worker may have broken the expired lease and claimed the
+        # key between the stat and the rename, so the renamed file can be
+        # its fresh lease: put that back instead of taking the key over
+        renamed = broken.stat()
+        if (renamed.st_ino, renamed.st_mtime_ns) != (
+            expired.st_ino,
+            expired.st_mtime_ns,
+        ):
+            try:
+                # Linking doesn't replace a lease created in the meantime
+                os.link(broken, path)
+            except FileExistsError:
+                pass
+            broken.unlink(missing_ok=True)
+            return False
+        owner = _read_owner(broken)
+        broken.unlink(missing_ok=True)
+        print(
+            f"♻️  Taking over {key} from {owner or 'an unknown worker'} "
+            f"(no heartbeat for {age:.0f}s)"
+        )
+        self.metrics.inc("leases_reclaimed_total")
+        return True
+
+    def complete(self, key: str) -> None:
+        """Mark a key's work as done and drop its lease."""
+        self._path(key, _DONE_SUFFIX).touch()
+        self.release(key)
+
+    def release(self, key: str) -> None:
+        """Give up a lease so another worker can claim the key."""
+        with self._lock:
+            self._held.pop(key, None)
+        path = self._path(key, _LEASE_SUFFIX)
+        if _read_owner(path) == self.worker_id:
+            path.unlink(missing_ok=True)
+
+    def heartbeat(self, refresh: bool = True) -> None:
+        """Settle finished leases and refresh the rest (see outcome).
+
+        Args:
+            refresh: Also touch the leases still in progress.
+        """
+        for key, claimed_at in self.held().items():
+            result = self.outcome(key, claimed_at) if self.outcome else None
+            if result is True:
+                self.complete(key)
+                continue
+            if result is False:
+                self.release(key)
+                continue
+            if not refresh:
+                continue
+
+            path = self._path(key, _LEASE_SUFFIX)
+            try:
+                if _read_owner(path) != self.worker_id:
+                    raise FileNotFoundError(path)
+                os.utime(path)
+            except FileNotFoundError:
+                # A late heartbeat let another worker take it over
+                with self._lock:
+                    self._held.pop(key, None)
+                print(f"⚠️  Lost the lease on {key} to another worker")
+
+    def _run(self) -> None:
+        # Settle often so waiting workers see done markers soon; touch the
+        # lease files only once per heartbeat interval
+        refreshed = time.monotonic()
+        while not self._stopped.wait(min(_POLL_SECONDS, self.heartbeat_interval)):
+            refresh = time.monotonic() - refreshed >= self.heartbeat_interval
+            try:
+                self.heartbeat(refresh)
+            except OSError as e:
+                print(f"⚠️  Lease heartbeat failed: {e}")
+            if refresh:
+                refreshed = time.monotonic()
+
+    def start(self) -> None:
+        """Start the heartbeat thread."""
+        self._thread = threading.Thread(target=self._run, name="leases", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the heartbeat and settle every lease still held.
+
+        Finished work becomes done markers; anything else is released so
+        another worker picks it up without waiting for the TTL.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        for key, claimed_at in self.held().items():
+            if self.outcome and self.outcome(key, claimed_at):
+                self.complete(key)
+            else:
+                self.release(key)
+
+    def __enter__(self) -> "LeaseSet":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _read_owner(path: Path) -> Optional[str]:
+    """Worker ID recorded in a lease file, or None if unreadable."""
+    try:
+        return json.loads(path.read_text())["worker"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def claim_entries(
+    entries: Iterable[dict[str, Any]], leases: LeaseSet, wait: bool = False
+) -> Iterator[dict[str, Any]]:
+    """Yield only the entries this worker wins the lease for.
+
+    Entries another worker holds are tried again after the listing ends, by
+    which time many are done or released. With `wait`, they are polled until
+    each is done or claimed, so entries held by a worker that crashes are
+    taken over once its leases expire.
+
+    Args:
+        entries: Video entries with an 'id' (entries without one pass through).
+        leases: This worker's lease set.
+        wait: Keep polling entries held by other workers until they settle.
+            Only safe when this worker's own leases settle without waiting
+            for the iteration to end (e.g. pipelined runs).
+
+    Yields:
+        Entries leased to this worker.
+    """
+    deferred = []
+    done = 0
+    for entry in entries:
+        video_id = entry.get("id")
+        if not video_id:
+            yield entry
+        elif leases.is_done(video_id):
+            done += 1
+        elif leases.claim(video_id):
+            yield entry
+        else:
+            deferred.append(entry)
+
+    reported = None
+    while deferred:
+        waiting = []
+        for entry in deferred:
+            if leases.is_done(entry["id"]):
+                done += 1
+            elif leases.claim(entry["id"]):
+                yield entry
+            else:
+                waiting.append(entry)
+        deferred = waiting
+        if not deferred or not wait:
+            break
+        if len(deferred) != reported:
+            reported = len(deferred)
+            print(f"⏳ Waiting on {reported} video(s) leased by other workers")
+        time.sleep(min(_POLL_SECONDS, leases.heartbeat_interval))
+
+    if done:
+        print(f"⏭  {done} video(s) already done by other workers")
+    if deferred:
+        print(f"⏭  {len(deferred)} video(s) left to the workers holding them")
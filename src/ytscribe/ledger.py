@@ -0,0 +1,567 @@
+"""Persistent SQLite job ledger.
+
+Tracks every video ID through the states enumerated → downloaded →
+transcribing → transcribed (or failed), with timings, byte sizes and error
+text, so interrupted runs can resume exactly where they stopped.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ytscribe.storage import strip_compression
+
+ENUMERATED = "enumerated"
+DOWNLOADED = "downloaded"
+TRANSCRIBING = "transcribing"
+TRANSCRIBED = "transcribed"
+FAILED = "failed"
+
+STATES = (ENUMERATED, DOWNLOADED, TRANSCRIBING, TRANSCRIBED, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    source_url TEXT,
+    url TEXT,
+    title TEXT,
+    playlist_title TEXT,
+    state TEXT NOT NULL,
+    failed_stage TEXT,
+    error TEXT,
+    audio_path TEXT,
+    audio_bytes INTEGER,
+    duration_seconds REAL,
+    json_path TEXT,
+    md_path TEXT,
+    download_seconds REAL,
+    transcribe_seconds REAL,
+    enumerated_at REAL,
+    downloaded_at REAL,
+    transcribed_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_state ON videos (state);
+CREATE INDEX IF NOT EXISTS videos_source ON videos (source_url, state);
+CREATE TABLE IF NOT EXISTS video_sources (
+    source_url TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    PRIMARY KEY (source_url, video_id)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    source_url TEXT PRIMARY KEY,
+    enumeration_complete INTEGER NOT NULL DEFAULT 0,
+    entry_count INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_cursors (
+    source_url TEXT PRIMARY KEY,
+    recent_ids TEXT NOT NULL,
+    newest_upload_date TEXT,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS webhook_requests (
+    request_id TEXT PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    audio_path TEXT NOT NULL,
+    cache_key TEXT,
+    submitted_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS webhook_requests_video ON webhook_requests (video_id);
+"""
+
+# Columns added after the first release: (table, column, type)
+_ADDED_COLUMNS = (("videos", "duration_seconds", "REAL"),)
+
+
+def video_id_from_path(audio_path: Path) -> str:
+    """Extract the video ID from a `{upload_date}_{video_id}` file name.
+
+    Args:
+        audio_path: Audio or transcript path.
+
+    Returns:
+        The video ID (YouTube IDs may themselves contain underscores).
+    """
+    stem = strip_compression(audio_path).stem
+    _, _, video_id = stem.partition("_")
+    return video_id or stem
+
+
+class Ledger:
+    """Thread-safe SQLite store of per-video job state."""
+
+    def __init__(self, path: Path) -> None:
+        """Open (and create if needed) the ledger database.
+
+        Args:
+            path: Path to the SQLite file.
+        """
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        has_links = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'video_sources'"
+        ).fetchone()
+        self._conn.executescript(_SCHEMA)
+        if not has_links:
+            # Ledgers from before videos could belong to several sources
+            self._conn.execute(
+                """
+                INSERT OR IGNORE INTO video_sources (source_url, video_id)
+                SELECT source_url, video_id FROM videos WHERE source_url IS NOT NULL
+                """
+            )
+        for table, column, kind in _ADDED_COLUMNS:
+            columns = {
+                row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")
+            }
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple[Any, ...] = ()) -> list[sqlite3.Row]:
+        """Run a statement under the connection lock and fetch all rows."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get(self, video_id: str) -> Optional[dict[str, Any]]:
+        """Look up a video by ID.
+
+        Args:
+            video_id: YouTube video ID.
+
+        Returns:
+            The ledger row as a dictionary, or None if unknown.
+        """
+        rows = self._execute("SELECT * FROM videos WHERE video_id = ?", (video_id,))
+        return dict(rows[0]) if rows else None
+
+    def record_enumerated(self, entry: dict[str, Any], source_url: str) -> None:
+        """Record a video found while listing a source.
+
+        Videos already known keep their state and first source; only the
+        listing details are refreshed. A video listed by several sources
+        counts as one of each of them (see unfinished and counts).
+
+        Args:
+            entry: Video info dictionary (flat or full) from yt-dlp.
+            source_url: URL the video was listed from.
+        """
+        now = time.time()
+        self._execute(
+            """
+            INSERT INTO videos (video_id, source_url, url, title, playlist_title,
+                                duration_seconds, state, enumerated_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (video_id) DO UPDATE SET
+                source_url = COALESCE(videos.source_url, excluded.source_url),
+                url = COALESCE(excluded.url, videos.url),
+                title = COALESCE(excluded.title, videos.title),
+                playlist_title = COALESCE(excluded.playlist_title, videos.playlist_title),
+                duration_seconds = COALESCE(excluded.duration_seconds,
+                                            videos.duration_seconds)
+            """,
+            (
+                entry["id"],
+                source_url,
+                entry.get("webpage_url") or entry.get("url"),
+                entry.get("title"),
+                entry.get("playlist_title"),
+                entry.get("duration"),
+                ENUMERATED,
+                now,
+                now,
+            ),
+        )
+        self._execute(
+            "INSERT OR IGNORE INTO video_sources (source_url, video_id) VALUES (?, ?)",
+            (source_url, entry["id"]),
+        )
+
+    def mark_downloaded(
+        self,
+        video_id: str,
+        audio_path: Path,
+        seconds: Optional[float] = None,
+        duration: Optional[float] = None,
+    ) -> None:
+        """Record a finished (or already present) download.
+
+        Args:
+            video_id: YouTube video ID.
+            audio_path: Path to the audio file.
+            seconds: Download duration, if the file was downloaded in this run.
+            duration: Length of the video in seconds, from its metadata.
+        """
+        now = time.time()
+        size = audio_path.stat().st_size if audio_path.exists() else None
+        self._execute(
+            """
+            INSERT INTO videos (video_id, state, audio_path, audio_bytes,
+                                duration_seconds, download_seconds, downloaded_at,
+                                updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (video_id) DO UPDATE SET
+                state = CASE WHEN videos.state = 'transcribed'
+                             THEN videos.state ELSE excluded.state END,
+                audio_path = excluded.audio_path,
+                audio_bytes = excluded.audio_bytes,
+                duration_seconds = COALESCE(excluded.duration_seconds,
+                                            videos.duration_seconds),
+                download_seconds = COALESCE(excluded.download_seconds,
+                                            videos.download_seconds),
+                downloaded_at = excluded.downloaded_at,
+                failed_stage = NULL,
+                error = NULL,
+                updated_at = excluded.updated_at
+            """,
+            (video_id, DOWNLOADED, str(audio_path), size, duration, seconds, now, now),
+        )
+
+    def mark_transcribing(self, video_id: str) -> None:
+        """Record that a transcription request has started."""
+        now = time.time()
+        self._execute(
+            """
+            INSERT INTO videos (video_id, state, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (video_id) DO UPDATE SET
+                state = excluded.state,
+                updated_at = excluded.updated_at
+            """,
+            (video_id, TRANSCRIBING, now),
+        )
+
+    def mark_transcribed(
+        self,
+        video_id: str,
+        json_path: Path,
+        md_path: Path,
+        seconds: Optional[float],
+    ) -> None:
+        """Record a finished transcription.
+
+        Args:
+            video_id: YouTube video ID.
+            json_path: Path to the JSON transcript.
+            md_path: Path to the Markdown transcript.
+            seconds: Transcription duration, if known.
+        """
+        now = time.time()
+        self._execute(
+            """
+            INSERT INTO videos (video_id, state, json_path, md_path,
+                                transcribe_seconds, transcribed_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (video_id) DO UPDATE SET
+                state = excluded.state,
+                json_path = excluded.json_path,
+                md_path = excluded.md_path,
+                transcribe_seconds = excluded.transcribe_seconds,
+                transcribed_at = excluded.transcribed_at,
+                failed_stage = NULL,
+                error = NULL,
+                updated_at = excluded.updated_at
+            """,
+            (video_id, TRANSCRIBED, str(json_path), str(md_path), seconds, now, now),
+        )
+
+    def mark_failed(self, video_id: str, stage: str, error: str) -> None:
+        """Record a failure.
+
+        Args:
+            video_id: YouTube video ID.
+            stage: Stage that failed ('download' or 'transcribe').
+            error: Error message.
+        """
+        now = time.time()
+        self._execute(
+            """
+            INSERT INTO videos (video_id, state, failed_stage, error, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (video_id) DO UPDATE SET
+                state = excluded.state,
+                failed_stage = excluded.failed_stage,
+                error = excluded.error,
+                updated_at = excluded.updated_at
+            """,
+            (video_id, FAILED, stage, error, now),
+        )
+
+    def mark_source_complete(self, source_url: str, entry_count: int) -> None:
+        """Record that a source has been listed to the end.
+
+        Args:
+            source_url: Playlist, channel or video URL.
+            entry_count: Number of entries listed.
+        """
+        self._execute(
+            """
+            INSERT INTO sources (source_url, enumeration_complete, entry_count,
+                                 updated_at)
+            VALUES (?, 1, ?, ?)
+            ON CONFLICT (source_url) DO UPDATE SET
+                enumeration_complete = 1,
+                entry_count = excluded.entry_count,
+                updated_at = excluded.updated_at
+            """,
+            (source_url, entry_count, time.time()),
+        )
+
+    def is_source_complete(self, source_url: str) -> bool:
+        """Check whether a source was fully listed by an earlier run."""
+        rows = self._execute(
+            "SELECT enumeration_complete FROM sources WHERE source_url = ?",
+            (source_url,),
+        )
+        return bool(rows and rows[0]["enumeration_complete"])
+
+    def get_cursor(self, source_url: str) -> Optional[dict[str, Any]]:
+        """Look up the sync cursor of a source.
+
+        Args:
+            source_url: Channel, playlist or video URL.
+
+        Returns:
+            The cursor (with 'recent_ids' as a list, newest first), or None if
+            the source has never been synced.
+        """
+        rows = self._execute(
+            "SELECT * FROM sync_cursors WHERE source_url = ?", (source_url,)
+        )
+        if not rows:
+            return None
+        cursor = dict(rows[0])
+        cursor["recent_ids"] = json.loads(cursor["recent_ids"])
+        return cursor
+
+    def save_cursor(
+        self,
+        source_url: str,
+        recent_ids: list[str],
+        newest_upload_date: Optional[str] = None,
+    ) -> None:
+        """Store the sync cursor of a source.
+
+        Args:
+            source_url: Channel, playlist or video URL.
+            recent_ids: Newest video IDs seen, newest first.
+            newest_upload_date: Upload date (YYYYMMDD) of the newest video
+                seen; None keeps the stored date.
+        """
+        self._execute(
+            """
+            INSERT INTO sync_cursors (source_url, recent_ids, newest_upload_date,
+                                      synced_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (source_url) DO UPDATE SET
+                recent_ids = excluded.recent_ids,
+                newest_upload_date = COALESCE(excluded.newest_upload_date,
+                                              sync_cursors.newest_upload_date),
+                synced_at = excluded.synced_at
+            """,
+            (source_url, json.dumps(recent_ids), newest_upload_date, time.time()),
+        )
+
+    def is_known(self, video_id: str) -> bool:
+        """Check whether a video has been listed by any earlier run."""
+        rows = self._execute("SELECT 1 FROM videos WHERE video_id = ?", (video_id,))
+        return bool(rows)
+
+    def unfinished(
+        self, source_url: str, done_states: tuple[str, ...] = (TRANSCRIBED,)
+    ) -> list[dict[str, Any]]:
+        """List a source's videos that haven't been transcribed yet.
+
+        Args:
+            source_url: Playlist, channel or video URL.
+            done_states: States of videos that need no more work, e.g.
+                (DOWNLOADED, TRANSCRIBED) for download-only runs.
+
+        Returns:
+            Ledger rows in enumeration order.
+        """
+        placeholders = ", ".join("?" * len(done_states))
+        rows = self._execute(
+            f"""
+            SELECT videos.* FROM videos JOIN video_sources USING (video_id)
+            WHERE video_sources.source_url = ? AND state NOT IN ({placeholders})
+            ORDER BY enumerated_at
+            """,
+            (source_url, *done_states),
+        )
+        return [dict(row) for row in rows]
+
+    def unfinished_entries(
+        self, source_url: str, done_states: tuple[str, ...] = (TRANSCRIBED,)
+    ) -> list[dict[str, Any]]:
+        """Rebuild flat playlist entries for a source's unfinished videos.
+
+        Lets a resumed run skip re-listing a source that was fully enumerated.
+
+        Args:
+            source_url: Playlist, channel or video URL.
+            done_states: States of videos that need no more work (see
+                unfinished).
+
+        Returns:
+            Flat yt-dlp style entries, accepted by AudioDownloader.download_entry.
+        """
+        return [
+            {
+                "_type": "url",
+                "ie_key": "Youtube",
+                "id": row["video_id"],
+                "url": row["url"]
+                or f"https://www.youtube.com/watch?v={row['video_id']}",
+                "title": row["title"],
+                "playlist_title": row["playlist_title"],
+            }
+            for row in self.unfinished(source_url, done_states)
+        ]
+
+    def add_webhook_request(
+        self,
+        request_id: str,
+        video_id: str,
+        audio_path: Path,
+        cache_key: Optional[str] = None,
+    ) -> None:
+        """Record a transcription submitted in webhook mode.
+
+        Args:
+            request_id: Request ID returned by ElevenLabs.
+            video_id: YouTube video ID.
+            audio_path: Path to the submitted audio file.
+            cache_key: Cache key to store the result under, if caching is on.
+        """
+        self._execute(
+            """
+            INSERT OR REPLACE INTO webhook_requests
+                (request_id, video_id, audio_path, cache_key, submitted_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (request_id, video_id, str(audio_path), cache_key, time.time()),
+        )
+
+    def get_webhook_request(self, request_id: str) -> Optional[dict[str, Any]]:
+        """Look up a pending webhook transcription by request ID."""
+        rows = self._execute(
+            "SELECT * FROM webhook_requests WHERE request_id = ?", (request_id,)
+        )
+        return dict(rows[0]) if rows else None
+
+    def remove_webhook_request(self, request_id: str) -> None:
+        """Forget a webhook transcription once its callback has been handled."""
+        self._execute(
+            "DELETE FROM webhook_requests WHERE request_id = ?", (request_id,)
+        )
+
+    def webhook_requests(self) -> list[dict[str, Any]]:
+        """List webhook transcriptions still waiting for a callback, oldest first."""
+        rows = self._execute("SELECT * FROM webhook_requests ORDER BY submitted_at")
+        return [dict(row) for row in rows]
+
+    def has_webhook_request(self, video_id: str) -> bool:
+        """Check whether a video has a webhook transcription in flight."""
+        rows = self._execute(
+            "SELECT 1 FROM webhook_requests WHERE video_id = ?", (video_id,)
+        )
+        return bool(rows)
+
+    def transcription_speed(self) -> Optional[float]:
+        """Seconds of transcription per second of audio in earlier runs.
+
+        Returns:
+            The ratio over all transcribed videos of known length, or None
+            if there are none yet.
+        """
+        rows = self._execute(
+            """
+            SELECT SUM(transcribe_seconds) AS spent, SUM(duration_seconds) AS audio
+            FROM videos
+            WHERE state = ? AND transcribe_seconds > 0 AND duration_seconds > 0
+            """,
+            (TRANSCRIBED,),
+        )
+        if not rows or not rows[0]["audio"]:
+            return None
+        return rows[0]["spent"] / rows[0]["audio"]
+
+    def is_transcribed(self, video_id: str) -> bool:
+        """Check whether a video has been transcribed by an earlier run."""
+        rows = self._execute(
+            "SELECT 1 FROM videos WHERE video_id = ? AND state = ?",
+            (video_id, TRANSCRIBED),
+        )
+        return bool(rows)
+
+    def counts(self, source_url: Optional[str] = None) -> dict[str, int]:
+        """Count videos per state.
+
+        Args:
+            source_url: Restrict to one source, or None for all videos.
+
+        Returns:
+            Mapping of state to number of videos (every state is present).
+        """
+        if source_url is None:
+            rows = self._execute(
+                "SELECT state, COUNT(*) AS n FROM videos GROUP BY state"
+            )
+        else:
+            rows = self._execute(
+                """
+                SELECT state, COUNT(*) AS n FROM videos JOIN video_sources USING (video_id)
+                WHERE video_sources.source_url = ? GROUP BY state
+                """,
+                (source_url,),
+            )
+        counts = dict.fromkeys(STATES, 0)
+        counts.update({row["state"]: row["n"] for row in rows})
+        return counts
+
+    def rows(
+        self,
+        state: Optional[str] = None,
+        source_url: Optional[str] = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """List videos, most recently updated first.
+
+        Args:
+            state: Restrict to one state.
+            source_url: Restrict to one source.
+            limit: Maximum number of rows.
+
+        Returns:
+            Ledger rows as dictionaries.
+        """
+        clauses = []
+        params: list[Any] = []
+        if state is not None:
+            clauses.append("state = ?")
+            params.append(state)
+        if source_url is not None:
+            clauses.append(
+                "video_id IN (SELECT video_id FROM video_sources WHERE source_url = ?)"
+            )
+            params.append(source_url)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._execute(
+            f"SELECT * FROM videos {where} ORDER BY updated_at DESC LIMIT ?",
+            (*params, limit),
+        )
+        return [dict(row) for row in rows]
@@ -0,0 +1,340 @@
+"""Per-stage timing spans and run metrics.
+
+Each run collects spans (one timed stage of one video: source listing, metadata
+extraction, download, FFmpeg post-processing, pre-upload processing, upload,
+server-side transcription wait, output writing) plus counters and histograms.
+The result can be written as a per-run JSON report and as a Prometheus
+textfile-collector file.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from ytscribe.profiling import NullProfiler
+from ytscribe.storage import atomic_write
+
+# Histogram bucket upper bounds for stage durations, in seconds
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Prefix for every exported metric name
+_PREFIX = "ytscribe_"
+
+_HELP = {
+    "stage_duration_seconds": "Time spent per pipeline stage and video.",
+    "bytes_downloaded_total": "Audio bytes downloaded from YouTube.",
+    "bytes_uploaded_total": "Audio bytes uploaded to the transcription API.",
+    "audio_minutes_transcribed_total": "Minutes of audio transcribed by the API.",
+    "transcripts_total": "Transcripts written, by whether they came from the cache.",
+    "retries_total": "Calls retried after a transient error or throttling.",
+    "failures_total": "Videos that failed, by stage.",
+    "postprocess_total": "Downloads converted to .opus, by rename, copy or transcode.",
+    "preprocess_bytes_saved_total": "Upload bytes saved by pre-processing audio.",
+    "preprocess_seconds_saved_total": "Audio seconds cut by shortening silences.",
+    "sync_new_videos_total": "New videos found by ytscribe sync.",
+    "circuit_breaker_trips_total": "Pauses of all requests after upstream throttling.",
+    "leases_reclaimed_total": "Video leases taken over from workers that stopped.",
+    "duplicates_total": "Transcripts reused from a reupload or the video a clip is from.",
+}
+
+
+@dataclass
+class Span:
+    """One timed stage of the work on a video.
+
+    Attributes:
+        stage: Stage name, e.g. 'download' or 'upload'.
+        video_id: Video the work was for, if known.
+        start: Seconds since the run started.
+        duration: Length of the stage in seconds.
+        attrs: Extra details such as byte counts.
+    """
+
+    stage: str
+    video_id: Optional[str]
+    start: float
+    duration: float = 0.0
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+
+def _labels_key(labels: dict[str, Any]) -> tuple[tuple[str, str], ...]:
+    """Turn label keyword arguments into a hashable, sorted key."""
+    return tuple(
+        sorted(
+            (k, str(v).lower() if isinstance(v, bool) else str(v))
+            for k, v in labels.items()
+        )
+    )
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    """Format labels in the Prometheus exposition syntax."""
+    if not labels:
+        return ""
+    escaped = (
+        k
+        + '="'
+        + v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        + '"'
+        for k, v in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value (integers without a trailing .0)."""
+    if math.isinf(value):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metrics:
+    """Thread-safe collector of spans, counters and histograms for one run."""
+
+    def __init__(self) -> None:
+        """Start a new, empty run."""
+        # Every span's block runs under it; replaced by a Profiler to
+        # profile the run (see ytscribe.profiling)
+        self.profiler = NullProfiler()
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self.spans: list[Span] = []
+        self._counters: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+        # name → labels → (bucket counts, sum, count)
+        self._histograms: dict[
+            str, dict[tuple[tuple[str, str], ...], tuple[list[int], float, int]]
+        ] = {}
+
+    @contextmanager
+    def span(
+        self, stage: str, video_id: Optional[str] = None, **attrs: Any
+    ) -> Iterator[Span]:
+        """Time a block of work as one stage of one video.
+
+        The yielded span's attrs can be filled in inside the block (e.g. with
+        byte counts known only at the end). The span is recorded even if the
+        block raises, with attrs['error'] set.
+
+        Args:
+            stage: Stage name.
+            video_id: Video the work is for.
+            **attrs: Extra details stored with the span.
+
+        Yields:
+            The span being timed.
+        """
+        started = time.monotonic()
+        span = Span(stage, video_id, started - self._started, attrs=dict(attrs))
+        try:
+            with self.profiler.stage(stage, video_id):
+                yield span
+        except BaseException as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            span.duration = time.monotonic() - started
+            self._add_span(span)
+
+    def record(
+        self,
+        stage: str,
+        started: float,
+        finished: float,
+        video_id: Optional[str] = None,
+        **attrs: Any,
+    ) -> None:
+        """Record a stage timed elsewhere (e.g. from progress hooks).
+
+        Args:
+            stage: Stage name.
+            started: time.monotonic() when the stage began.
+            finished: time.monotonic() when the stage ended.
+            video_id: Video the work was for.
+            **attrs: Extra details stored with the span.
+        """
+        span = Span(stage, video_id, started - self._started, finished - started)
+        span.attrs.update(attrs)
+        self._add_span(span)
+
+    def _add_span(self, span: Span) -> None:
+        """Store a finished span and add it to the stage duration histogram."""
+        with self._lock:
+            self.spans.append(span)
+        self.observe("stage_duration_seconds", span.duration, stage=span.stage)
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """Add to a counter.
+
+        Args:
+            name: Counter name (without the ytscribe_ prefix).
+            value: Amount to add.
+            **labels: Label values identifying the series.
+        """
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Add a sample to a histogram with the duration buckets.
+
+        Args:
+            name: Histogram name (without the ytscribe_ prefix).
+            value: Observed value.
+            **labels: Label values identifying the series.
+        """
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            buckets, total, count = series.get(
+                key, ([0] * len(DURATION_BUCKETS), 0.0, 0)
+            )
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    buckets[i] += 1
+            series[key] = (buckets, total + value, count + 1)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Current value of one counter series (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels_key(labels), 0.0)
+
+    def stage_summary(self) -> dict[str, dict[str, float]]:
+        """Per-stage span count, total, mean and maximum duration in seconds."""
+        with self._lock:
+            spans = list(self.spans)
+        summary: dict[str, dict[str, float]] = {}
+        for span in spans:
+            stats = summary.setdefault(
+                span.stage, {"count": 0, "total": 0.0, "mean": 0.0, "max": 0.0}
+            )
+            stats["count"] += 1
+            stats["total"] += span.duration
+            stats["max"] = max(stats["max"], span.duration)
+        for stats in summary.values():
+            stats["mean"] = stats["total"] / stats["count"]
+        return summary
+
+    def to_dict(self) -> dict[str, Any]:
+        """The run as a JSON-serialisable dictionary."""
+        with self._lock:
+            spans = [asdict(span) for span in self.spans]
+            counters = {
+                name: [
+                    {"labels": dict(key), "value": value}
+                    for key, value in series.items()
+                ]
+                for name, series in self._counters.items()
+            }
+        return {
+            "started_at": self.started_at,
+            "duration": time.monotonic() - self._started,
+            "stages": self.stage_summary(),
+            "counters": counters,
+            "spans": spans,
+        }
+
+    def to_prometheus(self) -> str:
+        """The counters and histograms in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = _PREFIX + name
+                if name in _HELP:
+                    lines.append(f"# HELP {metric} {_HELP[name]}")
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(
+                        f"{metric}{_format_labels(key)} {_format_value(value)}"
+                    )
+
+            for name, series in sorted(self._histograms.items()):
+                metric = _PREFIX + name
+                if name in _HELP:
+                    lines.append(f"# HELP {metric} {_HELP[name]}")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, (buckets, total, count) in sorted(series.items()):
+                    for bound, bucket_count in zip(
+                        (*DURATION_BUCKETS, math.inf), (*buckets, count)
+                    ):
+                        labels = _format_labels(
+                            (*key, ("le", _format_value(float(bound))))
+                        )
+                        lines.append(f"{metric}_bucket{labels} {bucket_count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {total!r}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {count}")
+
+        metric = _PREFIX + "last_run_timestamp_seconds"
+        lines.append(f"# HELP {metric} When the last run started.")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {self.started_at!r}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path: Path) -> tuple[Path, Path]:
+        """Write the JSON report and a Prometheus textfile next to it.
+
+        Both files are replaced atomically, so a textfile collector never
+        reads a half-written file.
+
+        Args:
+            json_path: Destination of the JSON report; the Prometheus file
+                gets the same name with a .prom suffix.
+
+        Returns:
+            Tuple of (JSON path, Prometheus path).
+        """
+        prom_path = json_path.with_suffix(".prom")
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(json_path) as f:
+            json.dump(self.to_dict(), f, indent=2)
+        with atomic_write(prom_path) as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
+
+
+class TimedUpload:
+    """File wrapper that notes when an HTTP client has read it to the end.
+
+    The multipart body is streamed from the file as it is sent, so the time of
+    the final (empty) read marks the end of the upload; the rest of the request
+    is the server transcribing.
+    """
+
+    def __init__(self, file: Any) -> None:
+        """Wrap an open binary file.
+
+        Args:
+            file: File object passed to the API client.
+        """
+        self._file = file
+        self.bytes_read = 0
+        self.eof_at: Optional[float] = None
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        if data:
+            self.bytes_read += len(data)
+        else:
+            self.eof_at = time.monotonic()
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        # Retried requests rewind the file and upload it again
+        if offset == 0 and whence == os.SEEK_SET:
+            self.bytes_read = 0
+            self.eof_at = None
+        return self._file.seek(offset, whence)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self.read(64 * 1024):
+            yield chunk
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._file, name)
@@ -0,0 +1,205 @@
+"""Pipelined download → transcribe execution.
+
+Runs the download and transcription stages concurrently, connected by a bounded
+queue: each finished audio file is handed to a transcription worker right away
+while later downloads keep going. A full queue blocks the downloaders
+(backpressure), so downloads never run arbitrarily far ahead of the API.
+"""
+
+import queue
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from ytscribe.downloader import AudioDownloader
+from ytscribe.transcriber import Transcriber
+
+# Sentinel telling a transcription worker that no more files will arrive
+_DONE = object()
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of a pipelined run."""
+
+    downloaded: list[Path] = field(default_factory=list)
+    transcribed: list[dict[str, Any]] = field(default_factory=list)
+    failed: list[tuple[Path, Exception]] = field(default_factory=list)
+
+
+class Pipeline:
+    """Streams downloaded audio files into transcription workers."""
+
+    def __init__(
+        self,
+        downloader: AudioDownloader,
+        transcriber: Transcriber,
+        download_workers: int = 1,
+        transcribe_workers: int = 1,
+        queue_size: int = 4,
+        skip_existing: bool = True,
+        transcribe_kwargs: Optional[dict[str, Any]] = None,
+        on_transcribe_start: Optional[Callable[[int, Path], None]] = None,
+        on_transcribed: Optional[Callable[[dict[str, Any]], None]] = None,
+        on_failed: Optional[Callable[[Path, Exception], None]] = None,
+        should_transcribe: Optional[Callable[[Path], bool]] = None,
+    ) -> None:
+        """Initialize the pipeline.
+
+        Args:
+            downloader: Downloader used for the download stage.
+            transcriber: Transcriber used for the transcription stage.
+            download_workers: Number of concurrent download workers.
+            transcribe_workers: Number of concurrent transcription workers.
+            queue_size: Maximum number of downloaded files waiting for
+                transcription before downloads pause.
+            skip_existing: Skip downloads if the file already exists.
+            transcribe_kwargs: Extra keyword arguments for Transcriber.transcribe.
+            on_transcribe_start: Called with (sequence number, path) when a file
+                is picked up for transcription.
+            on_transcribed: Called with the transcriber result on success.
+            on_failed: Called with (path, error) when transcription fails.
+            should_transcribe: Filter for downloaded files; files it rejects
+                are counted as downloaded but not transcribed.
+        """
+        if download_workers < 1 or transcribe_workers < 1:
+            raise ValueError("Worker counts must be at least 1")
+        if queue_size < 1:
+            raise ValueError("Queue size must be at least 1")
+
+        self.downloader = downloader
+        self.transcriber = transcriber
+        self.download_workers = download_workers
+        self.transcribe_workers = transcribe_workers
+        self.queue_size = queue_size
+        self.skip_existing = skip_existing
+        self.transcribe_kwargs = transcribe_kwargs or {}
+        self.on_transcribe_start = on_transcribe_start
+        self.on_transcribed = on_transcribed
+        self.on_failed = on_failed
+        self.should_transcribe = should_transcribe
+
+    def run(self, url: str) -> PipelineResult:
+        """Download and transcribe every video behind a URL.
+
+        Args:
+            url: YouTube video or playlist URL.
+
+        Returns:
+            PipelineResult with downloaded files, transcription results and failures.
+
+        Raises:
+            Exception: If the URL could not be enumerated at all.
+        """
+        return self.run_entries(self.downloader.iter_entries(url))
+
+    def run_entries(self, entries: Iterable[dict[str, Any]]) -> PipelineResult:
+        """Download and transcribe already-enumerated entries.
+
+        Args:
+            entries: Video info dictionaries, e.g. from iter_entries.
+
+        Returns:
+            PipelineResult with downloaded files, transcription results and failures.
+
+        Raises:
+            Exception: If no entries could be enumerated at all.
+        """
+        result = PipelineResult()
+        lock = threading.Lock()
+        # Separate lock for listing: fetching the next page (or waiting for a
+        # lease) must not hold up the transcription workers' bookkeeping
+        list_lock = threading.Lock()
+        ready: queue.Queue[Any] = queue.Queue(maxsize=self.queue_size)
+        pending = iter(enumerate(entries, 1))
+        started = 0
+        enumeration_errors: list[Exception] = []
+
+        def download_worker() -> None:
+            while True:
+                # Entries are enumerated lazily, so listing errors surface here
+                with list_lock:
+                    if enumeration_errors:
+                        return
+                    try:
+                        item = next(pending, None)
+                    except Exception as e:
+                        enumeration_errors.append(e)
+                        return
+                if item is None:
+                    return
+                idx, entry = item
+                label = None
+                if self.download_workers > 1:
+                    label = (
+                        f"[{threading.current_thread().name} {entry.get('id', idx)}]"
+                    )
+                path = self.downloader.download_entry(
+                    entry, idx, None, self.skip_existing, progress_label=label
+                )
+                if path is None:
+                    continue
+                with lock:
+                    result.downloaded.append(path)
+                if self.should_transcribe and not self.should_transcribe(path):
+                    continue
+                # Blocks while the queue is full (backpressure)
+                ready.put(path)
+
+        def transcribe_worker() -> None:
+            nonlocal started
+            while True:
+                path = ready.get()
+                if path is _DONE:
+                    return
+                with lock:
+                    started += 1
+                    seq = started
+                if self.on_transcribe_start:
+                    self.on_transcribe_start(seq, path)
+                try:
+                    transcript = self.transcriber.transcribe(
+                        audio_path=path, **self.transcribe_kwargs
+                    )
+                except Exception as e:
+                    with lock:
+                        result.failed.append((path, e))
+                    if self.on_failed:
+                        self.on_failed(path, e)
+                    continue
+                with lock:
+                    result.transcribed.append(transcript)
+                if self.on_transcribed:
+                    self.on_transcribed(transcript)
+
+        downloaders = [
+            threading.Thread(target=download_worker, name=f"download-{n}", daemon=True)
+            for n in range(self.download_workers)
+        ]
+        transcribers = [
+            threading.Thread(
+                target=transcribe_worker, name=f"transcribe-{n}", daemon=True
+            )
+            for n in range(self.transcribe_workers)
+        ]
+        for thread in downloaders + transcribers:
+            thread.start()
+
+        for thread in downloaders:
+            thread.join()
+        # All downloads finished: release every transcription worker
+        for _ in transcribers:
+            ready.put(_DONE)
+        for thread in transcribers:
+            thread.join()
+
+        if enumeration_errors:
+            if not result.downloaded:
+                raise enumeration_errors[0]
+            print(
+                f"✗ Playlist listing stopped early: {enumeration_errors[0]}",
+                file=sys.stderr,
+            )
+        return result
@@ -0,0 +1,269 @@
+"""Shrink audio before upload: mono, low-bitrate Opus, shortened silences.
+
+The API bills by audio length and every byte has to be uploaded, but YouTube
+audio is usually stereo at ~130 kbps and full of dead air. One FFmpeg pass
+resamples to 16 kHz mono, cuts long silences down to a short pause and encodes
+speech-rate Opus. A TimeMap records which stretches of the original were kept,
+so word timestamps from the processed file can be moved back to original time.
+"""
+
+import subprocess
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from ytscribe.audio import detect_silences, probe_duration
+
+# Audio is cut into frames of this length, so cuts (and the time map) are
+# exact at this resolution
+_FRAME_SECONDS = 0.01
+
+
+@dataclass(frozen=True)
+class PreprocessSettings:
+    """How audio is processed before upload.
+
+    Attributes:
+        bitrate: Opus bitrate for the processed file.
+        sample_rate: Sample rate of the processed file, in Hz.
+        noise_db: Level below which audio counts as silence, in dB.
+        max_silence: Silences longer than this many seconds are shortened to
+            this length; shorter pauses are left alone.
+    """
+
+    bitrate: str = "24k"
+    sample_rate: int = 16000
+    noise_db: float = -40.0
+    max_silence: float = 1.0
+
+
+@dataclass
+class TimeMap:
+    """Maps times in a processed file back to the original file.
+
+    Each kept stretch of the original appears once, in order, as
+    (processed start, original start, length) in seconds.
+    """
+
+    segments: list[tuple[float, float, float]]
+
+    def __post_init__(self) -> None:
+        self._starts = [processed for processed, _, _ in self.segments]
+
+    @classmethod
+    def identity(cls, duration: float) -> "TimeMap":
+        """Time map of a file that was not cut."""
+        return cls([(0.0, 0.0, duration)])
+
+    def to_original(self, seconds: float, end: bool = False) -> float:
+        """Convert a processed-file time to original-file time.
+
+        Args:
+            seconds: Time in the processed file.
+            end: The time ends a word. An end time falling exactly on a cut
+                then maps to the end of the stretch before the cut instead of
+                the start of the one after it.
+
+        Returns:
+            Time in the original file.
+        """
+        find = bisect_left if end else bisect_right
+        index = max(find(self._starts, seconds) - 1, 0)
+        processed, original, length = self.segments[index]
+        return original + min(max(seconds - processed, 0.0), length)
+
+    def restore(self, transcript: dict[str, Any]) -> dict[str, Any]:
+        """Copy of a transcript with word (and event) times in original time."""
+        words = []
+        for word in transcript.get("words") or []:
+            word = dict(word)
+            if word.get("start") is not None:
+                word["start"] = round(self.to_original(word["start"]), 3)
+            if word.get("end") is not None:
+                word["end"] = round(self.to_original(word["end"], end=True), 3)
+            words.append(word)
+        return {**transcript, "words": words}
+
+
+@dataclass
+class PreprocessResult:
+    """A processed audio file and what processing saved.
+
+    Attributes:
+        path: File to upload (the original if processing did not help).
+        time_map: Maps times in `path` back to the original file.
+        original_bytes: Size of the original file.
+        processed_bytes: Size of the file to upload.
+        original_seconds: Duration of the original file.
+        processed_seconds: Duration of the file to upload.
+    """
+
+    path: Path
+    time_map: TimeMap
+    original_bytes: int
+    processed_bytes: int
+    original_seconds: float
+    processed_seconds: float
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.processed_bytes
+
+    @property
+    def seconds_saved(self) -> float:
+        return self.original_seconds - self.processed_seconds
+
+    def summary(self) -> dict[str, Any]:
+        """Savings as a JSON-serialisable dictionary (stored with the transcript)."""
+        stats = asdict(self)
+        del stats["path"], stats["time_map"]
+        stats["cuts"] = len(self.time_map.segments) - 1
+        return stats
+
+
+def _snap(seconds: float) -> float:
+    """Round a time to the frame grid."""
+    return round(round(seconds / _FRAME_SECONDS) * _FRAME_SECONDS, 6)
+
+
+def plan_cuts(
+    duration: float, silences: list[tuple[float, float]], max_silence: float
+) -> TimeMap:
+    """Decide which stretches of a file to keep.
+
+    Every silence longer than max_silence keeps max_silence / 2 at each edge
+    and loses its middle; leading and trailing silence keep only the half next
+    to the speech.
+
+    Args:
+        duration: Length of the original file in seconds.
+        silences: Silent stretches as (start, end) pairs, in order.
+        max_silence: Longest pause to leave as it is.
+
+    Returns:
+        Time map of the kept stretches, on the frame grid.
+    """
+    edge = max_silence / 2
+    duration = _snap(duration)
+    removed = []
+    for start, end in silences:
+        if end - start <= max_silence:
+            continue
+        # silencedetect reports edge silences a few ms short of the file ends
+        cut_start = 0.0 if start <= edge else _snap(start + edge)
+        cut_end = duration if end >= duration - edge else _snap(end - edge)
+        if cut_end > cut_start:
+            removed.append((cut_start, cut_end))
+
+    segments = []
+    processed = position = 0.0
+    for cut_start, cut_end in [*removed, (duration, duration)]:
+        if cut_start > position:
+            length = round(cut_start - position, 6)
+            segments.append((round(processed, 6), position, length))
+            processed += length
+        position = max(position, cut_end)
+    return TimeMap(segments) if segments else TimeMap.identity(duration)
+
+
+def _select_expression(time_map: TimeMap) -> str:
+    """FFmpeg aselect expression keeping the frames of the mapped stretches."""
+    return "+".join(
+        f"gte(t,{original:.2f})*lt(t,{original + length:.2f})"
+        for _, original, length in time_map.segments
+    )
+
+
+def preprocess_audio(
+    audio_path: Path,
+    output_path: Path,
+    settings: Optional[PreprocessSettings] = None,
+) -> PreprocessResult:
+    """Downmix, shorten silences and re-encode an audio file for upload.
+
+    If the processed file would be no smaller and no shorter than the
+    original, the original is returned unchanged.
+
+    Args:
+        audio_path: Audio file to process.
+        output_path: Destination of the processed file (Ogg Opus).
+        settings: Processing settings; defaults to PreprocessSettings().
+
+    Returns:
+        The file to upload, its time map and the savings.
+
+    Raises:
+        FileNotFoundError: If ffmpeg or ffprobe is not installed.
+        ValueError: If the duration of the file could not be determined.
+        RuntimeError: If ffmpeg fails.
+    """
+    settings = settings or PreprocessSettings()
+    original_bytes = audio_path.stat().st_size
+    duration = probe_duration(audio_path)
+    silences = detect_silences(audio_path, settings.noise_db, settings.max_silence)
+    time_map = plan_cuts(duration, silences, settings.max_silence)
+    processed_seconds = round(sum(length for _, _, length in time_map.segments), 6)
+
+    # Fixed-size frames make aselect cut exactly on the planned boundaries
+    frame_samples = round(settings.sample_rate * _FRAME_SECONDS)
+    filters = [
+        f"aresample={settings.sample_rate}",
+        f"asetnsamples=n={frame_samples}:p=0",
+    ]
+    if processed_seconds < _snap(duration):
+        filters += [f"aselect='{_select_expression(time_map)}'", "asetpts=N/SR/TB"]
+
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-i",
+            str(audio_path),
+            "-vn",
+            "-map_metadata",
+            "-1",
+            "-af",
+            ",".join(filters),
+            "-ac",
+            "1",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            settings.bitrate,
+            "-application",
+            "voip",
+            "-f",
+            "ogg",
+            str(output_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg failed to preprocess {audio_path}: {result.stderr[-500:]}"
+        )
+
+    processed_bytes = output_path.stat().st_size
+    if processed_bytes >= original_bytes and processed_seconds >= duration:
+        output_path.unlink()
+        return PreprocessResult(
+            audio_path,
+            TimeMap.identity(duration),
+            original_bytes,
+            original_bytes,
+            duration,
+            duration,
+        )
+    return PreprocessResult(
+        output_path,
+        time_map,
+        original_bytes,
+        processed_bytes,
+        duration,
+        processed_seconds,
+    )
@@ -0,0 +1,400 @@
+"""CPU and memory profiles of a run, per stage and per video.
+
+Every stage timed by ytscribe.metrics (metadata extraction, download, output
+writing, ...) runs inside its profiler's stage() block. With profiling off
+that is a NullProfiler, whose blocks do nothing. With `--profile` it is a
+Profiler, which attributes to the stage and video running on each thread:
+
+- CPU time, from a sampling thread that reads every thread's stack a hundred
+  times a second (collapsed stacks, for flamegraph.pl or speedscope), or from
+  cProfile (pstats files, for pstats or snakeviz). cProfile runs one stage at
+  a time, so stages that overlap a profiled one are only sampled by it when
+  run with one worker per stage.
+- Memory, from tracemalloc: bytes allocated and peak memory per stage (exact
+  with one worker per stage, like cProfile), and a snapshot of where the
+  memory was at the run's peak. Tracing slows down every allocation, so
+  CPU profiles are more faithful without it.
+
+The files are written to a run directory when the profiler stops, together
+with a short summary of the top stages and functions.
+"""
+
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING, ContextManager, Iterator, Optional
+
+if TYPE_CHECKING:
+    import cProfile
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+# Seconds between stack samples
+DEFAULT_SAMPLE_INTERVAL = 0.01
+
+# Frames kept per traceback in tracemalloc snapshots: enough to group by
+# line, and each extra frame makes every allocation slower
+_TRACEBACK_FRAMES = 1
+
+# Allocations by the import system and by tracemalloc itself, left out of
+# the peak report
+_IMPORT_FILTERS = (
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+)
+
+# Stage blocks of a NullProfiler (nullcontext can be entered repeatedly)
+_NULL_STAGE = nullcontext()
+
+# (stage, video ID or None)
+_Key = tuple[str, Optional[str]]
+
+
+class NullProfiler:
+    """Profiler used when profiling is off: every method does nothing."""
+
+    def stage(self, stage: str, video_id: Optional[str] = None) -> ContextManager[None]:
+        """Mark a block as one stage of one video (see Profiler.stage)."""
+        return _NULL_STAGE
+
+    def start(self) -> None:
+        """Start profiling."""
+
+    def stop(self) -> list[str]:
+        """Stop profiling and write the profiles.
+
+        Returns:
+            Summary lines to print.
+        """
+        return []
+
+
+def _frame_name(frame: FrameType) -> str:
+    """Name of a stack frame in collapsed-stack output."""
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def _file_name(video_id: str) -> str:
+    """A video ID made safe to use as a file name."""
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in video_id)
+
+
+def _format_bytes(size: float) -> str:
+    return f"{size / 1024**2:.1f} MB"
+
+
+class Profiler(NullProfiler):
+    """Records CPU and memory profiles of the stages of a run."""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        mode: str = "sampling",
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        memory: bool = True,
+        top: int = 10,
+    ) -> None:
+        """Initialize the profiler (profiling starts with start()).
+
+        Args:
+            output_dir: Run directory to write the profiles to.
+            mode: 'sampling' (collapsed stacks) or 'cprofile' (pstats).
+            interval: Seconds between samples in sampling mode.
+            memory: Also trace memory allocations with tracemalloc.
+            top: Entries per list in the summary.
+
+        Raises:
+            ValueError: If mode is unknown or interval is not positive.
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Profile mode must be one of: {', '.join(PROFILE_MODES)}")
+        if interval <= 0:
+            raise ValueError("Sample interval must be positive")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.interval = interval
+        self.memory = memory
+        self.top = top
+        self._lock = threading.Lock()
+        # Thread ID → stages open on that thread, innermost last
+        self._active: dict[int, list[_Key]] = defaultdict(list)
+        # Sampling mode: (stage, video, stack from the root) → samples
+        self._samples: Counter[tuple[str, Optional[str], tuple[str, ...]]] = Counter()
+        # cProfile mode: profiles per stage and video, and the one running
+        self._profiles: dict[_Key, list["cProfile.Profile"]] = defaultdict(list)
+        self._profiling = threading.Lock()
+        self._skipped = 0
+        # Memory: bytes allocated (net) and peak traced memory per stage
+        self._allocated: Counter[_Key] = Counter()
+        self._peaks: dict[_Key, int] = {}
+        self._peak = 0
+        self._peak_key: Optional[_Key] = None
+        self._peak_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started = 0.0
+        self._stopped = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start tracing memory and, in sampling mode, the sampling thread."""
+        self._started = time.monotonic()
+        if self.memory:
+            tracemalloc.start(_TRACEBACK_FRAMES)
+            self._baseline = tracemalloc.take_snapshot()
+        if self.mode == "sampling":
+            self._sampler = threading.Thread(
+                target=self._sample, name="profiler", daemon=True
+            )
+            self._sampler.start()
+
+    @contextmanager
+    def stage(self, stage: str, video_id: Optional[str] = None) -> Iterator[None]:
+        """Attribute the work of a block on this thread to a stage and video.
+
+        Args:
+            stage: Stage name, as in the run metrics.
+            video_id: Video the work is for, if any.
+        """
+        key = (stage, video_id)
+        thread_id = threading.get_ident()
+        with self._lock:
+            alone = not any(self._active.values())
+            self._active[thread_id].append(key)
+        profile = self._start_cprofile() if self.mode == "cprofile" else None
+        allocated = 0
+        if self.memory:
+            # The peak is process-wide: it is reset only between stages, so
+            # with several workers a stage's peak includes overlapping ones
+            if alone:
+                tracemalloc.reset_peak()
+            allocated = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._profiling.release()
+                with self._lock:
+                    self._profiles[key].append(profile)
+            if self.memory:
+                self._record_memory(key, allocated)
+            with self._lock:
+                self._active[thread_id].pop()
+
+    def _start_cprofile(self) -> Optional["cProfile.Profile"]:
+        """Start cProfile for a stage, unless another stage is being profiled."""
+        import cProfile
+
+        if not self._profiling.acquire(blocking=False):
+            with self._lock:
+                self._skipped += 1
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger's) is active
+            self._profiling.release()
+            with self._lock:
+                self._skipped += 1
+            return None
+        return profile
+
+    def _record_memory(self, key: _Key, allocated_before: int) -> None:
+        """Add a finished stage's allocations, and snapshot a new peak."""
+        current, peak = tracemalloc.get_traced_memory()
+        new_peak = False
+        with self._lock:
+            self._allocated[key] += current - allocated_before
+            self._peaks[key] = max(self._peaks.get(key, 0), peak)
+            if peak > self._peak:
+                self._peak, self._peak_key, new_peak = peak, key, True
+        if new_peak:
+            # What is still allocated when the stage that raised the peak ends
+            self._peak_snapshot = tracemalloc.take_snapshot()
+
+    def _sample(self) -> None:
+        """Sampling thread: count the stacks of threads inside a stage."""
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                running = {
+                    thread_id: stages[-1]
+                    for thread_id, stages in self._active.items()
+                    if stages and thread_id != own
+                }
+            for thread_id, (stage, video_id) in running.items():
+                frame: Optional[FrameType] = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                self._samples[(stage, video_id, tuple(reversed(stack)))] += 1
+
+    def stop(self) -> list[str]:
+        """Stop profiling and write the profiles to the run directory.
+
+        Returns:
+            Summary lines to print (also written to summary.txt).
+        """
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        elapsed = time.monotonic() - self._started
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == "sampling":
+            summary = self._write_samples()
+        else:
+            summary = self._write_pstats()
+        if self.memory:
+            summary += self._write_memory()
+            tracemalloc.stop()
+
+        lines = [f"Profile of {elapsed:.1f}s written to {self.output_dir}", *summary]
+        (self.output_dir / "summary.txt").write_text("\n".join(lines) + "\n")
+        return lines
+
+    def _write_samples(self) -> list[str]:
+        """Write collapsed stacks (sampling mode) and summarize them."""
+        by_stage: dict[str, list[str]] = defaultdict(list)
+        by_video: dict[str, list[str]] = defaultdict(list)
+        stage_samples: Counter[str] = Counter()
+        self_samples: Counter[str] = Counter()
+        everything = []
+        for (stage, video_id, stack), count in sorted(self._samples.items()):
+            video = video_id or "-"
+            frames = ";".join(stack)
+            everything.append(f"{stage};{video};{frames} {count}")
+            by_stage[stage].append(f"{video};{frames} {count}")
+            if video_id:
+                by_video[video_id].append(f"{stage};{frames} {count}")
+            stage_samples[stage] += count
+            if stack:
+                self_samples[stack[-1]] += count
+
+        (self.output_dir / "cpu.collapsed").write_text(
+            "".join(line + "\n" for line in everything)
+        )
+        for directory, groups in (("stages", by_stage), ("videos", by_video)):
+            (self.output_dir / directory).mkdir(exist_ok=True)
+            for name, lines in groups.items():
+                path = self.output_dir / directory / f"{_file_name(name)}.collapsed"
+                path.write_text("".join(line + "\n" for line in lines))
+
+        total = sum(stage_samples.values()) or 1
+        summary = ["CPU by stage (sampled):"]
+        summary += [
+            f"  {stage:<18} {count * self.interval:8.2f}s  {count / total:6.1%}"
+            for stage, count in stage_samples.most_common(self.top)
+        ]
+        summary.append("Top functions (self time):")
+        summary += [
+            f"  {count * self.interval:8.2f}s  {name}"
+            for name, count in self_samples.most_common(self.top)
+        ]
+        return summary
+
+    def _write_pstats(self) -> list[str]:
+        """Write pstats files (cProfile mode) and summarize them."""
+        import pstats
+
+        by_stage: dict[str, list["cProfile.Profile"]] = defaultdict(list)
+        by_video: dict[str, list["cProfile.Profile"]] = defaultdict(list)
+        for (stage, video_id), profiles in self._profiles.items():
+            by_stage[stage] += profiles
+            if video_id:
+                by_video[video_id] += profiles
+
+        stage_seconds: dict[str, float] = {}
+        for directory, groups in (("stages", by_stage), ("videos", by_video)):
+            (self.output_dir / directory).mkdir(exist_ok=True)
+            for name, profiles in groups.items():
+                stats = pstats.Stats(*profiles)
+                stats.dump_stats(
+                    self.output_dir / directory / f"{_file_name(name)}.pstats"
+                )
+                if directory == "stages":
+                    stage_seconds[name] = stats.total_tt
+
+        all_profiles = [p for profiles in by_stage.values() for p in profiles]
+        summary = ["CPU by stage (cProfile):"]
+        summary += [
+            f"  {stage:<18} {seconds:8.2f}s"
+            for stage, seconds in sorted(
+                stage_seconds.items(), key=lambda item: -item[1]
+            )[: self.top]
+        ]
+        if all_profiles:
+            stats = pstats.Stats(*all_profiles)
+            stats.dump_stats(self.output_dir / "cpu.pstats")
+            # (file, line, function) → (calls, primitive calls, self time,
+            # cumulative time, callers)
+            entries = sorted(stats.stats.items(), key=lambda item: -item[1][2])
+            summary.append("Top functions (self time):")
+            summary += [
+                f"  {tottime:8.2f}s  {function} ({Path(filename).name}:{line})"
+                for (filename, line, function), (_, _, tottime, _, _) in entries[
+                    : self.top
+                ]
+            ]
+        if self._skipped:
+            summary.append(
+                f"  ({self._skipped} stage(s) overlapped a profiled stage and were "
+                "not profiled on their own; use one worker per stage)"
+            )
+        return summary
+
+    def _write_memory(self) -> list[str]:
+        """Write per-stage memory use and the peak snapshot, and summarize."""
+        report = [
+            {
+                "stage": stage,
+                "video_id": video_id,
+                "allocated_bytes": self._allocated[(stage, video_id)],
+                "peak_bytes": peak,
+            }
+            for (stage, video_id), peak in sorted(
+                self._peaks.items(), key=lambda item: -item[1]
+            )
+        ]
+        with open(self.output_dir / "memory.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        stage_peaks: dict[str, tuple[int, Optional[str]]] = {}
+        for row in report:
+            if row["stage"] not in stage_peaks:
+                stage_peaks[row["stage"]] = (row["peak_bytes"], row["video_id"])
+        summary = ["Peak traced memory by stage:"]
+        summary += [
+            f"  {stage:<18} {_format_bytes(peak):>10}  ({video_id or '-'})"
+            for stage, (peak, video_id) in list(stage_peaks.items())[: self.top]
+        ]
+
+        if self._peak_snapshot is not None and self._baseline is not None:
+            self._peak_snapshot.dump(str(self.output_dir / "memory-peak.tracemalloc"))
+            stage, video_id = self._peak_key or ("-", None)
+            summary.append(
+                f"Largest allocations at the peak ({stage}, {video_id or '-'}):"
+            )
+            peak = self._peak_snapshot.filter_traces(_IMPORT_FILTERS)
+            baseline = self._baseline.filter_traces(_IMPORT_FILTERS)
+            differences = peak.compare_to(baseline, "lineno")
+            summary += [
+                f"  {_format_bytes(difference.size_diff):>10}  "
+                f"{Path(difference.traceback[0].filename).name}:"
+                f"{difference.traceback[0].lineno}"
+                for difference in differences[: self.top]
+                if difference.size_diff > 0
+            ]
+        return summary
@@ -0,0 +1,511 @@
+"""Retries, circuit breaking and adaptive concurrency for upstream calls.
+
+Shared by the downloader (YouTube) and the transcriber (ElevenLabs). Errors are
+classified from the HTTP status they carry, anywhere in their cause chain:
+429 is throttling, 408/409/425 and 5xx are transient, other statuses are
+permanent, and connection or timeout errors without a status are transient.
+Callers raise NotRetryable for failures that must not be repeated.
+
+Transient and throttled calls are retried with exponential backoff and full
+jitter, waiting at least as long as a Retry-After header asks. Throttling is
+also reported to a CircuitBreaker, which pauses every worker of an upstream
+once many calls are throttled within a short window, and to an optional AdaptiveLimiter,
+which grows the number of calls in flight by one per round of successes and
+halves it on throttling (AIMD), settling just below the upstream's quota.
+"""
+
+import asyncio
+import email.utils
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Mapping, Optional, TypeVar
+
+from ytscribe.metrics import Metrics
+
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# Status codes worth retrying besides 429 and 5xx
+_TRANSIENT_STATUS_CODES = {408, 409, 425}
+
+# How long async waiters sleep between checks of a full limiter
+_POLL_SECONDS = 0.05
+
+# How long callers held back by a circuit breaker's probe sleep between checks
+_PROBE_POLL_SECONDS = 0.25
+
+T = TypeVar("T")
+
+
+class NotRetryable(Exception):
+    """A failed call that must not be repeated, whatever the error it wraps.
+
+    E.g. a timeout after a billed request was sent: the upstream may have done
+    the work, and a retry would pay for it again.
+    """
+
+
+@dataclass(frozen=True)
+class Failure:
+    """How a failed call should be handled.
+
+    Attributes:
+        kind: RATE_LIMITED, TRANSIENT or PERMANENT.
+        status: HTTP status code, if the error carried one.
+        retry_after: Seconds the server asked to wait (Retry-After), if any.
+    """
+
+    kind: str
+    status: Optional[int] = None
+    retry_after: Optional[float] = None
+
+
+def parse_retry_after(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """Seconds to wait according to Retry-After (or retry-after-ms) headers.
+
+    Args:
+        headers: Response headers, matched case-insensitively.
+
+    Returns:
+        Seconds to wait (0 or more), or None if there is no usable header.
+    """
+    if not headers:
+        return None
+    lowered = {str(k).lower(): str(v) for k, v in headers.items()}
+    if "retry-after-ms" in lowered:
+        try:
+            return max(float(lowered["retry-after-ms"]) / 1000, 0.0)
+        except ValueError:
+            pass
+    value = lowered.get("retry-after", "").strip()
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def _causes(error: BaseException) -> list[BaseException]:
+    """The error and the errors it wraps (cause, context, yt-dlp exc_info)."""
+    chain = []
+    current: Optional[BaseException] = error
+    while current is not None and current not in chain and len(chain) < 10:
+        chain.append(current)
+        exc_info = getattr(current, "exc_info", None)
+        wrapped = getattr(current, "cause", None)
+        if isinstance(exc_info, tuple) and len(exc_info) > 1:
+            wrapped = wrapped or exc_info[1]
+        if not isinstance(wrapped, BaseException):
+            wrapped = None
+        current = wrapped or current.__cause__ or current.__context__
+    return chain
+
+
+def _status_and_headers(
+    error: BaseException,
+) -> tuple[Optional[int], Optional[Mapping[str, Any]]]:
+    """HTTP status and response headers attached to an exception, if any."""
+    response = getattr(error, "response", None)
+    for source in (error, response):
+        if source is None:
+            continue
+        for name in ("status_code", "status", "code"):
+            status = getattr(source, name, None)
+            if isinstance(status, int) and 100 <= status < 600:
+                headers = getattr(source, "headers", None)
+                if headers is None and response is not None:
+                    headers = getattr(response, "headers", None)
+                return status, headers
+    return None, None
+
+
+def classify(
+    error: BaseException, transient_types: tuple[type[BaseException], ...] = ()
+) -> Failure:
+    """Decide whether a failed call is worth retrying.
+
+    Args:
+        error: The exception the call raised.
+        transient_types: Exception types (anywhere in the cause chain) that
+            mean a network problem rather than a bad request.
+
+    Returns:
+        The failure kind, status code and Retry-After delay.
+    """
+    chain = _causes(error)
+    if isinstance(error, NotRetryable):
+        return Failure(PERMANENT)
+    for cause in chain:
+        status, headers = _status_and_headers(cause)
+        if status is None:
+            continue
+        retry_after = parse_retry_after(headers)
+        if status == 429:
+            return Failure(RATE_LIMITED, status, retry_after)
+        if status >= 500 or status in _TRANSIENT_STATUS_CODES:
+            return Failure(TRANSIENT, status, retry_after)
+        return Failure(PERMANENT, status)
+
+    network_types = (ConnectionError, TimeoutError, *transient_types)
+    if any(isinstance(cause, network_types) for cause in chain):
+        return Failure(TRANSIENT)
+    return Failure(PERMANENT)
+
+
+class CircuitBreaker:
+    """Pauses all calls to an upstream that keeps throttling.
+
+    After `threshold` throttled calls within `window` seconds the circuit
+    opens: every caller waits for `cooldown` seconds (or the longest
+    Retry-After seen, if longer). After the pause one caller is let through
+    as a probe while the rest keep waiting: a success closes the circuit,
+    another throttled call reopens it for twice as long, up to
+    `max_cooldown`, and any other outcome lets the next caller probe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int = 5,
+        window: float = 10.0,
+        cooldown: float = 30.0,
+        max_cooldown: float = 600.0,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize a closed circuit.
+
+        Args:
+            name: Upstream name used in messages and metrics.
+            threshold: Throttled calls within the window that open the circuit.
+            window: Length of the counting window, in seconds.
+            cooldown: First pause when the circuit opens, in seconds.
+            max_cooldown: Longest pause after repeated openings, in seconds.
+            metrics: Run metrics to count openings in.
+        """
+        self.name = name
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._throttled_at: list[float] = []
+        self._open_until = 0.0
+        self._next_cooldown = cooldown
+        self._half_open = False
+        self._probing = False
+
+    def remaining(self) -> float:
+        """Seconds until calls may proceed (0 when the circuit is closed)."""
+        with self._lock:
+            return max(self._open_until - time.monotonic(), 0.0)
+
+    def _admit(self) -> tuple[float, bool]:
+        """Decide whether a caller may proceed.
+
+        Returns:
+            Tuple of (seconds to wait before asking again, 0 to proceed;
+            whether the caller proceeds as the probe).
+        """
+        with self._lock:
+            delay = self._open_until - time.monotonic()
+            if delay > 0:
+                return delay, False
+            if not self._half_open:
+                return 0.0, False
+            if self._probing:
+                return _PROBE_POLL_SECONDS, False
+            self._probing = True
+            return 0.0, True
+
+    def wait(self) -> bool:
+        """Block while the circuit is open or another caller is probing.
+
+        Returns:
+            Whether the caller is the probe; it must then call end_probe once
+            its call is over.
+        """
+        while True:
+            delay, probe = self._admit()
+            if delay <= 0:
+                return probe
+            time.sleep(delay)
+
+    async def wait_async(self) -> bool:
+        """Async counterpart of wait."""
+        while True:
+            delay, probe = self._admit()
+            if delay <= 0:
+                return probe
+            await asyncio.sleep(delay)
+
+    def end_probe(self) -> None:
+        """Let the next caller probe if this probe's call settled nothing."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        """Note a successful call; closes a circuit that was probing."""
+        with self._lock:
+            self._half_open = False
+            self._probing = False
+            self._next_cooldown = self.cooldown
+
+    def record_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Note a throttled call; may open the circuit.
+
+        Args:
+            retry_after: Seconds the server asked to wait, if it said.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now < self._open_until:
+                return  # sent before the circuit opened
+            self._throttled_at = [
+                t for t in self._throttled_at if now - t < self.window
+            ] + [now]
+            if not self._half_open and len(self._throttled_at) < self.threshold:
+                return
+            pause = max(self._next_cooldown, retry_after or 0.0)
+            self._open_until = now + pause
+            self._next_cooldown = min(self._next_cooldown * 2, self.max_cooldown)
+            self._half_open = True
+            self._probing = False
+            self._throttled_at.clear()
+        print(
+            f"⏸  {self.name} is throttling; pausing all requests for {pause:.0f}s",
+            file=sys.stderr,
+        )
+        if self.metrics is not None:
+            self.metrics.inc("circuit_breaker_trips_total", upstream=self.name)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that adapts to throttling (AIMD).
+
+    The limit starts at `initial` and grows by one for every successful call
+    until the first throttled one (slow start), then by one per `limit`
+    successes. A throttled call halves it, at most once per
+    `decrease_interval` seconds, so a burst of 429s from one overload counts
+    once.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        initial: int = 1,
+        minimum: int = 1,
+        decrease_interval: float = 2.0,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            maximum: Upper bound for calls in flight.
+            initial: Starting limit.
+            minimum: Lower bound the limit never drops below.
+            decrease_interval: Minimum seconds between two decreases.
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("Limits must satisfy 1 <= minimum <= initial <= maximum")
+        self.maximum = maximum
+        self.minimum = minimum
+        self.decrease_interval = decrease_interval
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._slow_start = True
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free."""
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        """Block until a slot is free, then take it."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        """Async counterpart of acquire (polls, so it works from any loop)."""
+        while not self.try_acquire():
+            await asyncio.sleep(_POLL_SECONDS)
+
+    def release(self, throttled: bool = False) -> None:
+        """Give a slot back and adjust the limit.
+
+        Args:
+            throttled: The call was rejected for exceeding the upstream's
+                rate or concurrency quota.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.decrease_interval:
+                    self.limit = max(float(self.minimum), self.limit / 2)
+                    self._last_decrease = now
+                    self._slow_start = False
+            elif self._slow_start:
+                self.limit = min(float(self.maximum), self.limit + 1)
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class Retrier:
+    """Runs calls to one upstream with retries, a circuit breaker and a limiter."""
+
+    def __init__(
+        self,
+        stage: str,
+        breaker: CircuitBreaker,
+        limiter: Optional[AdaptiveLimiter] = None,
+        metrics: Optional[Metrics] = None,
+        attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_retry_after: float = 600.0,
+        transient_types: tuple[type[BaseException], ...] = (),
+    ) -> None:
+        """Initialize the retrier.
+
+        Args:
+            stage: Stage name used in messages and metrics (e.g. 'download').
+            breaker: Circuit breaker of the upstream, shared by its workers.
+            limiter: Adaptive concurrency limit for calls, if any.
+            metrics: Run metrics to count retries in.
+            attempts: Calls made before giving up (1 disables retries).
+            base_delay: Backoff for the first retry, in seconds; doubles on
+                each further retry.
+            max_delay: Longest backoff, in seconds.
+            max_retry_after: Give up instead of waiting when Retry-After asks
+                for longer than this many seconds.
+            transient_types: Exception types that mean a network problem.
+        """
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        self.stage = stage
+        self.breaker = breaker
+        self.limiter = limiter
+        self.metrics = metrics
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.transient_types = transient_types
+
+    def backoff(self, retry: int, failure: Failure) -> float:
+        """Delay before a retry: full jitter, but never less than Retry-After.
+
+        Args:
+            retry: 1 for the first retry, 2 for the second, ...
+            failure: Classification of the error being retried.
+
+        Returns:
+            Seconds to wait.
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        delay = random.uniform(0, ceiling)
+        if failure.retry_after is not None:
+            delay += failure.retry_after
+        return delay
+
+    def _retry_delay(self, error: Exception, failure: Failure, attempt: int) -> float:
+        """Report a failed attempt and decide the delay, or re-raise the error."""
+        if failure.kind == RATE_LIMITED:
+            self.breaker.record_throttle(failure.retry_after)
+        if (
+            failure.kind == PERMANENT
+            or attempt >= self.attempts
+            or (failure.retry_after or 0) > self.max_retry_after
+        ):
+            raise error
+        delay = self.backoff(attempt, failure)
+        if self.metrics is not None:
+            self.metrics.inc("retries_total", stage=self.stage, reason=failure.kind)
+        status = f"HTTP {failure.status}" if failure.status else type(error).__name__
+        print(
+            f"  ↻ {self.stage}: {failure.kind.replace('_', ' ')} ({status}); "
+            f"retry {attempt}/{self.attempts - 1} in {delay:.1f}s",
+            file=sys.stderr,
+        )
+        return delay
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Call `fn` until it succeeds, fails permanently or runs out of attempts.
+
+        Args:
+            fn: The call; it must be safe to repeat (e.g. reopen its upload).
+
+        Returns:
+            What `fn` returned.
+
+        Raises:
+            Exception: The last error, once retrying is pointless.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = self.breaker.wait()
+            throttled = False
+            try:
+                if self.limiter is not None:
+                    self.limiter.acquire()
+                try:
+                    result = fn()
+                except Exception as e:
+                    failure = classify(e, self.transient_types)
+                    throttled = failure.kind == RATE_LIMITED
+                    delay = self._retry_delay(e, failure, attempt)
+                else:
+                    self.breaker.record_success()
+                    return result
+                finally:
+                    if self.limiter is not None:
+                        self.limiter.release(throttled)
+            finally:
+                if probe:
+                    self.breaker.end_probe()
+            time.sleep(delay)
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async counterpart of call; `fn` returns a new awaitable per attempt."""
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = await self.breaker.wait_async()
+            throttled = False
+            try:
+                if self.limiter is not None:
+                    await self.limiter.acquire_async()
+                try:
+                    result = await fn()
+                except Exception as e:
+                    failure = classify(e, self.transient_types)
+                    throttled = failure.kind == RATE_LIMITED
+                    delay = self._retry_delay(e, failure, attempt)
+                else:
+                    self.breaker.record_success()
+                    return result
+                finally:
+                    if self.limiter is not None:
+                        self.limiter.release(throttled)
+            finally:
+                if probe:
+                    self.breaker.end_probe()
+            await asyncio.sleep(delay)
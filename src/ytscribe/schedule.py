@@ -0,0 +1,186 @@
+"""Pre-flight planning of a transcription batch.
+
+Before any request is sent, every pending file is measured in parallel: its
+size from the file system and its duration from the job ledger (which keeps
+the length yt-dlp reported when the video was listed or downloaded), or from
+ffprobe when the ledger doesn't know it. The plan orders the files longest
+first, so the longest file isn't started last while the other workers sit
+idle, finds files over the API limits before the batch starts, and estimates
+the billed minutes and the wall time of the run.
+"""
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from ytscribe.audio import probe_duration
+from ytscribe.ledger import Ledger, video_id_from_path
+from ytscribe.transcriber import MAX_DURATION_HOURS, MAX_FILE_SIZE_BYTES
+
+# Seconds of transcription per second of audio assumed until the ledger has
+# finished transcriptions of known length to measure it from
+DEFAULT_TRANSCRIPTION_SPEED = 0.1
+
+
+@dataclass(frozen=True)
+class Job:
+    """One pending file, as measured before the batch starts.
+
+    Attributes:
+        path: Path to the audio file.
+        size: File size in bytes.
+        duration: Length in seconds, or None if it could not be read.
+    """
+
+    path: Path
+    size: int
+    duration: Optional[float]
+
+    @property
+    def over_limit(self) -> bool:
+        """Whether the file is over the API size or duration limit."""
+        return self.size > MAX_FILE_SIZE_BYTES or (
+            self.duration is not None and self.duration > MAX_DURATION_HOURS * 3600
+        )
+
+
+@dataclass
+class Plan:
+    """Order and estimates for a transcription batch.
+
+    Attributes:
+        jobs: Files to transcribe, longest first (unknown lengths last).
+        rejected: Files that can't be sent, with the reason.
+        billed_seconds: Audio seconds the API will bill at most (cache hits
+            and shortened silences bring it down).
+        estimated_seconds: Estimated wall time with the planned workers.
+        speed: Seconds of transcription per second of audio used for the
+            estimate.
+        measured_speed: Whether `speed` comes from earlier runs in the ledger.
+    """
+
+    jobs: list[Job] = field(default_factory=list)
+    rejected: list[tuple[Path, str]] = field(default_factory=list)
+    billed_seconds: float = 0.0
+    estimated_seconds: float = 0.0
+    speed: float = DEFAULT_TRANSCRIPTION_SPEED
+    measured_speed: bool = False
+
+    @property
+    def paths(self) -> list[Path]:
+        """Paths of the jobs, in the planned order."""
+        return [job.path for job in self.jobs]
+
+    @property
+    def split(self) -> int:
+        """Jobs over the API limits, which will be transcribed in chunks."""
+        return sum(job.over_limit for job in self.jobs)
+
+    @property
+    def unknown(self) -> int:
+        """Jobs whose length could not be read (left out of the estimates)."""
+        return sum(job.duration is None for job in self.jobs)
+
+
+def probe_job(audio_path: Path, ledger: Optional[Ledger] = None) -> Job:
+    """Measure one file, preferring the length recorded in the ledger.
+
+    Args:
+        audio_path: Path to the audio file.
+        ledger: Job ledger with yt-dlp's duration metadata.
+
+    Returns:
+        The measured job.
+
+    Raises:
+        OSError: If the file can't be read.
+    """
+    size = audio_path.stat().st_size
+    duration = None
+    if ledger is not None:
+        row = ledger.get(video_id_from_path(audio_path))
+        duration = row["duration_seconds"] if row else None
+    if not duration:
+        try:
+            duration = probe_duration(audio_path)
+        except (FileNotFoundError, ValueError):
+            duration = None
+    return Job(audio_path, size, duration)
+
+
+def estimate_wall_time(durations: list[float], workers: int) -> float:
+    """Finish time of jobs handed, in order, to whichever worker is free first.
+
+    Args:
+        durations: Time each job takes, in the order they are started.
+        workers: Jobs that run at once.
+
+    Returns:
+        Seconds until the last job finishes.
+    """
+    finish_times = [0.0] * max(1, min(workers, len(durations)))
+    for duration in durations:
+        heapq.heapreplace(finish_times, finish_times[0] + duration)
+    return max(finish_times)
+
+
+def plan_batch(
+    audio_paths: list[Path],
+    ledger: Optional[Ledger] = None,
+    workers: int = 1,
+    probe_workers: int = 8,
+) -> Plan:
+    """Measure pending files in parallel and plan a longest-first batch.
+
+    Args:
+        audio_paths: Audio files waiting for transcription.
+        ledger: Job ledger with duration metadata and earlier run times.
+        workers: Concurrent transcription requests the batch will use.
+        probe_workers: Files measured at once.
+
+    Returns:
+        The plan.
+    """
+    plan = Plan()
+    if ledger is not None:
+        speed = ledger.transcription_speed()
+        if speed is not None:
+            plan.speed, plan.measured_speed = speed, True
+
+    def measure(audio_path: Path) -> Job | Exception:
+        try:
+            return probe_job(audio_path, ledger)
+        except OSError as e:
+            return e
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, probe_workers), thread_name_prefix="probe"
+    ) as pool:
+        measured = list(pool.map(measure, audio_paths))
+
+    for audio_path, job in zip(audio_paths, measured):
+        if isinstance(job, Exception):
+            plan.rejected.append((audio_path, str(job)))
+        elif job.duration is None and job.size > MAX_FILE_SIZE_BYTES:
+            # Splitting needs the duration, so the API would refuse it whole
+            size_gb = job.size / (1024**3)
+            plan.rejected.append(
+                (
+                    audio_path,
+                    f"File size ({size_gb:.2f} GB) exceeds ElevenLabs limit of "
+                    "3 GB, and its duration could not be read to split it.",
+                )
+            )
+        else:
+            plan.jobs.append(job)
+
+    # Stable sort: files of equal (or unknown) length keep their download order
+    plan.jobs.sort(key=lambda job: -(job.duration or 0.0))
+    known = [job.duration for job in plan.jobs if job.duration is not None]
+    plan.billed_seconds = sum(known)
+    plan.estimated_seconds = estimate_wall_time(
+        [duration * plan.speed for duration in known], workers
+    )
+    return plan
@@ -0,0 +1,402 @@
+"""Offline full-text search over saved transcripts.
+
+Builds an inverted index in SQLite from the `words` arrays of JSON and columnar
+transcripts. Each posting records the document, the token position, the word's
+start time and its speaker, so phrase queries are answered by matching
+consecutive positions and every hit links to a timestamp.
+"""
+
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from ytscribe.columnar import COLUMNAR_SUFFIX, load_columnar
+from ytscribe.ledger import video_id_from_path
+from ytscribe.storage import (
+    COMPRESSION_SUFFIXES,
+    load_transcript_json,
+    strip_compression,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    video_id TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    tokens INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    start REAL,
+    speaker TEXT,
+    PRIMARY KEY (term_id, doc_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id, position);
+"""
+
+# Tokens are runs of word characters, keeping inner apostrophes ("don't")
+_TOKEN = re.compile(r"\w+(?:['’]\w+)*")
+
+# Tokens of context shown on each side of a hit
+_SNIPPET_TOKENS = 6
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase search tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+@dataclass
+class IndexStats:
+    """Outcome of an index update."""
+
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+
+
+@dataclass
+class SearchHit:
+    """One occurrence of a query in a transcript."""
+
+    video_id: str
+    path: Path
+    start: Optional[float]
+    speaker: Optional[str]
+    position: int
+    snippet: str = ""
+
+    @property
+    def url(self) -> str:
+        """YouTube link that starts playback at the hit."""
+        url = f"https://www.youtube.com/watch?v={self.video_id}"
+        if self.start is not None:
+            url += f"&t={int(self.start)}s"
+        return url
+
+
+def _iter_words(path: Path) -> Iterator[tuple[str, Optional[float], Optional[str]]]:
+    """Yield (text, start, speaker) for each spoken word of a transcript file.
+
+    Raises:
+        ValueError: If a JSON file doesn't hold a transcript object.
+    """
+    if path.suffix == COLUMNAR_SUFFIX:
+        with load_columnar(path) as transcript:
+            word_code = (
+                transcript.types.index("word") if "word" in transcript.types else -1
+            )
+            starts = transcript.starts.tolist()
+            speakers = transcript.speakers
+            for index, (type_code, speaker_code) in enumerate(
+                zip(transcript.type_codes.tolist(), transcript.speaker_codes.tolist())
+            ):
+                if type_code == word_code:
+                    start = starts[index]
+                    yield (
+                        transcript.text_at(index),
+                        None if start != start else start,
+                        speakers[speaker_code],
+                    )
+        return
+
+    transcript = load_transcript_json(path)
+    if not isinstance(transcript, dict):
+        raise ValueError("Not a transcript: the JSON is not an object")
+    words = transcript.get("words") or []
+    if not isinstance(words, list):
+        raise ValueError("Not a transcript: 'words' is not a list")
+    for word in words:
+        # Malformed entries are skipped rather than failing the whole file
+        if isinstance(word, dict) and word.get("type", "word") == "word":
+            yield word.get("text") or "", word.get("start"), word.get("speaker_id")
+
+
+def find_transcripts(transcript_root: Path) -> list[Path]:
+    """List transcript files to index.
+
+    JSON transcripts may be compressed (.json.gz, .json.zst). When a video has
+    both a columnar and a JSON file (e.g. after export-json), only the
+    columnar file is indexed.
+
+    Args:
+        transcript_root: Directory holding the transcripts.
+
+    Returns:
+        Transcript paths, sorted.
+    """
+    columnar = set(transcript_root.rglob(f"*{COLUMNAR_SUFFIX}"))
+    json_paths = [
+        path
+        for suffix in ("", *COMPRESSION_SUFFIXES.values())
+        for path in transcript_root.rglob(f"*.json{suffix}")
+    ]
+    paths = columnar | {
+        path
+        for path in json_paths
+        if strip_compression(path).with_suffix(COLUMNAR_SUFFIX) not in columnar
+    }
+    return sorted(paths)
+
+
+class SearchIndex:
+    """SQLite inverted index over transcript words."""
+
+    def __init__(self, path: Path) -> None:
+        """Open (and create if needed) the index database.
+
+        Args:
+            path: Path to the SQLite file.
+        """
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._term_ids: dict[str, int] = {}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def _term_id(self, term: str) -> int:
+        """Get (or assign) the ID of a term."""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO terms (term) VALUES (?)", (term,))
+            term_id = self._conn.execute(
+                "SELECT term_id FROM terms WHERE term = ?", (term,)
+            ).fetchone()[0]
+            self._term_ids[term] = term_id
+        return term_id
+
+    def _index_document(self, path: Path, stat: Any, doc_id: Optional[int]) -> None:
+        """(Re)index one transcript file inside a transaction."""
+        postings = []
+        position = 0
+        for text, start, speaker in _iter_words(path):
+            for token in tokenize(text):
+                postings.append((token, position, start, speaker))
+                position += 1
+
+        self._conn.execute("BEGIN")
+        try:
+            if doc_id is not None:
+                self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+            doc_id = self._conn.execute(
+                """
+                INSERT INTO documents (path, video_id, mtime_ns, size, tokens,
+                                       indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    str(path),
+                    video_id_from_path(path),
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    position,
+                    time.time(),
+                ),
+            ).lastrowid
+            rows = [
+                (self._term_id(token), doc_id, pos, start, speaker)
+                for token, pos, start, speaker in postings
+            ]
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO postings (term_id, doc_id, position, start,
+                                                speaker)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            # Term IDs assigned in the rolled back transaction are gone
+            self._term_ids.clear()
+            raise
+
+    def update(
+        self,
+        transcript_root: Path,
+        rebuild: bool = False,
+        on_progress: Optional[Callable[[str, Path], None]] = None,
+    ) -> IndexStats:
+        """Bring the index up to date with the transcripts on disk.
+
+        Only files whose modification time or size changed since the last
+        build are re-read; files that disappeared are dropped.
+
+        Args:
+            transcript_root: Directory holding the transcripts.
+            rebuild: Re-index every file from scratch.
+            on_progress: Called with ('added'|'updated'|'removed'|'failed: ...',
+                path) for each changed file.
+
+        Returns:
+            Counts of added, updated, removed, unchanged and failed transcripts.
+        """
+        if rebuild:
+            self._conn.executescript(
+                "DELETE FROM postings; DELETE FROM documents; DELETE FROM terms;"
+            )
+            self._term_ids.clear()
+
+        known = {
+            row["path"]: row
+            for row in self._conn.execute(
+                "SELECT doc_id, path, mtime_ns, size FROM documents"
+            )
+        }
+        stats = IndexStats()
+
+        for path in find_transcripts(transcript_root):
+            stat = path.stat()
+            row = known.pop(str(path), None)
+            if (
+                row is not None
+                and row["mtime_ns"] == stat.st_mtime_ns
+                and row["size"] == stat.st_size
+            ):
+                stats.unchanged += 1
+                continue
+
+            try:
+                self._index_document(path, stat, row["doc_id"] if row else None)
+            except (OSError, ValueError) as e:
+                # Unreadable or non-transcript files don't stop the build
+                stats.failed += 1
+                if on_progress:
+                    on_progress(f"failed: {e}", path)
+                continue
+            action = "updated" if row is not None else "added"
+            setattr(stats, action, getattr(stats, action) + 1)
+            if on_progress:
+                on_progress(action, path)
+
+        for path, row in known.items():
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "DELETE FROM postings WHERE doc_id = ?", (row["doc_id"],)
+            )
+            self._conn.execute(
+                "DELETE FROM documents WHERE doc_id = ?", (row["doc_id"],)
+            )
+            self._conn.execute("COMMIT")
+            stats.removed += 1
+            if on_progress:
+                on_progress("removed", Path(path))
+
+        return stats
+
+    def document_count(self) -> int:
+        """Number of indexed transcripts."""
+        return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def _snippet(self, doc_id: int, position: int, length: int) -> str:
+        """Rebuild the tokens around a hit from the postings."""
+        rows = self._conn.execute(
+            """
+            SELECT p.position, t.term FROM postings p JOIN terms t USING (term_id)
+            WHERE p.doc_id = ? AND p.position BETWEEN ? AND ?
+            ORDER BY p.position
+            """,
+            (
+                doc_id,
+                position - _SNIPPET_TOKENS,
+                position + length - 1 + _SNIPPET_TOKENS,
+            ),
+        ).fetchall()
+        tokens = [
+            f"**{row['term']}**"
+            if position <= row["position"] < position + length
+            else row["term"]
+            for row in rows
+        ]
+        return " ".join(tokens)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        speaker: Optional[str] = None,
+    ) -> list[SearchHit]:
+        """Find a word or phrase.
+
+        A multi-word query matches only where its words appear consecutively.
+
+        Args:
+            query: Word or phrase to find (case and punctuation are ignored).
+            limit: Maximum number of hits.
+            speaker: Only return hits whose first word has this speaker ID.
+
+        Returns:
+            Hits ordered by transcript path and time.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        term_ids = []
+        for token in tokens:
+            row = self._conn.execute(
+                "SELECT term_id FROM terms WHERE term = ?", (token,)
+            ).fetchone()
+            if row is None:
+                return []
+            term_ids.append(row[0])
+
+        # One postings alias per query token, chained on consecutive positions
+        joins = "".join(
+            f"""
+            JOIN postings p{i} ON p{i}.term_id = ? AND p{i}.doc_id = p0.doc_id
+                AND p{i}.position = p0.position + {i}"""
+            for i in range(1, len(term_ids))
+        )
+        where = "p0.term_id = ?"
+        params: list[Any] = [*term_ids[1:], term_ids[0]]
+        if speaker is not None:
+            where += " AND p0.speaker = ?"
+            params.append(speaker)
+
+        rows = self._conn.execute(
+            f"""
+            SELECT d.doc_id, d.path, d.video_id, p0.position, p0.start, p0.speaker
+            FROM postings p0 {joins}
+            JOIN documents d ON d.doc_id = p0.doc_id
+            WHERE {where}
+            ORDER BY d.path, p0.position
+            LIMIT ?
+            """,
+            (*params, limit),
+        ).fetchall()
+
+        return [
+            SearchHit(
+                video_id=row["video_id"],
+                path=Path(row["path"]),
+                start=row["start"],
+                speaker=row["speaker"],
+                position=row["position"],
+                snippet=self._snippet(row["doc_id"], row["position"], len(tokens)),
+            )
+            for row in rows
+        ]
@@ -0,0 +1,446 @@
+"""Long-running job server with a local HTTP API.
+
+`ytscribe serve` keeps one process, one downloader and one transcriber alive
+between jobs, so yt-dlp and the ElevenLabs SDK are imported once, the API
+client keeps its connection pool and yt-dlp's extractors keep the YouTube
+player data they already fetched. Submitted URLs go onto an internal queue: a
+job is first listed, then each of its videos is downloaded and transcribed by
+the next free worker, so one large playlist doesn't hold up jobs behind it
+for longer than its listing takes.
+
+Endpoints (JSON in and out):
+    POST /jobs             submit {"url": ..., "language", "diarize",
+                           "tag_audio_events", "skip_transcribe", "refresh"}
+    GET  /jobs             jobs of this process, newest first (finished ones
+                           are dropped after the retention window)
+    GET  /jobs/<id>        one job with its videos and transcript paths
+    GET  /videos/<id>      a video's row in the job ledger
+    GET  /health           queue depth and worker count
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from ytscribe.downloader import AudioDownloader
+from ytscribe.transcriber import Transcriber
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Options a job may set, with their defaults (see Transcriber.transcribe)
+JOB_OPTIONS: dict[str, Any] = {
+    "language": None,
+    "tag_audio_events": True,
+    "diarize": True,
+    "skip_transcribe": False,
+    "refresh": False,
+}
+
+# Sentinel telling a worker to exit
+_STOP = object()
+
+# Largest request body accepted, in bytes (a job request is a few hundred)
+_MAX_REQUEST_BYTES = 64 * 1024
+
+# Default seconds a finished job stays listed
+DEFAULT_JOB_RETENTION = 24 * 3600.0
+
+
+@dataclass
+class JobVideo:
+    """One video of a job.
+
+    Attributes:
+        video_id: YouTube video ID.
+        title: Video title, if the listing had it.
+        state: 'queued', 'downloading', 'transcribing', 'done' or 'failed'.
+        audio_path: Downloaded audio file.
+        json_path: Raw transcript.
+        md_path: Markdown transcript.
+        cached: The transcript came from the cache.
+        error: Why the video failed.
+    """
+
+    video_id: str
+    title: Optional[str] = None
+    state: str = QUEUED
+    audio_path: Optional[str] = None
+    json_path: Optional[str] = None
+    md_path: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class Job:
+    """One submitted URL.
+
+    Attributes:
+        job_id: Random hex ID returned on submission.
+        url: YouTube video, playlist or channel URL.
+        options: Transcription options (see JOB_OPTIONS).
+        state: 'queued', 'running', 'done' or 'failed'.
+        submitted_at: Unix time of submission.
+        started_at: Unix time listing started.
+        finished_at: Unix time the last video finished.
+        videos: The job's videos, in listing order.
+        error: Why listing failed, or why every video failed.
+    """
+
+    job_id: str
+    url: str
+    options: dict[str, Any]
+    state: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    videos: list[JobVideo] = field(default_factory=list)
+    error: Optional[str] = None
+    _listed: bool = field(default=False, repr=False)
+    _pending: int = field(default=0, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The job as a JSON-serialisable dictionary."""
+        data = {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+        data["counts"] = {}
+        for video in self.videos:
+            data["counts"][video.state] = data["counts"].get(video.state, 0) + 1
+        return data
+
+
+def parse_job_request(payload: Any) -> tuple[str, dict[str, Any]]:
+    """Validate the body of a job submission.
+
+    Args:
+        payload: Decoded JSON body.
+
+    Returns:
+        Tuple of (URL, options with defaults filled in).
+
+    Raises:
+        ValueError: If the URL is missing or an option is unknown or mistyped.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    url = payload.get("url")
+    if not isinstance(url, str) or not url.strip():
+        raise ValueError("'url' is required")
+
+    unknown = set(payload) - set(JOB_OPTIONS) - {"url"}
+    if unknown:
+        raise ValueError(f"Unknown option(s): {', '.join(sorted(unknown))}")
+    options = {**JOB_OPTIONS, **{k: v for k, v in payload.items() if k != "url"}}
+    if options["language"] is not None and not isinstance(options["language"], str):
+        raise ValueError("'language' must be a string")
+    for name in ("tag_audio_events", "diarize", "skip_transcribe", "refresh"):
+        if not isinstance(options[name], bool):
+            raise ValueError(f"'{name}' must be true or false")
+    return url.strip(), options
+
+
+class JobServer:
+    """HTTP API and worker pool around one downloader and one transcriber."""
+
+    def __init__(
+        self,
+        downloader: AudioDownloader,
+        transcriber: Optional[Transcriber],
+        host: str = "127.0.0.1",
+        port: int = 8788,
+        workers: int = 2,
+        use_cache: bool = True,
+        job_retention: float = DEFAULT_JOB_RETENTION,
+    ) -> None:
+        """Initialize the server (workers and HTTP start with start()).
+
+        Args:
+            downloader: Downloader shared by every job.
+            transcriber: Transcriber shared by every job, or None to only
+                download.
+            host: Interface to listen on.
+            port: Port to listen on (0 picks a free port).
+            workers: Videos downloaded and transcribed at once.
+            use_cache: Reuse cached transcripts for identical audio.
+            job_retention: Seconds a finished job is kept for status requests
+                before it is forgotten (its videos stay in the job ledger).
+
+        Raises:
+            ValueError: If workers < 1.
+        """
+        if workers < 1:
+            raise ValueError("Worker count must be at least 1")
+        self.downloader = downloader
+        self.transcriber = transcriber
+        self.workers = workers
+        self.use_cache = use_cache
+        self.job_retention = job_retention
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._tasks: queue.Queue[Any] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Base URL the API is served on."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def submit(self, url: str, options: Optional[dict[str, Any]] = None) -> Job:
+        """Queue a URL for listing, download and transcription.
+
+        Args:
+            url: YouTube video, playlist or channel URL.
+            options: Transcription options (see JOB_OPTIONS).
+
+        Returns:
+            The queued job.
+        """
+        job = Job(uuid.uuid4().hex, url, {**JOB_OPTIONS, **(options or {})})
+        with self._lock:
+            self._forget_finished()
+            self._jobs[job.job_id] = job
+        self._tasks.put((self._list_job, job))
+        return job
+
+    def _forget_finished(self) -> None:
+        """Drop jobs that finished longer than job_retention ago.
+
+        Must be called with the lock held.
+        """
+        cutoff = time.time() - self.job_retention
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def job(self, job_id: str) -> Optional[dict[str, Any]]:
+        """A job as a dictionary, or None if the ID is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def jobs(self) -> list[dict[str, Any]]:
+        """All jobs of this process, newest first."""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: -j.submitted_at)
+            return [job.to_dict() for job in jobs]
+
+    def health(self) -> dict[str, Any]:
+        """Queue depth, worker count and job counts by state."""
+        with self._lock:
+            states: dict[str, int] = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queued_tasks": self._tasks.qsize(),
+            "jobs": states,
+        }
+
+    def _list_job(self, job: Job) -> None:
+        """List a job's URL and queue each of its videos."""
+        with self._lock:
+            job.state = RUNNING
+            job.started_at = time.time()
+        try:
+            for entry in self.downloader.iter_entries(job.url):
+                if not entry.get("id"):
+                    continue
+                video = JobVideo(entry["id"], entry.get("title"))
+                with self._lock:
+                    job.videos.append(video)
+                    job._pending += 1
+                self._tasks.put((self._run_video, job, video, entry))
+        except Exception as e:
+            with self._lock:
+                job.error = f"Listing failed: {e}"
+        with self._lock:
+            job._listed = True
+            self._finish_if_done(job)
+
+    def _run_video(self, job: Job, video: JobVideo, entry: dict[str, Any]) -> None:
+        """Download and transcribe one video of a job."""
+        options = job.options
+        try:
+            self._set(video, state="downloading")
+            audio_path = self.downloader.download_entry(
+                entry, 1, 1, skip_existing=True, progress_label=job.job_id[:8]
+            )
+            if audio_path is None:
+                raise RuntimeError("Download failed")
+            self._set(video, audio_path=str(audio_path))
+
+            if self.transcriber is not None and not options["skip_transcribe"]:
+                self._set(video, state="transcribing")
+                result = self.transcriber.transcribe(
+                    audio_path,
+                    language=options["language"],
+                    tag_audio_events=options["tag_audio_events"],
+                    diarize=options["diarize"],
+                    use_cache=self.use_cache,
+                    refresh=options["refresh"],
+                )
+                self._set(
+                    video,
+                    json_path=str(result["json_path"]),
+                    md_path=str(result["md_path"]),
+                    cached=bool(result["cached"]),
+                )
+            self._set(video, state=DONE)
+        except Exception as e:
+            self._set(video, state=FAILED, error=str(e))
+        with self._lock:
+            job._pending -= 1
+            self._finish_if_done(job)
+
+    def _set(self, video: JobVideo, **changes: Any) -> None:
+        """Update a video under the lock, so status reads see whole updates."""
+        with self._lock:
+            for name, value in changes.items():
+                setattr(video, name, value)
+
+    def _finish_if_done(self, job: Job) -> None:
+        """Settle a job's state once it is listed and no video is pending.
+
+        Must be called with the lock held.
+        """
+        if not job._listed or job._pending:
+            return
+        job.finished_at = time.time()
+        failed = [video for video in job.videos if video.state == FAILED]
+        if job.error is None and job.videos and len(failed) == len(job.videos):
+            job.error = f"All {len(failed)} video(s) failed"
+        if job.error is not None and len(failed) == len(job.videos):
+            job.state = FAILED
+        else:
+            job.state = DONE
+
+    def _work(self) -> None:
+        """Worker loop: run queued listing and video tasks until stopped."""
+        while True:
+            task = self._tasks.get()
+            if task is _STOP:
+                return
+            fn, *args = task
+            try:
+                fn(*args)
+            except Exception as e:
+                # Tasks record their own failures; this is a last resort
+                print(f"✗ Job task failed: {e}")
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        """Build the request handler bound to this server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                parts = self.path.split("?", 1)[0].strip("/").split("/")
+                if parts == ["health"]:
+                    self._reply(200, server.health())
+                elif parts == ["jobs"]:
+                    self._reply(200, {"jobs": server.jobs()})
+                elif len(parts) == 2 and parts[0] == "jobs":
+                    job = server.job(parts[1])
+                    if job is None:
+                        self._reply(404, {"error": "No such job"})
+                    else:
+                        self._reply(200, job)
+                elif len(parts) == 2 and parts[0] == "videos":
+                    row = (
+                        server.downloader.ledger.get(parts[1])
+                        if server.downloader.ledger is not None
+                        else None
+                    )
+                    if row is None:
+                        self._reply(404, {"error": "Video not in the job ledger"})
+                    else:
+                        self._reply(200, row)
+                else:
+                    self._reply(404, {"error": "Not found"})
+
+            def do_POST(self) -> None:
+                if self.path.split("?", 1)[0].rstrip("/") != "/jobs":
+                    self._reply(404, {"error": "Not found"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self._reply(400, {"error": "Invalid Content-Length"})
+                    return
+                if length > _MAX_REQUEST_BYTES:
+                    self._reply(413, {"error": "Request body too large"})
+                    return
+                try:
+                    url, options = parse_job_request(
+                        json.loads(self.rfile.read(length))
+                    )
+                except ValueError as e:
+                    self._reply(400, {"error": str(e)})
+                    return
+                job = server.submit(url, options)
+                self._reply(202, server.job(job.job_id) or {})
+
+            def _reply(self, status: int, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # Progress is printed by the downloader and the CLI instead
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        """Start the workers and serve the API on a background thread."""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(
+            target=self._server.serve_forever, name="api", daemon=True
+        )
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting requests and let the workers finish their current task.
+
+        Tasks still queued are dropped; their videos stay resumable in the
+        job ledger.
+
+        Args:
+            timeout: Seconds to wait for each worker (None waits until done).
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        # Drop what hasn't started, then wake every worker with a stop marker
+        while True:
+            try:
+                self._tasks.get_nowait()
+            except queue.Empty:
+                break
+        for _ in range(self.workers):
+            self._tasks.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
@@ -0,0 +1,207 @@
+"""Crash-safe, streaming transcript files.
+
+Every output is written to a temporary file in the destination directory and
+renamed over the destination only once it is complete, so an interrupted run
+never leaves a truncated transcript that a later run mistakes for a finished
+one. JSON transcripts are streamed word by word (optionally through gzip or
+zstd) instead of being rendered to one string first, so memory use while
+writing doesn't grow with the length of the recording.
+"""
+
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Optional
+
+try:
+    from compression import zstd
+except ImportError:  # Python < 3.14
+    zstd = None
+
+# File suffix added to compressed JSON transcripts, per compression
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+_COMPRESSION_BY_SUFFIX = {suffix: name for name, suffix in COMPRESSION_SUFFIXES.items()}
+
+# Words encoded per write; bounds memory while keeping write calls few
+_WORDS_PER_WRITE = 1024
+
+# json.dumps builds a new encoder per call when given options
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+# mkstemp creates files readable only by the owner; outputs get the usual
+# permissions instead. Read on first write, not at import (see _get_umask)
+_umask: Optional[int] = None
+_umask_lock = threading.Lock()
+
+
+def strip_compression(path: Path) -> Path:
+    """Path without a trailing .gz or .zst (e.g. x.json.gz → x.json)."""
+    if path.suffix in _COMPRESSION_BY_SUFFIX:
+        return path.with_suffix("")
+    return path
+
+
+def _get_umask() -> int:
+    """Get the process umask, read once.
+
+    Linux reports it in /proc. Elsewhere it can only be read by setting it,
+    which briefly gives files created by other threads no umask at all, so
+    that is done only once and under a lock.
+    """
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            try:
+                with open("/proc/self/status", encoding="ascii") as f:
+                    for line in f:
+                        if line.startswith("Umask:"):
+                            _umask = int(line.split()[1], 8)
+                            break
+            except (OSError, ValueError):
+                pass
+        if _umask is None:
+            _umask = os.umask(0)
+            os.umask(_umask)
+        return _umask
+
+
+@contextmanager
+def atomic_write(path: Path, binary: bool = False) -> Iterator[IO[Any]]:
+    """Open a file whose contents replace `path` only if the block succeeds.
+
+    Args:
+        path: Destination file.
+        binary: Open in binary mode instead of UTF-8 text.
+
+    Yields:
+        The open temporary file.
+    """
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        os.chmod(tmp_name, 0o666 & ~_get_umask())
+        if binary:
+            file: IO[Any] = os.fdopen(fd, "wb")
+        else:
+            file = os.fdopen(fd, "w", encoding="utf-8")
+        with file:
+            yield file
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def check_compression(compression: Optional[str]) -> None:
+    """Check that transcripts can be written with a compression.
+
+    Args:
+        compression: None/'none', 'gzip' or 'zstd'.
+
+    Raises:
+        ValueError: If the compression is unknown or unavailable.
+    """
+    if compression in (None, "none", "gzip"):
+        return
+    if compression == "zstd":
+        if zstd is None:
+            raise ValueError("zstd compression needs Python 3.14+ (compression.zstd)")
+        return
+    raise ValueError(
+        f"Unknown compression '{compression}'. "
+        f"Choose from: none, {', '.join(COMPRESSION_SUFFIXES)}"
+    )
+
+
+@contextmanager
+def _compressed_text(raw: IO[bytes], compression: Optional[str]) -> Iterator[IO[str]]:
+    """Text stream that compresses into a binary file."""
+    check_compression(compression)
+    if compression in (None, "none"):
+        stream: IO[bytes] = raw
+    elif compression == "gzip":
+        stream = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6)
+    else:
+        stream = zstd.ZstdFile(raw, "wb")
+    text = io.TextIOWrapper(stream, encoding="utf-8", write_through=False)
+    try:
+        yield text
+    finally:
+        # Flush the text buffer and end the compressed stream, but leave
+        # closing the raw file to atomic_write
+        text.flush()
+        text.detach()
+        if stream is not raw:
+            stream.close()
+
+
+def write_transcript_json(
+    transcript: dict[str, Any],
+    path: Path,
+    words: Optional[Iterable[dict[str, Any]]] = None,
+    compression: Optional[str] = None,
+) -> Path:
+    """Stream a transcript to a JSON file, one word per line.
+
+    Words are encoded and written in small batches, so the file never exists
+    as a single string in memory. The result is ordinary JSON that json.load
+    reads.
+
+    Args:
+        transcript: Transcript dictionary (ElevenLabs response shape).
+        path: Destination file. Its suffix should match the compression
+            (see COMPRESSION_SUFFIXES).
+        words: The words to write, e.g. a columnar iterator. Defaults to
+            transcript['words'].
+        compression: None/'none', 'gzip' or 'zstd'.
+
+    Returns:
+        The path written.
+
+    Raises:
+        ValueError: If the compression is unknown or unavailable.
+    """
+    if words is None:
+        words = transcript.get("words") or []
+
+    with atomic_write(path, binary=True) as raw:
+        with _compressed_text(raw, compression) as f:
+            f.write("{")
+            for key, value in transcript.items():
+                if key == "words":
+                    continue
+                f.write(f"\n  {_encode(key)}: {_encode(value)},")
+            f.write('\n  "words": [')
+            batch: list[str] = []
+            separator = "\n    "
+            for word in words:
+                batch.append(_encode(word))
+                if len(batch) == _WORDS_PER_WRITE:
+                    f.write(separator + ",\n    ".join(batch))
+                    separator = ",\n    "
+                    batch.clear()
+            if batch:
+                f.write(separator + ",\n    ".join(batch))
+            f.write("\n  ]\n}\n")
+    return path
+
+
+def load_transcript_json(path: Path) -> Any:
+    """Read a JSON transcript, decompressing .gz and .zst files."""
+    compression = _COMPRESSION_BY_SUFFIX.get(path.suffix)
+    if compression == "gzip":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    if compression == "zstd":
+        if zstd is None:
+            raise ValueError("File is zstd compressed; reading it needs Python 3.14+")
+        with zstd.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
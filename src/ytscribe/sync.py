@@ -0,0 +1,153 @@
+"""Incremental sync of channels and playlists.
+
+Re-running fetch on a channel lists every video it has ever uploaded and checks
+each one for an existing file. Sync keeps a cursor per source in the job ledger
+(the newest video IDs and upload date seen) and lists a source only until it
+reaches a video an earlier run already knows, which for a channel is usually
+its first page. Videos an earlier run listed but didn't finish are behind that
+stop, so they are queued again from the ledger. Many sources are listed
+concurrently.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from ytscribe.downloader import AudioDownloader
+from ytscribe.ledger import TRANSCRIBED, Ledger
+
+# Newest video IDs kept in a source's cursor
+CURSOR_IDS = 20
+
+
+@dataclass
+class SourceUpdate:
+    """What listing one source found.
+
+    Attributes:
+        source_url: The source that was listed.
+        entries: New videos, newest first for channels.
+        retried: Unfinished videos from earlier runs added to `entries`.
+        first_sync: The source had no cursor yet.
+        seconds: Time spent listing.
+        error: Why listing failed, if it did.
+    """
+
+    source_url: str
+    entries: list[dict[str, Any]] = field(default_factory=list)
+    retried: int = 0
+    first_sync: bool = False
+    seconds: float = 0.0
+    error: Optional[Exception] = None
+
+
+def sync_source(
+    downloader: AudioDownloader,
+    ledger: Ledger,
+    source_url: str,
+    initial_limit: Optional[int] = None,
+    retry_unfinished: bool = True,
+    done_states: tuple[str, ...] = (TRANSCRIBED,),
+) -> SourceUpdate:
+    """List the videos a source gained since its last sync and move its cursor.
+
+    Args:
+        downloader: Downloader used for listing (records new videos in the ledger).
+        ledger: Job ledger holding the cursors.
+        source_url: Channel, playlist or video URL.
+        initial_limit: On a source's first sync, take at most this many of
+            its newest videos instead of its whole back catalogue.
+        retry_unfinished: Also return the source's videos that earlier runs
+            listed but did not finish. Listing stops at known videos, so
+            without it a video that failed is never fetched again.
+        done_states: Ledger states of finished videos, e.g.
+            (DOWNLOADED, TRANSCRIBED) when only downloading.
+
+    Returns:
+        The new entries, or the error that stopped listing.
+    """
+    started = time.monotonic()
+    cursor = ledger.get_cursor(source_url)
+    update = SourceUpdate(source_url, first_sync=cursor is None)
+    recent_ids = cursor["recent_ids"] if cursor else []
+    recent = set(recent_ids)
+
+    def is_known(video_id: str) -> bool:
+        return video_id in recent or ledger.is_known(video_id)
+
+    try:
+        with downloader.metrics.span("list", source=source_url):
+            update.entries = list(
+                downloader.iter_new_entries(
+                    source_url,
+                    is_known,
+                    since=cursor["newest_upload_date"] if cursor else None,
+                    limit=initial_limit if cursor is None else None,
+                )
+            )
+    except Exception as e:
+        update.error = e
+        update.seconds = time.monotonic() - started
+        return update
+
+    new_ids = [entry["id"] for entry in update.entries]
+    upload_dates = [e["upload_date"] for e in update.entries if e.get("upload_date")]
+    ledger.save_cursor(
+        source_url,
+        (new_ids + [i for i in recent_ids if i not in new_ids])[:CURSOR_IDS],
+        max(upload_dates, default=None),
+    )
+    downloader.metrics.inc("sync_new_videos_total", len(new_ids))
+
+    if retry_unfinished:
+        listed = set(new_ids)
+        retried = [
+            entry
+            for entry in ledger.unfinished_entries(source_url, done_states)
+            if entry["id"] not in listed
+        ]
+        update.entries += retried
+        update.retried = len(retried)
+    update.seconds = time.monotonic() - started
+    return update
+
+
+def sync_sources(
+    downloader: AudioDownloader,
+    ledger: Ledger,
+    source_urls: list[str],
+    workers: int = 8,
+    initial_limit: Optional[int] = None,
+    retry_unfinished: bool = True,
+    done_states: tuple[str, ...] = (TRANSCRIBED,),
+    on_update: Optional[Callable[[SourceUpdate], None]] = None,
+) -> list[SourceUpdate]:
+    """List many sources concurrently (see sync_source).
+
+    Args:
+        downloader: Downloader used for listing.
+        ledger: Job ledger holding the cursors.
+        source_urls: Sources to list.
+        workers: Number of sources listed at once.
+        initial_limit: Newest videos to take from a source's first sync.
+        retry_unfinished: Also return unfinished videos from earlier runs.
+        done_states: Ledger states of finished videos.
+        on_update: Called with each source's update as soon as it is listed.
+
+    Returns:
+        One update per source, in the order given.
+    """
+    if workers < 1:
+        raise ValueError("Worker count must be at least 1")
+
+    def run(source_url: str) -> SourceUpdate:
+        update = sync_source(
+            downloader, ledger, source_url, initial_limit, retry_unfinished, done_states
+        )
+        if on_update:
+            on_update(update)
+        return update
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="list") as pool:
+        return list(pool.map(run, source_urls))
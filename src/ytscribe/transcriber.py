@@ -3,30 +3,256 @@
 Handles transcription of audio files with speaker diarization and audio event tagging.
 """
 
-import json
+import asyncio
+import hashlib
+import heapq
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, asynccontextmanager, contextmanager, nullcontext
+from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Iterator,
+    Optional,
+)
 
-from elevenlabs.client import ElevenLabs
+import httpx
 
+from ytscribe.audio import probe_duration
+from ytscribe.cache import TranscriptCache
+from ytscribe.chunker import Chunk, split_audio, stitch_transcripts
+from ytscribe.columnar import COLUMNAR_SUFFIX, load_columnar, write_columnar
 from ytscribe.config import Config
+from ytscribe.exporters import EXPORT_FORMATS, export_transcript
+from ytscribe.fingerprint import (
+    FingerprintIndex,
+    compute_fingerprint,
+    reuse_transcript,
+)
+from ytscribe.ledger import Ledger, video_id_from_path
+from ytscribe.metrics import Metrics, TimedUpload
+from ytscribe.preprocess import PreprocessResult, PreprocessSettings, preprocess_audio
+from ytscribe.retry import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    NotRetryable,
+    Retrier,
+    classify,
+)
+from ytscribe.storage import (
+    COMPRESSION_SUFFIXES,
+    load_transcript_json,
+    write_transcript_json,
+)
+
+if TYPE_CHECKING:
+    from elevenlabs.client import AsyncElevenLabs, ElevenLabs
 
 # ElevenLabs limits
 MAX_FILE_SIZE_BYTES = 3 * 1024 * 1024 * 1024  # 3 GB
 MAX_DURATION_HOURS = 10
 
+MODEL_ID = "scribe_v1"
+
+# Chunk length used when a file must be split to fit the limits above
+DEFAULT_CHUNK_MINUTES = 60
+
+# Keep chunks this far below the limits (silence search may lengthen them)
+_CHUNK_HEADROOM = 0.8
+
+# Request timeout the SDK uses with its own HTTP client
+_REQUEST_TIMEOUT_SECONDS = 240.0
+
+# Errors that leave open whether the API received (and billed) the request
+_AMBIGUOUS_ERRORS = (httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+
+def _raise_if_billed(
+    error: Exception, upload: TimedUpload, webhook: bool = False
+) -> None:
+    """Stop retries of a request that failed after it may have been billed.
+
+    Once the whole file is uploaded the API may be transcribing it, and a retry
+    would upload and pay for it again. Webhook submissions are never retried on
+    a read timeout, as they are billed as soon as they are accepted.
+
+    Args:
+        error: One of _AMBIGUOUS_ERRORS raised by the request.
+        upload: The wrapped file the request body was read from.
+        webhook: Whether the request was a webhook submission.
+
+    Raises:
+        NotRetryable: If the request may have been billed.
+    """
+    if upload.eof_at is not None or (webhook and isinstance(error, httpx.ReadTimeout)):
+        raise NotRetryable(
+            f"{type(error).__name__} after the upload; not retried, as the "
+            f"request may already be billed: {error}"
+        ) from error
+
+
+def _audio_seconds(transcript: dict[str, Any]) -> float:
+    """Length of the transcribed audio, from the last word's end time."""
+    # Preprocessed uploads are shorter than the timestamps suggest
+    if transcript.get("preprocess"):
+        return transcript["preprocess"]["processed_seconds"]
+    return max(
+        (word.get("end") or 0 for word in transcript.get("words") or []), default=0
+    )
+
+
+def _chunk_key(cache_key: str, chunk: Chunk) -> str:
+    """Cache key for one chunk of a file, from the file's key and the cut."""
+    cut = f"{cache_key}:{chunk.start:.3f}-{chunk.end:.3f}"
+    return hashlib.sha256(cut.encode()).hexdigest()
+
+
+class _OrderedSlots:
+    """Request slots handed to the waiting file that comes first in the batch.
+
+    asyncio.Semaphore wakes waiters in arrival order, which for a batch
+    depends on how long each file took to check and preprocess; this keeps
+    the caller's order (e.g. longest first, see ytscribe.schedule).
+    """
+
+    def __init__(self, count: int) -> None:
+        self._free = count
+        self._waiting: list[tuple[int, asyncio.Future[None]]] = []
+
+    @asynccontextmanager
+    async def slot(self, position: int) -> AsyncIterator[None]:
+        """Hold one slot; lower positions are served first."""
+        if self._free > 0 and not self._waiting:
+            self._free -= 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiting, (position, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Granted just before the cancellation: pass the slot on
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        while self._waiting:
+            _, waiter = heapq.heappop(self._waiting)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._free += 1
+
 
 class Transcriber:
     """Transcribes audio files using ElevenLabs Scribe v1 API."""
 
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        ledger: Optional[Ledger] = None,
+        chunk_minutes: Optional[float] = None,
+        chunk_workers: int = 4,
+        metrics: Optional[Metrics] = None,
+        preprocess: Optional[PreprocessSettings] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        attempts: int = 5,
+        fingerprints: Optional[FingerprintIndex] = None,
+        ffmpeg_slots: Optional[threading.BoundedSemaphore] = None,
+    ) -> None:
         """Initialize the transcriber.
 
         Args:
             config: Application configuration with API key and paths.
+            ledger: Job ledger to record transcription progress in.
+            chunk_minutes: Split files longer than this into chunks transcribed
+                in parallel. None splits only files over the API limits.
+            chunk_workers: Concurrent requests per chunked file.
+            metrics: Run metrics to record stage timings and counters in.
+            preprocess: Downmix, re-encode and shorten silences before upload
+                (see ytscribe.preprocess). None uploads files as they are.
+            limiter: Adaptive limit on API requests in flight (see
+                ytscribe.retry). None leaves concurrency to the callers.
+            attempts: API calls per request before giving up on transient
+                errors and throttling.
+            fingerprints: Acoustic fingerprint index (see
+                ytscribe.fingerprint). On a cache miss, the cached transcript
+                of a file with the same audio, or of the longer video a clip
+                was cut from, is reused instead of calling the API. None
+                turns this off.
+            ffmpeg_slots: The downloader's limit on FFmpeg processes at once,
+                also taken when fingerprinting files the downloader didn't.
         """
         self.config = config
-        self.client = ElevenLabs(api_key=config.elevenlabs_api_key)
+        self.ledger = ledger
+        self.fingerprints = fingerprints
+        self.ffmpeg_slots = ffmpeg_slots
+        self.chunk_minutes = chunk_minutes
+        self.chunk_workers = chunk_workers
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.preprocess = preprocess
+        # Created on first use, so runs with the cache off never touch it
+        self._cache: Optional[TranscriptCache] = None
+        self._cache_lock = threading.Lock()
+        # Durations already measured by a pre-flight plan, to skip ffprobe
+        self.durations: dict[Path, float] = {}
+        # Retries happen here rather than in the SDK, so that throttling is
+        # seen by the circuit breaker and the limiter
+        self.retrier = Retrier(
+            "transcribe",
+            CircuitBreaker("ElevenLabs API", metrics=self.metrics),
+            limiter,
+            self.metrics,
+            attempts=attempts,
+            transient_types=(httpx.TransportError,),
+        )
+        self._client: Optional["ElevenLabs"] = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def cache(self) -> TranscriptCache:
+        """Transcript cache, created on first use."""
+        with self._cache_lock:
+            if self._cache is None:
+                self._cache = TranscriptCache(
+                    self.config.cache_root, self.config.cache_max_bytes
+                )
+            return self._cache
+
+    @property
+    def client(self) -> "ElevenLabs":
+        """Sync ElevenLabs client, created on first use.
+
+        Importing the SDK is slow, and runs served from the cache need neither
+        the SDK nor an API key.
+
+        Raises:
+            ValueError: If ELEVENLABS_API_KEY is not set.
+        """
+        with self._client_lock:
+            if self._client is None:
+                from elevenlabs.client import ElevenLabs
+
+                self._client = ElevenLabs(
+                    api_key=self.config.require_api_key(),
+                    base_url=self.config.elevenlabs_base_url,
+                    httpx_client=httpx.Client(
+                        timeout=_REQUEST_TIMEOUT_SECONDS, follow_redirects=True
+                    ),
+                )
+            return self._client
 
     def _validate_audio_file(self, audio_path: Path) -> None:
         """Validate audio file before transcription.
@@ -34,9 +260,12 @@ class Transcriber:
         Args:
             audio_path: Path to the audio file.
 
+        Files over the API limits are not rejected here; they are split into
+        chunks (see _plan_split).
+
         Raises:
             FileNotFoundError: If file doesn't exist.
-            ValueError: If file exceeds size limits.
+            ValueError: If file is empty or not a file.
         """
         if not audio_path.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
@@ -44,17 +273,55 @@ class Transcriber:
         if not audio_path.is_file():
             raise ValueError(f"Path is not a file: {audio_path}")
 
-        # Check file size
+        if audio_path.stat().st_size == 0:
+            raise ValueError(f"Audio file is empty: {audio_path}")
+
+    def _plan_split(self, audio_path: Path) -> Optional[tuple[float, float]]:
+        """Decide whether an audio file must be transcribed in chunks.
+
+        Files over the ElevenLabs size or duration limit are always split;
+        with chunk_minutes set, files longer than that are split too.
+
+        Args:
+            audio_path: Path to the audio file.
+
+        Returns:
+            Tuple of (duration, target chunk length) in seconds, or None to
+            send the file as a single request.
+
+        Raises:
+            ValueError: If the file is over the size limit and its duration
+                can't be read to split it.
+        """
         file_size = audio_path.stat().st_size
-        if file_size > MAX_FILE_SIZE_BYTES:
-            size_gb = file_size / (1024**3)
-            raise ValueError(
-                f"File size ({size_gb:.2f} GB) exceeds ElevenLabs limit of 3 GB. "
-                "Consider splitting the audio file."
-            )
+        try:
+            duration = self.durations.get(audio_path) or probe_duration(audio_path)
+        except (FileNotFoundError, ValueError):
+            if file_size > MAX_FILE_SIZE_BYTES:
+                size_gb = file_size / (1024**3)
+                raise ValueError(
+                    f"File size ({size_gb:.2f} GB) exceeds ElevenLabs limit of 3 GB, "
+                    "and ffprobe could not read its duration to split it."
+                )
+            return None
 
-        if file_size == 0:
-            raise ValueError(f"Audio file is empty: {audio_path}")
+        max_seconds = MAX_DURATION_HOURS * 3600
+        over_limit = file_size > MAX_FILE_SIZE_BYTES or duration > max_seconds
+
+        if self.chunk_minutes:
+            target = self.chunk_minutes * 60
+        elif over_limit:
+            target = DEFAULT_CHUNK_MINUTES * 60
+        else:
+            return None
+
+        # Longest chunk that stays under both limits at this file's bitrate
+        limit = min(max_seconds, duration * MAX_FILE_SIZE_BYTES / file_size)
+        target = min(target, limit * _CHUNK_HEADROOM)
+
+        if not over_limit and duration <= target * 1.2:
+            return None
+        return duration, target
 
     def _generate_output_paths(self, audio_path: Path) -> tuple[Path, Path]:
         """Generate output paths for transcript files.
@@ -62,6 +329,8 @@ class Transcriber:
         Creates paths matching the audio file structure:
         - Audio: data/audio/{channel}/{date}_{id}.opus
         - JSON:  data/transcripts/{channel}/{date}_{id}.json
+                 (.json.gz/.json.zst with TRANSCRIPT_COMPRESSION, .words
+                 with the columnar transcript store)
         - MD:    data/transcripts/{channel}/{date}_{id}.md
 
         Args:
@@ -86,75 +355,522 @@ class Transcriber:
         transcript_dir = self.config.transcript_root / channel_dir
         transcript_dir.mkdir(parents=True, exist_ok=True)
 
-        json_path = transcript_dir / f"{filename_stem}.json"
+        if self.config.transcript_store == "columnar":
+            data_suffix = COLUMNAR_SUFFIX
+        else:
+            data_suffix = ".json" + COMPRESSION_SUFFIXES.get(
+                self.config.transcript_compression or "none", ""
+            )
+        json_path = transcript_dir / f"{filename_stem}{data_suffix}"
         md_path = transcript_dir / f"{filename_stem}.md"
 
         return json_path, md_path
 
-    def _format_timestamp(self, seconds: float) -> str:
-        """Format timestamp in MM:SS.mmm format.
+    def _build_api_kwargs(
+        self,
+        audio_file: BinaryIO,
+        language: Optional[str],
+        tag_audio_events: bool,
+        diarize: bool,
+    ) -> dict[str, Any]:
+        """Build keyword arguments for speech_to_text.convert.
 
         Args:
-            seconds: Time in seconds.
+            audio_file: Open audio file handle.
+            language: Language code or None for auto-detect.
+            tag_audio_events: Whether to tag audio events like laughter.
+            diarize: Whether to identify speakers.
 
         Returns:
-            Formatted timestamp string.
+            Keyword arguments for the SDK call.
         """
-        minutes = int(seconds // 60)
-        secs = seconds % 60
-        return f"{minutes:02d}:{secs:06.3f}"
+        # Build kwargs dynamically to avoid passing None as empty string
+        api_kwargs: dict[str, Any] = {
+            "file": audio_file,
+            "model_id": MODEL_ID,
+            "tag_audio_events": tag_audio_events,
+            "diarize": diarize,
+            # Retried by self.retrier instead
+            "request_options": {"max_retries": 0},
+        }
+
+        # Only include language_code if explicitly provided
+        if language:
+            api_kwargs["language_code"] = language
 
-    def _generate_markdown(
-        self, transcript_data: dict[str, Any], audio_path: Path
-    ) -> str:
-        """Generate human-readable Markdown from transcript data.
+        return api_kwargs
+
+    def _api_error(self, e: Exception) -> Exception:
+        """Wrap an SDK error with a user-facing explanation.
 
         Args:
-            transcript_data: Raw API response from ElevenLabs.
-            audio_path: Path to original audio file.
+            e: Exception raised by the ElevenLabs SDK.
 
         Returns:
-            Formatted Markdown string.
+            Exception with more context, to be raised by the caller.
         """
-        lines = []
+        status = classify(e).status
+        if status == 401:
+            return Exception(
+                f"Authentication failed. Please check your ELEVENLABS_API_KEY: {e}"
+            )
+        elif status == 429:
+            return Exception(
+                f"Rate limit exceeded. Please wait and try again later: {e}"
+            )
+        elif status == 413:
+            return Exception(f"File too large for ElevenLabs API (max 3GB, 10h): {e}")
+        else:
+            return Exception(f"Transcription API error: {e}")
 
-        # Header
-        filename = audio_path.name
-        lines.append(f"# Transcript: {filename}\n")
+    def _record_request(
+        self, video_id: str, upload: TimedUpload, started: float
+    ) -> None:
+        """Split a finished API request into upload and transcription spans.
 
-        # Metadata
-        lines.append("## Metadata\n")
-        lines.append(f"- **Audio File:** `{audio_path}`")
-        lines.append(
-            f"- **Language:** {transcript_data.get('language_code', 'unknown')}"
-        )
-        lines.append(
-            f"- **Language Probability:** {transcript_data.get('language_probability', 0):.2f}"
+        Args:
+            video_id: Video the request was for.
+            upload: The wrapped file the request body was read from.
+            started: time.monotonic() when the request was sent.
+        """
+        finished = time.monotonic()
+        uploaded = upload.eof_at or finished
+        self.metrics.record(
+            "upload", started, uploaded, video_id, bytes=upload.bytes_read
         )
-        lines.append("")
-
-        # Full transcript
-        lines.append("## Full Transcript\n")
-        full_text = transcript_data.get("text", "")
-        lines.append(full_text)
-        lines.append("")
-
-        # Audio events
-        words = transcript_data.get("words", [])
-        audio_events = [word for word in words if word.get("type") == "audio_event"]
-        if audio_events:
-            lines.append("## Audio Events\n")
-            for event in audio_events:
-                start = event.get("start", 0)
-                end = event.get("end", 0)
-                text = event.get("text", "unknown")
-                timestamp_str = (
-                    f"[{self._format_timestamp(start)} - {self._format_timestamp(end)}]"
-                )
-                lines.append(f"- {timestamp_str} *{text}*")
-            lines.append("")
-
-        return "\n".join(lines)
+        self.metrics.record("transcription_wait", uploaded, finished, video_id)
+        self.metrics.inc("bytes_uploaded_total", upload.bytes_read)
+
+    def _cache_options(
+        self, language: Optional[str], tag_audio_events: bool, diarize: bool
+    ) -> dict[str, Any]:
+        """Get the transcription options that make up the cache key."""
+        options: dict[str, Any] = {
+            "model_id": MODEL_ID,
+            "language": language,
+            "tag_audio_events": tag_audio_events,
+            "diarize": diarize,
+        }
+        # Keys without preprocessing stay the same as before it existed
+        if self.preprocess is not None:
+            options["preprocess"] = asdict(self.preprocess)
+        return options
+
+    @contextmanager
+    def _preprocessed(
+        self, audio_path: Path
+    ) -> Iterator[tuple[Path, Optional[PreprocessResult]]]:
+        """Prepare the file to upload for an audio file.
+
+        With preprocessing on, the processed file lives in a temporary
+        directory for the duration of the block.
+
+        Args:
+            audio_path: Path to the audio file.
+
+        Yields:
+            Tuple of (path to upload, preprocessing result or None if
+            preprocessing is off).
+        """
+        if self.preprocess is None:
+            yield audio_path, None
+            return
+
+        video_id = video_id_from_path(audio_path)
+        with tempfile.TemporaryDirectory(prefix="ytscribe-preprocess-") as tmp_dir:
+            # Same file name, so chunks and metrics still carry the video ID
+            output_path = Path(tmp_dir) / f"{audio_path.stem}.opus"
+            with self.metrics.span("preprocess", video_id) as span:
+                result = preprocess_audio(audio_path, output_path, self.preprocess)
+                span.attrs.update(
+                    bytes_saved=result.bytes_saved, seconds_saved=result.seconds_saved
+                )
+            self.metrics.inc("preprocess_bytes_saved_total", result.bytes_saved)
+            self.metrics.inc("preprocess_seconds_saved_total", result.seconds_saved)
+            print(
+                f"  🗜  Preprocessed {audio_path.name}: "
+                f"{result.original_bytes / 1024**2:.1f} → "
+                f"{result.processed_bytes / 1024**2:.1f} MB, "
+                f"{result.original_seconds / 60:.1f} → "
+                f"{result.processed_seconds / 60:.1f} min "
+                f"(saved {result.bytes_saved / 1024**2:.1f} MB, "
+                f"{result.seconds_saved:.0f} s)"
+            )
+            yield result.path, result
+
+    def _restore_times(
+        self, transcript: dict[str, Any], preprocessed: Optional[PreprocessResult]
+    ) -> dict[str, Any]:
+        """Move a preprocessed file's word times back to original-file time.
+
+        The savings are kept in the transcript under 'preprocess'.
+        """
+        if preprocessed is None:
+            return transcript
+        return {
+            **preprocessed.time_map.restore(transcript),
+            "preprocess": preprocessed.summary(),
+        }
+
+    def _check_cache(
+        self,
+        audio_path: Path,
+        language: Optional[str],
+        tag_audio_events: bool,
+        diarize: bool,
+        use_cache: bool,
+        refresh: bool,
+    ) -> tuple[Optional[str], Optional[dict[str, Any]]]:
+        """Look up a cached response for an audio file.
+
+        On a miss, a transcript reused from a reupload or from the video a
+        clip was cut from (see _reuse_duplicate) counts as a hit, and is
+        cached under this file's key. Duplicates are looked up even with the
+        cache off, since reusing them saves a paid request either way.
+
+        Args:
+            audio_path: Path to the audio file.
+            language: Language code or None for auto-detect.
+            tag_audio_events: Whether to tag audio events like laughter.
+            diarize: Whether to identify speakers.
+            use_cache: Whether cached responses are used and new ones stored.
+            refresh: Ignore cached responses and duplicates (the new response
+                is still stored).
+
+        Returns:
+            Tuple of (cache key or None if caching is off, cached response or None).
+        """
+        options = self._cache_options(language, tag_audio_events, diarize)
+        key = self.cache.key(audio_path, options) if use_cache else None
+        if refresh:
+            return key, None
+        cached = self.cache.get(key) if key is not None else None
+        if cached is None:
+            cached = self._reuse_duplicate(audio_path, options, use_cache)
+            if cached is not None and key is not None:
+                self.cache.put(key, cached)
+        return key, cached
+
+    def _reuse_duplicate(
+        self, audio_path: Path, options: dict[str, Any], use_cache: bool = True
+    ) -> Optional[dict[str, Any]]:
+        """Build a transcript from the transcript of matching audio.
+
+        The matching file's cached response is preferred. When it has been
+        evicted, or the cache is off, the transcript the ledger recorded for
+        the matching video is used instead.
+
+        Args:
+            audio_path: Path to the audio file.
+            options: Transcription options, as in the cache key; only
+                cached transcripts made with the same options are reused.
+            use_cache: Whether to look in the cache before the ledger.
+
+        Returns:
+            The transcript, or None if no indexed file with a known
+            transcript contains this file's audio (or there is no index).
+        """
+        if self.fingerprints is None:
+            return None
+        video_id = video_id_from_path(audio_path)
+        fingerprint = self.fingerprints.get(video_id)
+        if fingerprint is None:
+            # Downloaded without fingerprinting (e.g. before it was enabled)
+            try:
+                with self.ffmpeg_slots or nullcontext():
+                    with self.metrics.span("fingerprint", video_id):
+                        fingerprint = compute_fingerprint(audio_path)
+            except (OSError, RuntimeError) as e:
+                print(
+                    f"  ⚠️  Could not fingerprint {audio_path.name}: {e}",
+                    file=sys.stderr,
+                )
+                return None
+            self.fingerprints.add(video_id, audio_path, fingerprint)
+
+        for match in self.fingerprints.find(fingerprint, exclude=video_id):
+            original = None
+            if use_cache:
+                try:
+                    original = self.cache.get(self.cache.key(match.audio_path, options))
+                except OSError:
+                    # The matched file has been deleted or moved
+                    pass
+            if original is None:
+                original = self._load_transcript(match.video_id)
+            if original is None:
+                continue
+            self.metrics.inc("duplicates_total", exact=match.exact)
+            if match.exact:
+                print(f"  🔁 {audio_path.name} is a reupload of {match.video_id}")
+            else:
+                print(
+                    f"  🔁 {audio_path.name} is a clip of {match.video_id} "
+                    f"from {match.offset:.1f}s"
+                )
+            return reuse_transcript(original, match)
+        return None
+
+    def _load_transcript(self, video_id: str) -> Optional[dict[str, Any]]:
+        """Read the transcript the ledger recorded for a video, if any."""
+        if self.ledger is None:
+            return None
+        row = self.ledger.get(video_id)
+        if row is None or not row.get("json_path"):
+            return None
+        path = Path(row["json_path"])
+        try:
+            if path.suffix == COLUMNAR_SUFFIX:
+                with load_columnar(path) as columnar:
+                    return columnar.to_dict()
+            transcript = load_transcript_json(path)
+        except (OSError, ValueError):
+            # Deleted, moved or unreadable; transcribe instead
+            return None
+        if not isinstance(transcript, dict) or "words" not in transcript:
+            return None
+        return transcript
+
+    def _response_to_dict(
+        self, response: Any, video_id: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Convert an SDK response to a plain dictionary."""
+        with self.metrics.profiler.stage("parse_response", video_id):
+            return (
+                response.model_dump()
+                if hasattr(response, "model_dump")
+                else dict(response)
+            )
+
+    def _save_outputs(
+        self,
+        transcript_data: dict[str, Any],
+        audio_path: Path,
+        json_path: Path,
+        md_path: Path,
+        cached: bool = False,
+    ) -> dict[str, Any]:
+        """Write the JSON and Markdown outputs for a transcript.
+
+        Formats listed in EXPORT_FORMATS (SRT, VTT, text) are written next to
+        the Markdown file in the same pass. Every file is streamed to a
+        temporary file and renamed into place when complete.
+
+        Args:
+            transcript_data: Raw API response from ElevenLabs, as a dictionary.
+            audio_path: Path to original audio file.
+            json_path: Destination for the raw transcript (JSON, or the
+                columnar format if its suffix is .words).
+            md_path: Destination for the Markdown transcript.
+            cached: Whether the transcript came from the local cache.
+
+        Returns:
+            Dictionary with keys 'transcript', 'json_path', 'md_path',
+            'export_paths' (output path per format) and 'cached'.
+        """
+        video_id = video_id_from_path(audio_path)
+
+        # Save raw transcript
+        with self.metrics.span("write_json", video_id) as span:
+            if json_path.suffix == COLUMNAR_SUFFIX:
+                write_columnar(
+                    transcript_data, json_path, self.config.transcript_compression
+                )
+            else:
+                write_transcript_json(
+                    transcript_data,
+                    json_path,
+                    compression=self.config.transcript_compression,
+                )
+            span.attrs["bytes"] = json_path.stat().st_size
+
+        # Markdown plus any extra formats, in one pass over the words
+        export_paths = {"md": md_path} | {
+            name: md_path.with_suffix(EXPORT_FORMATS[name])
+            for name in self.config.export_formats
+        }
+        with self.metrics.span("write_exports", video_id) as span:
+            export_transcript(
+                transcript_data,
+                transcript_data.get("words") or [],
+                audio_path,
+                export_paths,
+            )
+            span.attrs["bytes"] = sum(
+                path.stat().st_size for path in export_paths.values()
+            )
+
+        return {
+            "transcript": transcript_data,
+            "json_path": json_path,
+            "md_path": md_path,
+            "export_paths": export_paths,
+            "cached": cached,
+        }
+
+    def _record_start(self, audio_path: Path) -> float:
+        """Mark a file as transcribing in the ledger.
+
+        Returns:
+            Monotonic start time, for _record_finish.
+        """
+        if self.ledger is not None:
+            self.ledger.mark_transcribing(video_id_from_path(audio_path))
+        return time.monotonic()
+
+    def _record_finish(
+        self,
+        audio_path: Path,
+        started: Optional[float],
+        result: Optional[dict[str, Any]] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """Record a finished or failed transcription in the ledger and metrics.
+
+        `started` is None for a file that failed before it was started.
+        """
+        if result is not None:
+            self.metrics.inc("transcripts_total", cached=bool(result["cached"]))
+            if not result["cached"]:
+                self.metrics.inc(
+                    "audio_minutes_transcribed_total",
+                    _audio_seconds(result["transcript"]) / 60,
+                )
+        else:
+            self.metrics.inc("failures_total", stage="transcribe")
+
+        if self.ledger is None:
+            return
+        video_id = video_id_from_path(audio_path)
+        if result is not None:
+            self.ledger.mark_transcribed(
+                video_id,
+                result["json_path"],
+                result["md_path"],
+                time.monotonic() - started if started is not None else None,
+            )
+        else:
+            self.ledger.mark_failed(video_id, "transcribe", str(error))
+
+    def _convert(
+        self,
+        audio_path: Path,
+        language: Optional[str],
+        tag_audio_events: bool,
+        diarize: bool,
+        video_id: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Send one audio file to the API with the sync client.
+
+        Args:
+            audio_path: Audio file (or chunk) to upload.
+            language: Language code or None for auto-detect.
+            tag_audio_events: Whether to tag audio events like laughter.
+            diarize: Whether to identify speakers.
+            video_id: Video the file belongs to, for metrics (defaults to the
+                ID in the file name).
+
+        Returns:
+            Raw API response as a dictionary.
+        """
+        video_id = video_id or video_id_from_path(audio_path)
+
+        def send() -> Any:
+            # Reopened on every attempt, so a retry uploads the whole file
+            with open(audio_path, "rb") as audio_file:
+                upload = TimedUpload(audio_file)
+                api_kwargs = self._build_api_kwargs(
+                    upload, language, tag_audio_events, diarize
+                )
+                started = time.monotonic()
+                try:
+                    response = self.client.speech_to_text.convert(**api_kwargs)
+                except _AMBIGUOUS_ERRORS as e:
+                    _raise_if_billed(e, upload)
+                    raise
+                self._record_request(video_id, upload, started)
+            return response
+
+        try:
+            response = self.retrier.call(send)
+        except Exception as e:
+            # Re-raise with more context
+            raise self._api_error(e) from e
+
+        return self._response_to_dict(response, video_id)
+
+    def _transcribe_chunked(
+        self,
+        audio_path: Path,
+        duration: float,
+        target_seconds: float,
+        language: Optional[str],
+        tag_audio_events: bool,
+        diarize: bool,
+        cache_key: Optional[str] = None,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Split a long file at silences and transcribe the chunks in parallel.
+
+        Each chunk's response is cached on its own, so when one chunk fails
+        the ones already paid for are reused on the next attempt.
+
+        Args:
+            audio_path: Path to the audio file.
+            duration: Audio duration in seconds.
+            target_seconds: Desired chunk length.
+            language: Language code or None for auto-detect.
+            tag_audio_events: Whether to tag audio events like laughter.
+            diarize: Whether to identify speakers.
+            cache_key: Cache key of the whole file, or None to not cache chunks.
+            refresh: Transcribe every chunk even if it is cached.
+
+        Returns:
+            Stitched transcript, in the same shape as a single API response.
+        """
+        video_id = video_id_from_path(audio_path)
+        with tempfile.TemporaryDirectory(prefix="ytscribe-chunks-") as tmp_dir:
+            with self.metrics.span("split", video_id) as span:
+                chunks = split_audio(
+                    audio_path, Path(tmp_dir), duration, target_seconds
+                )
+                span.attrs["chunks"] = len(chunks)
+            print(
+                f"  ✂️  Split {audio_path.name} ({duration / 60:.0f} min) "
+                f"into {len(chunks)} chunks"
+            )
+
+            def convert(chunk: Chunk) -> dict[str, Any]:
+                key = _chunk_key(cache_key, chunk) if cache_key else None
+                if key is not None and not refresh:
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        return cached
+                transcript = self._convert(
+                    chunk.path, language, tag_audio_events, diarize, video_id
+                )
+                if key is not None:
+                    self.cache.put(key, transcript)
+                return transcript
+
+            workers = max(1, min(self.chunk_workers, len(chunks)))
+            transcripts: list[dict[str, Any]] = [{} for _ in chunks]
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="chunk"
+            ) as executor:
+                futures = {
+                    executor.submit(convert, chunk): i for i, chunk in enumerate(chunks)
+                }
+                try:
+                    for future in as_completed(futures):
+                        transcripts[futures[future]] = future.result()
+                except BaseException:
+                    # Don't start chunks that would be thrown away
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+
+        return stitch_transcripts(chunks, transcripts)
 
     def transcribe(
         self,
@@ -162,6 +878,8 @@ class Transcriber:
         language: Optional[str] = None,
         tag_audio_events: bool = True,
         diarize: bool = True,
+        use_cache: bool = True,
+        refresh: bool = False,
     ) -> dict[str, Any]:
         """Transcribe an audio file using ElevenLabs Scribe v1.
 
@@ -170,75 +888,494 @@ class Transcriber:
             language: Language code (e.g., 'eng', 'spa'). None for auto-detect.
             tag_audio_events: Whether to tag audio events like laughter.
             diarize: Whether to identify speakers.
+            use_cache: Reuse a cached response for identical audio and options.
+            refresh: Call the API even on a cache hit and replace the entry.
 
         Returns:
             Dictionary containing transcript data and output paths.
-            Keys: 'transcript', 'json_path', 'md_path'
+            Keys: 'transcript', 'json_path', 'md_path', 'cached'
 
         Raises:
             FileNotFoundError: If audio file doesn't exist.
-            ValueError: If file exceeds size limits.
+            ValueError: If file is empty, or too large and can't be split.
             Exception: For API errors or network issues.
         """
+        started = self._record_start(audio_path)
+        try:
+            result = self._transcribe(
+                audio_path, language, tag_audio_events, diarize, use_cache, refresh
+            )
+        except Exception as e:
+            self._record_finish(audio_path, started, error=e)
+            raise
+
+        self._record_finish(audio_path, started, result=result)
+        return result
+
+    def _transcribe(
+        self,
+        audio_path: Path,
+        language: Optional[str],
+        tag_audio_events: bool,
+        diarize: bool,
+        use_cache: bool,
+        refresh: bool,
+    ) -> dict[str, Any]:
+        """Transcribe one file (see transcribe), without ledger bookkeeping."""
         # Validate input file
         self._validate_audio_file(audio_path)
 
         # Generate output paths
         json_path, md_path = self._generate_output_paths(audio_path)
 
-        # Call ElevenLabs API
-        try:
-            with open(audio_path, "rb") as audio_file:
-                # Build kwargs dynamically to avoid passing None as empty string
-                api_kwargs = {
-                    "file": audio_file,
-                    "model_id": "scribe_v1",
-                    "tag_audio_events": tag_audio_events,
-                    "diarize": diarize,
-                }
+        cache_key, cached = self._check_cache(
+            audio_path, language, tag_audio_events, diarize, use_cache, refresh
+        )
+        if cached is not None:
+            return self._save_outputs(
+                cached, audio_path, json_path, md_path, cached=True
+            )
 
-                # Only include language_code if explicitly provided
-                if language:
-                    api_kwargs["language_code"] = language
+        # Call ElevenLabs API, in chunks for long files
+        with self._preprocessed(audio_path) as (upload_path, preprocessed):
+            split = self._plan_split(upload_path)
+            if split is not None:
+                transcript_data = self._transcribe_chunked(
+                    upload_path,
+                    *split,
+                    language,
+                    tag_audio_events,
+                    diarize,
+                    cache_key,
+                    refresh,
+                )
+            else:
+                transcript_data = self._convert(
+                    upload_path, language, tag_audio_events, diarize
+                )
+        transcript_data = self._restore_times(transcript_data, preprocessed)
 
-                response = self.client.speech_to_text.convert(**api_kwargs)
+        if cache_key is not None:
+            self.cache.put(cache_key, transcript_data)
 
-            # Convert response to dictionary
-            transcript_data = (
-                response.model_dump()
-                if hasattr(response, "model_dump")
-                else dict(response)
+        return self._save_outputs(transcript_data, audio_path, json_path, md_path)
+
+    def submit(
+        self,
+        audio_path: Path,
+        language: Optional[str] = None,
+        tag_audio_events: bool = True,
+        diarize: bool = True,
+        use_cache: bool = True,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Submit an audio file in webhook mode without waiting for the transcript.
+
+        The request ID is recorded in the job ledger; the outputs are written
+        by complete_webhook when ElevenLabs posts the result. Cache hits,
+        files that have to be split (chunks are stitched locally) and, with
+        preprocessing on, every file (its time map is only held in memory)
+        finish immediately instead.
+
+        Args:
+            audio_path: Path to the audio file.
+            language: Language code (e.g., 'eng', 'spa'). None for auto-detect.
+            tag_audio_events: Whether to tag audio events like laughter.
+            diarize: Whether to identify speakers.
+            use_cache: Reuse a cached response for identical audio and options.
+            refresh: Call the API even on a cache hit and replace the entry.
+
+        Returns:
+            Dictionary with keys 'audio_path', 'request_id' (None if finished
+            immediately) and 'result' (same keys as transcribe, or None while
+            the webhook is pending).
+
+        Raises:
+            ValueError: If the transcriber has no job ledger.
+            Exception: For API errors or network issues.
+        """
+        if self.ledger is None:
+            raise ValueError("Webhook mode needs a job ledger to track request IDs")
+
+        self._validate_audio_file(audio_path)
+        json_path, md_path = self._generate_output_paths(audio_path)
+        video_id = video_id_from_path(audio_path)
+
+        cache_key, cached = self._check_cache(
+            audio_path, language, tag_audio_events, diarize, use_cache, refresh
+        )
+        if cached is not None:
+            started = self._record_start(audio_path)
+            result = self._save_outputs(
+                cached, audio_path, json_path, md_path, cached=True
             )
+            self._record_finish(audio_path, started, result=result)
+            return {"audio_path": audio_path, "request_id": None, "result": result}
 
-        except Exception as e:
-            # Re-raise with more context
-            error_msg = str(e)
-            if "401" in error_msg or "authentication" in error_msg.lower():
-                raise Exception(
-                    f"Authentication failed. Please check your ELEVENLABS_API_KEY: {e}"
-                )
-            elif "429" in error_msg or "rate limit" in error_msg.lower():
-                raise Exception(
-                    f"Rate limit exceeded. Please wait and try again later: {e}"
-                )
-            elif "413" in error_msg or "too large" in error_msg.lower():
-                raise Exception(
-                    f"File too large for ElevenLabs API (max 3GB, 10h): {e}"
+        if self.preprocess is not None or self._plan_split(audio_path) is not None:
+            result = self.transcribe(
+                audio_path, language, tag_audio_events, diarize, use_cache, refresh
+            )
+            return {"audio_path": audio_path, "request_id": None, "result": result}
+
+        def send() -> tuple[Any, TimedUpload, float]:
+            with open(audio_path, "rb") as audio_file:
+                upload = TimedUpload(audio_file)
+                api_kwargs = self._build_api_kwargs(
+                    upload, language, tag_audio_events, diarize
                 )
-            else:
-                raise Exception(f"Transcription API error: {e}")
+                started = time.monotonic()
+                try:
+                    response = self.client.speech_to_text.convert(
+                        **api_kwargs, webhook=True
+                    )
+                except _AMBIGUOUS_ERRORS as e:
+                    _raise_if_billed(e, upload, webhook=True)
+                    raise
+            return response, upload, started
 
-        # Save JSON output
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(transcript_data, f, indent=2, ensure_ascii=False)
+        try:
+            response, upload, started = self.retrier.call(send)
+        except Exception as e:
+            error = self._api_error(e)
+            self.metrics.inc("failures_total", stage="transcribe")
+            self.ledger.mark_failed(video_id, "transcribe", str(error))
+            raise error from e
 
-        # Generate and save Markdown
-        markdown_content = self._generate_markdown(transcript_data, audio_path)
-        with open(md_path, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
+        # The transcription itself happens after this, reported by webhook
+        self.metrics.record(
+            "upload", started, time.monotonic(), video_id, bytes=upload.bytes_read
+        )
+        self.metrics.inc("bytes_uploaded_total", upload.bytes_read)
 
+        self.ledger.mark_transcribing(video_id)
+        self.ledger.add_webhook_request(
+            response.request_id, video_id, audio_path, cache_key
+        )
         return {
-            "transcript": transcript_data,
-            "json_path": json_path,
-            "md_path": md_path,
+            "audio_path": audio_path,
+            "request_id": response.request_id,
+            "result": None,
         }
+
+    def submit_many(
+        self,
+        audio_paths: list[Path],
+        concurrency: int = 4,
+        on_submitted: Optional[Callable[[dict[str, Any]], None]] = None,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+        **kwargs: Any,
+    ) -> list[dict[str, Any] | Exception]:
+        """Submit several audio files in webhook mode.
+
+        Each upload returns as soon as ElevenLabs has accepted the file, so
+        `concurrency` only bounds simultaneous uploads, not jobs in flight.
+
+        Args:
+            audio_paths: Audio files to submit.
+            concurrency: Maximum number of simultaneous uploads.
+            on_submitted: Called with each submit() return value.
+            on_error: Called with (path, error) when a file fails.
+            **kwargs: Transcription options passed to submit().
+
+        Returns:
+            One entry per input path, in input order: the submit() dictionary
+            or the exception that file failed with.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        def run(audio_path: Path) -> dict[str, Any] | Exception:
+            try:
+                submitted = self.submit(audio_path, **kwargs)
+            except Exception as e:
+                if on_error:
+                    on_error(audio_path, e)
+                return e
+            if on_submitted:
+                on_submitted(submitted)
+            return submitted
+
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="submit"
+        ) as executor:
+            return list(executor.map(run, audio_paths))
+
+    def complete_webhook(
+        self, request_id: str, transcription: dict[str, Any]
+    ) -> Optional[dict[str, Any]]:
+        """Write the outputs for a transcript delivered by webhook.
+
+        Args:
+            request_id: Request ID from the callback.
+            transcription: Transcript from the callback (same shape as a
+                convert response).
+
+        Returns:
+            Result dictionary (same keys as transcribe), or None if the request
+            ID isn't pending (unknown, or already handled).
+        """
+        if self.ledger is None:
+            return None
+        pending = self.ledger.get_webhook_request(request_id)
+        if pending is None:
+            return None
+
+        audio_path = Path(pending["audio_path"])
+        json_path, md_path = self._generate_output_paths(audio_path)
+        if pending["cache_key"]:
+            self.cache.put(pending["cache_key"], transcription)
+        result = self._save_outputs(transcription, audio_path, json_path, md_path)
+
+        self.ledger.mark_transcribed(
+            pending["video_id"],
+            json_path,
+            md_path,
+            time.time() - pending["submitted_at"],
+        )
+        self.ledger.remove_webhook_request(request_id)
+        return result
+
+    def fail_webhook(self, request_id: str, error: str) -> Optional[Path]:
+        """Record a transcription that ElevenLabs reported as failed.
+
+        Args:
+            request_id: Request ID from the callback.
+            error: Error message from the callback.
+
+        Returns:
+            The audio path of the failed request, or None if it isn't pending.
+        """
+        if self.ledger is None:
+            return None
+        pending = self.ledger.get_webhook_request(request_id)
+        if pending is None:
+            return None
+
+        self.ledger.mark_failed(pending["video_id"], "transcribe", error)
+        self.ledger.remove_webhook_request(request_id)
+        return Path(pending["audio_path"])
+
+    def transcribe_many(
+        self,
+        audio_paths: list[Path],
+        concurrency: int = 4,
+        language: Optional[str] = None,
+        tag_audio_events: bool = True,
+        diarize: bool = True,
+        use_cache: bool = True,
+        refresh: bool = False,
+        on_start: Optional[Callable[[int, Path], None]] = None,
+        on_result: Optional[Callable[[dict[str, Any]], None]] = None,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> list[dict[str, Any] | Exception]:
+        """Transcribe several audio files with up to `concurrency` requests in flight.
+
+        Requests run on an asyncio event loop using the SDK's async client and a
+        single pooled HTTP session. JSON and Markdown outputs are written as each
+        result arrives rather than after the whole batch. Cache hits don't take
+        up a request slot, and free slots go to files in input order. Long files
+        that need splitting are transcribed in chunks (up to chunk_workers
+        requests each) while holding one slot.
+
+        Args:
+            audio_paths: Audio files to transcribe.
+            concurrency: Maximum number of simultaneous API requests.
+            language: Language code (e.g., 'eng', 'spa'). None for auto-detect.
+            tag_audio_events: Whether to tag audio events like laughter.
+            diarize: Whether to identify speakers.
+            use_cache: Reuse cached responses for identical audio and options.
+            refresh: Call the API even on cache hits and replace the entries.
+            on_start: Called with (1-based index, path) when a file starts.
+            on_result: Called with the result dictionary when a file finishes.
+            on_error: Called with (path, error) when a file fails.
+
+        Returns:
+            One entry per input path, in input order: the result dictionary
+            (same keys as transcribe) or the exception that file failed with.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        return asyncio.run(
+            self._transcribe_many(
+                audio_paths,
+                concurrency,
+                language,
+                tag_audio_events,
+                diarize,
+                use_cache,
+                refresh,
+                on_start,
+                on_result,
+                on_error,
+            )
+        )
+
+    async def _transcribe_many(
+        self,
+        audio_paths: list[Path],
+        concurrency: int,
+        language: Optional[str],
+        tag_audio_events: bool,
+        diarize: bool,
+        use_cache: bool,
+        refresh: bool,
+        on_start: Optional[Callable[[int, Path], None]],
+        on_result: Optional[Callable[[dict[str, Any]], None]],
+        on_error: Optional[Callable[[Path, Exception], None]],
+    ) -> list[dict[str, Any] | Exception]:
+        """Async implementation of transcribe_many."""
+        slots = _OrderedSlots(concurrency)
+        # Files preprocessed and split-planned at once, including those holding
+        # a request slot: the batch in flight plus as many ready for the next
+        # free slots, so temporary copies stay proportional to the concurrency
+        prepared = _OrderedSlots(2 * concurrency)
+        limits = httpx.Limits(
+            max_connections=concurrency, max_keepalive_connections=concurrency
+        )
+
+        # One pooled session shared by every request in the batch
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=_REQUEST_TIMEOUT_SECONDS,
+            follow_redirects=True,
+        ) as http_client:
+            client: Optional["AsyncElevenLabs"] = None
+
+            def get_client() -> "AsyncElevenLabs":
+                # Created on the first API call, like the sync client
+                nonlocal client
+                if client is None:
+                    from elevenlabs.client import AsyncElevenLabs
+
+                    client = AsyncElevenLabs(
+                        api_key=self.config.require_api_key(),
+                        base_url=self.config.elevenlabs_base_url,
+                        httpx_client=http_client,
+                    )
+                return client
+
+            async def convert(upload_path: Path, video_id: str) -> dict[str, Any]:
+                # Async counterpart of _convert
+                async def send() -> Any:
+                    with open(upload_path, "rb") as audio_file:
+                        upload = TimedUpload(audio_file)
+                        api_kwargs = self._build_api_kwargs(
+                            upload, language, tag_audio_events, diarize
+                        )
+                        sent = time.monotonic()
+                        try:
+                            response = await get_client().speech_to_text.convert(
+                                **api_kwargs
+                            )
+                        except _AMBIGUOUS_ERRORS as e:
+                            _raise_if_billed(e, upload)
+                            raise
+                        self._record_request(video_id, upload, sent)
+                    return response
+
+                try:
+                    response = await self.retrier.call_async(send)
+                except Exception as e:
+                    raise self._api_error(e) from e
+                return self._response_to_dict(response, video_id)
+
+            async def run(idx: int, audio_path: Path) -> dict[str, Any] | Exception:
+                # Set once the file leaves the queue (a cache hit, or a request
+                # slot), so queued files aren't shown or timed as transcribing
+                started: Optional[float] = None
+                try:
+                    self._validate_audio_file(audio_path)
+                    json_path, md_path = self._generate_output_paths(audio_path)
+                    cache_key, cached = await asyncio.to_thread(
+                        self._check_cache,
+                        audio_path,
+                        language,
+                        tag_audio_events,
+                        diarize,
+                        use_cache,
+                        refresh,
+                    )
+
+                    if cached is not None:
+                        started = await asyncio.to_thread(
+                            self._record_start, audio_path
+                        )
+                        if on_start:
+                            on_start(idx, audio_path)
+                        result = await asyncio.to_thread(
+                            self._save_outputs,
+                            cached,
+                            audio_path,
+                            json_path,
+                            md_path,
+                            True,
+                        )
+                    else:
+                        async with prepared.slot(idx):
+                            with ExitStack() as stack:
+                                # Preprocess before taking a request slot
+                                upload_path, preprocessed = await asyncio.to_thread(
+                                    stack.enter_context,
+                                    self._preprocessed(audio_path),
+                                )
+                                split = await asyncio.to_thread(
+                                    self._plan_split, upload_path
+                                )
+                                async with slots.slot(idx):
+                                    started = await asyncio.to_thread(
+                                        self._record_start, audio_path
+                                    )
+                                    if on_start:
+                                        on_start(idx, audio_path)
+                                    if split is not None:
+                                        transcript_data = await asyncio.to_thread(
+                                            self._transcribe_chunked,
+                                            upload_path,
+                                            *split,
+                                            language,
+                                            tag_audio_events,
+                                            diarize,
+                                            cache_key,
+                                            refresh,
+                                        )
+                                    else:
+                                        transcript_data = await convert(
+                                            upload_path,
+                                            video_id_from_path(audio_path),
+                                        )
+                        transcript_data = self._restore_times(
+                            transcript_data, preprocessed
+                        )
+
+                        if cache_key is not None:
+                            await asyncio.to_thread(
+                                self.cache.put, cache_key, transcript_data
+                            )
+                        # Write outputs off the event loop so other uploads keep going
+                        result = await asyncio.to_thread(
+                            self._save_outputs,
+                            transcript_data,
+                            audio_path,
+                            json_path,
+                            md_path,
+                        )
+                except Exception as e:
+                    await asyncio.to_thread(
+                        self._record_finish, audio_path, started, None, e
+                    )
+                    if on_error:
+                        on_error(audio_path, e)
+                    return e
+
+                await asyncio.to_thread(
+                    self._record_finish, audio_path, started, result
+                )
+                if on_result:
+                    on_result(result)
+                return result
+
+            return await asyncio.gather(
+                *(run(idx, path) for idx, path in enumerate(audio_paths, 1))
+            )
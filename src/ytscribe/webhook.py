@@ -0,0 +1,306 @@
+"""Receiver for ElevenLabs speech-to-text webhook callbacks.
+
+In webhook mode the transcriber only uploads files and records the returned
+request IDs; ElevenLabs later POSTs each finished transcript to this receiver,
+which verifies the HMAC signature and writes the JSON and Markdown outputs.
+"""
+
+import hashlib
+import hmac
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import httpx
+
+from ytscribe.transcriber import Transcriber
+
+SIGNATURE_HEADER = "ElevenLabs-Signature"
+DEFAULT_PATH = "/webhook/speech-to-text"
+
+# Callbacks signed longer ago than this are rejected (matches the SDK)
+SIGNATURE_TOLERANCE_SECONDS = 30 * 60
+
+TRANSCRIPTION_EVENT = "speech_to_text_transcription"
+
+# Largest callback body accepted, in bytes: well above the transcript of a
+# 10-hour file (about 100 MB with word timings), but bounded, since the body
+# is read before its signature can be checked
+_MAX_CALLBACK_BYTES = 256 * 1024 * 1024
+
+
+class SignatureError(ValueError):
+    """Raised when a webhook signature is missing, stale or wrong."""
+
+
+def sign_payload(body: bytes, secret: str, timestamp: Optional[int] = None) -> str:
+    """Compute the signature header value for a webhook body.
+
+    Used by local fakes to post callbacks the receiver accepts.
+
+    Args:
+        body: Raw request body.
+        secret: Webhook secret.
+        timestamp: Unix time of signing (defaults to now).
+
+    Returns:
+        Header value in the form 't=<timestamp>,v0=<hex digest>'.
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    message = f"{timestamp}.".encode("utf-8") + body
+    digest = hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v0={digest}"
+
+
+def verify_signature(
+    body: bytes,
+    header: Optional[str],
+    secret: str,
+    tolerance: int = SIGNATURE_TOLERANCE_SECONDS,
+) -> None:
+    """Check a webhook signature header against the raw body.
+
+    Args:
+        body: Raw request body.
+        header: Value of the ElevenLabs-Signature header.
+        secret: Webhook secret.
+        tolerance: Maximum signature age in seconds.
+
+    Raises:
+        SignatureError: If the header is missing, too old, or doesn't match.
+    """
+    if not header:
+        raise SignatureError("Missing signature header")
+
+    fields = dict(part.split("=", 1) for part in header.split(",") if "=" in part)
+    timestamp = fields.get("t")
+    signature = fields.get("v0")
+    if not timestamp or not signature:
+        raise SignatureError("No signature hash found with expected scheme v0")
+
+    try:
+        signed_at = int(timestamp)
+    except ValueError:
+        raise SignatureError(f"Invalid signature timestamp: {timestamp}")
+    if signed_at < time.time() - tolerance:
+        raise SignatureError("Signature timestamp outside the tolerance window")
+
+    expected = sign_payload(body, secret, signed_at).partition("v0=")[2]
+    if not hmac.compare_digest(expected, signature):
+        raise SignatureError("Signature does not match payload")
+
+
+def send_callback(
+    url: str,
+    request_id: str,
+    transcription: dict[str, Any],
+    secret: str,
+) -> int:
+    """POST a signed transcription callback, as ElevenLabs would.
+
+    Lets a local fake API (or a test) drive the receiver end to end.
+
+    Args:
+        url: Receiver URL, including the webhook path.
+        request_id: Request ID returned when the file was submitted.
+        transcription: Transcript in the convert response shape.
+        secret: Webhook secret.
+
+    Returns:
+        HTTP status code returned by the receiver.
+    """
+    body = json.dumps(
+        {
+            "type": TRANSCRIPTION_EVENT,
+            "data": {"request_id": request_id, "transcription": transcription},
+        }
+    ).encode("utf-8")
+    response = httpx.post(
+        url,
+        content=body,
+        headers={
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: sign_payload(body, secret),
+        },
+    )
+    return response.status_code
+
+
+class WebhookReceiver:
+    """Small HTTP server that finalises webhook transcriptions as they arrive."""
+
+    def __init__(
+        self,
+        transcriber: Transcriber,
+        secret: str,
+        host: str = "127.0.0.1",
+        port: int = 8787,
+        path: str = DEFAULT_PATH,
+        on_result: Optional[Callable[[dict[str, Any]], None]] = None,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> None:
+        """Initialize the receiver (the server starts with start()).
+
+        Args:
+            transcriber: Transcriber with the job ledger holding pending requests.
+            secret: Webhook secret used to verify signatures.
+            host: Interface to listen on.
+            port: Port to listen on (0 picks a free port).
+            path: URL path callbacks are posted to.
+            on_result: Called with the result dictionary for each transcript.
+            on_error: Called with (audio path, error) for failed transcriptions.
+
+        Raises:
+            ValueError: If no secret is given or the transcriber has no ledger.
+        """
+        if not secret:
+            raise ValueError(
+                "ELEVENLABS_WEBHOOK_SECRET is required to verify webhook callbacks"
+            )
+        if transcriber.ledger is None:
+            raise ValueError("Webhook mode needs a job ledger to track request IDs")
+
+        self.transcriber = transcriber
+        self.secret = secret
+        self.path = path
+        self.on_result = on_result
+        self.on_error = on_error
+        self._handled = threading.Condition()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Full callback URL the server is listening on."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        """Build the request handler bound to this receiver."""
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                if self.path != receiver.path:
+                    self._reply(404, {"error": "Not found"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self._reply(400, {"error": "Invalid Content-Length"})
+                    return
+                if length > _MAX_CALLBACK_BYTES:
+                    self._reply(413, {"error": "Request body too large"})
+                    return
+                body = self.rfile.read(length)
+                status, payload = receiver.handle(
+                    body, self.headers.get(SIGNATURE_HEADER)
+                )
+                self._reply(status, payload)
+
+            def _reply(self, status: int, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # Results are reported through the callbacks instead
+                pass
+
+        return Handler
+
+    def handle(
+        self, body: bytes, signature: Optional[str]
+    ) -> tuple[int, dict[str, Any]]:
+        """Process one callback body.
+
+        Status codes follow the ElevenLabs retry rules: 4xx responses are not
+        retried, 5xx responses are.
+
+        Args:
+            body: Raw request body.
+            signature: Value of the ElevenLabs-Signature header.
+
+        Returns:
+            Tuple of (HTTP status code, JSON response body).
+        """
+        try:
+            verify_signature(body, signature, self.secret)
+        except SignatureError as e:
+            return 401, {"error": str(e)}
+
+        try:
+            event = json.loads(body)
+            data = event["data"]
+            request_id = data["request_id"]
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": "Malformed webhook payload"}
+
+        if event.get("type") != TRANSCRIPTION_EVENT:
+            return 200, {"received": True, "ignored": event.get("type")}
+
+        try:
+            transcription = data.get("transcription")
+            if transcription is None:
+                error = str(data.get("error") or "Transcription failed")
+                audio_path = self.transcriber.fail_webhook(request_id, error)
+                if audio_path is not None and self.on_error:
+                    self.on_error(audio_path, Exception(error))
+            else:
+                result = self.transcriber.complete_webhook(request_id, transcription)
+                if result is not None and self.on_result:
+                    self.on_result(result)
+        except Exception as e:
+            # Let ElevenLabs retry; the request stays pending in the ledger
+            return 500, {"error": str(e)}
+        finally:
+            with self._handled:
+                self._handled.notify_all()
+
+        return 200, {"received": True}
+
+    def pending(self) -> int:
+        """Number of submitted transcriptions still waiting for a callback."""
+        return len(self.transcriber.ledger.webhook_requests())
+
+    def start(self) -> None:
+        """Start serving callbacks on a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="webhook", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the server and wait for the serving thread to exit."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no submitted transcriptions are pending.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None waits forever).
+
+        Returns:
+            True if nothing is pending, False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._handled:
+            while self.pending():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                # Wake up periodically in case another process finished a job
+                self._handled.wait(5.0 if remaining is None else min(remaining, 5.0))
+        return True
@@ -0,0 +1,17 @@
+import pytest
+
+from ytscribe.config import Config
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Configuration with every data directory under tmp_path and no API key."""
+    return Config(
+        elevenlabs_api_key=None,
+        download_root=tmp_path / "audio",
+        transcript_root=tmp_path / "transcripts",
+        cache_root=tmp_path / "cache",
+        ledger_path=tmp_path / "ytscribe.sqlite3",
+        search_index_path=tmp_path / "search.sqlite3",
+        fingerprint_index_path=tmp_path / "fingerprints.sqlite3",
+    )
@@ -0,0 +1,58 @@
+from ytscribe.chunker import Chunk, stitch_transcripts
+
+
+def _word(text, start, speaker):
+    return {
+        "text": text,
+        "type": "word",
+        "start": start,
+        "end": None if start is None else start + 0.5,
+        "speaker_id": speaker,
+    }
+
+
+def test_stitch_maps_speakers_across_the_overlap():
+    chunks = [
+        Chunk(index=0, start=0.0, end=60.0, boundary=0.0),
+        Chunk(index=1, start=50.0, end=120.0, boundary=55.0),
+    ]
+    first = {
+        "words": [_word("hello", 51.0, "speaker_0"), _word("there", 52.0, "speaker_1")]
+    }
+    # The second chunk numbers the same speakers the other way round
+    second = {
+        "words": [
+            _word("hello", 1.0, "speaker_1"),
+            _word("there", 2.0, "speaker_0"),
+            _word("again", 10.0, "speaker_0"),
+        ]
+    }
+
+    words = stitch_transcripts(chunks, [first, second])["words"]
+
+    assert [(w["text"], w["speaker_id"]) for w in words] == [
+        ("hello", "speaker_0"),
+        ("there", "speaker_1"),
+        ("again", "speaker_1"),
+    ]
+
+
+def test_stitch_tolerates_untimed_words_in_the_overlap():
+    chunks = [
+        Chunk(index=0, start=0.0, end=60.0, boundary=0.0),
+        Chunk(index=1, start=50.0, end=120.0, boundary=55.0),
+    ]
+    first = {
+        "words": [_word("hello", None, "speaker_0"), _word("there", 52.0, "speaker_0")]
+    }
+    second = {
+        "words": [
+            _word("there", None, "speaker_3"),
+            _word("there", 2.0, "speaker_3"),
+            _word("again", 10.0, "speaker_3"),
+        ]
+    }
+
+    words = stitch_transcripts(chunks, [first, second])["words"]
+
+    assert words[-1]["speaker_id"] == "speaker_0"
@@ -0,0 +1,142 @@
+import json
+import mmap
+
+import pytest
+
+from ytscribe import columnar
+from ytscribe.columnar import load_columnar, write_columnar
+
+TRANSCRIPT = {
+    "language_code": "eng",
+    "language_probability": 0.98,
+    "text": "Hello there! (laughs)",
+    "words": [
+        {
+            "text": "Hello",
+            "start": 0.0,
+            "end": 0.4,
+            "type": "word",
+            "speaker_id": "speaker_0",
+            "logprob": -0.1,
+            "characters": None,
+        },
+        {
+            "text": " ",
+            "start": None,
+            "end": None,
+            "type": "spacing",
+            "speaker_id": "speaker_0",
+            "logprob": 0.0,
+            "characters": None,
+        },
+        {
+            "text": "there!",
+            "start": 0.5,
+            "end": 0.9,
+            "type": "word",
+            "speaker_id": "speaker_1",
+            "logprob": -0.3,
+            "characters": [{"text": "t", "start": 0.5, "end": 0.55}],
+        },
+        {
+            "text": "(laughs)",
+            "start": 1.0,
+            "end": 1.5,
+            "type": "audio_event",
+            "speaker_id": None,
+            "logprob": None,
+            "characters": None,
+        },
+    ],
+}
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_round_trip(tmp_path, compression):
+    path = write_columnar(TRANSCRIPT, tmp_path / "t.words", compression)
+
+    with load_columnar(path) as transcript:
+        assert len(transcript) == 4
+        assert transcript.compression == compression
+        assert transcript.word(2) == TRANSCRIPT["words"][2]
+        assert transcript.to_dict() == TRANSCRIPT
+
+
+def test_round_trip_keeps_missing_fields_and_text(tmp_path):
+    original = {"text": "something else", "words": [{"text": "hi"}, {"text": "!"}]}
+    path = write_columnar(original, tmp_path / "t.words", "none")
+
+    with load_columnar(path) as transcript:
+        assert transcript.to_dict() == original
+
+
+def test_empty_transcript(tmp_path):
+    path = write_columnar({"text": "", "words": []}, tmp_path / "t.words", "none")
+
+    with load_columnar(path) as transcript:
+        assert transcript.to_dict() == {"text": "", "words": []}
+
+
+@pytest.fixture
+def maps(monkeypatch):
+    """Every memory map opened while loading."""
+    opened = []
+
+    class RecordingMmap(mmap.mmap):
+        def __new__(cls, *args, **kwargs):
+            instance = super().__new__(cls, *args, **kwargs)
+            opened.append(instance)
+            return instance
+
+    monkeypatch.setattr(columnar.mmap, "mmap", RecordingMmap)
+    return opened
+
+
+def _odd_column(path):
+    """Rewrite the header so the start column isn't a whole number of floats."""
+    data = path.read_bytes()
+    _, version, code, header_len = columnar._PREAMBLE.unpack_from(data)
+    body_start = columnar._PREAMBLE.size + header_len
+    header = json.loads(data[columnar._PREAMBLE.size : body_start])
+    header["sections"]["start"] = [0, 7]
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b" " * (-(columnar._PREAMBLE.size + len(header_bytes)) % 8)
+    preamble = columnar._PREAMBLE.pack(b"YTSW", version, code, len(header_bytes))
+    path.write_bytes(preamble + header_bytes + data[body_start:])
+
+
+def _corrupt(path, offset, data):
+    content = bytearray(path.read_bytes())
+    content[offset : offset + len(data)] = data
+    path.write_bytes(bytes(content))
+
+
+@pytest.mark.parametrize(
+    "damage",
+    [
+        pytest.param(lambda p: p.write_bytes(p.read_bytes()[:6]), id="truncated"),
+        pytest.param(lambda p: p.write_bytes(p.read_bytes()[:-100]), id="short-body"),
+        pytest.param(_odd_column, id="odd-column"),
+        pytest.param(lambda p: _corrupt(p, 0, b"NOPE"), id="magic"),
+        pytest.param(lambda p: _corrupt(p, 5, b"\x09"), id="compression-code"),
+        pytest.param(lambda p: _corrupt(p, 12, b"[]"), id="header"),
+    ],
+)
+def test_corrupt_file_raises_value_error_and_closes_map(tmp_path, maps, damage):
+    path = write_columnar(TRANSCRIPT, tmp_path / "t.words", "none")
+    damage(path)
+
+    with pytest.raises(ValueError):
+        load_columnar(path)
+
+    assert maps and all(m.closed for m in maps)
+
+
+def test_corrupt_gzip_body_raises_value_error(tmp_path, maps):
+    path = write_columnar(TRANSCRIPT, tmp_path / "t.words", "gzip")
+    path.write_bytes(path.read_bytes()[:-20])
+
+    with pytest.raises(ValueError):
+        load_columnar(path)
+
+    assert all(m.closed for m in maps)
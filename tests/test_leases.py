@@ -0,0 +1,56 @@
+import json
+import os
+import time
+
+from ytscribe import leases
+from ytscribe.leases import LeaseSet
+
+
+def _expired_lease(directory, key, worker="crashed", age=100.0):
+    path = directory / f"{key}.lease"
+    path.write_text(json.dumps({"worker": worker}))
+    stale = time.time() - age
+    os.utime(path, (stale, stale))
+    return path
+
+
+def test_claim_takes_over_expired_lease(tmp_path):
+    _expired_lease(tmp_path, "vid")
+    a = LeaseSet(tmp_path, "A", ttl=10)
+
+    assert a.claim("vid")
+    assert a.metrics.counter("leases_reclaimed_total") == 1
+
+
+def test_claim_respects_live_lease(tmp_path):
+    a = LeaseSet(tmp_path, "A", ttl=10)
+    b = LeaseSet(tmp_path, "B", ttl=10)
+
+    assert a.claim("vid")
+    assert not b.claim("vid")
+
+
+def test_break_does_not_rename_away_a_fresh_lease(tmp_path, monkeypatch):
+    path = _expired_lease(tmp_path, "vid")
+    a = LeaseSet(tmp_path, "A", ttl=10)
+    b = LeaseSet(tmp_path, "B", ttl=10)
+    rename = os.rename
+    interleaved = False
+
+    def rename_after_b_claims(src, dst):
+        # A has seen the lease expired; B breaks it and claims the key
+        # before A's rename runs
+        nonlocal interleaved
+        if not interleaved and src == path:
+            interleaved = True
+            monkeypatch.setattr(leases.os, "rename", rename)
+            assert b.claim("vid")
+        rename(src, dst)
+
+    monkeypatch.setattr(leases.os, "rename", rename_after_b_claims)
+
+    assert not a.claim("vid")
+    assert interleaved
+    assert "vid" in b.held() and "vid" not in a.held()
+    assert json.loads(path.read_text())["worker"] == "B"
+    assert not list(tmp_path.glob("*.expired"))
@@ -0,0 +1,95 @@
+import pytest
+
+from ytscribe.preprocess import TimeMap, plan_cuts
+
+# 3 s of silence in the middle of a 10 s file, cut down to 1 s
+CUT = TimeMap([(0.0, 0.0, 3.5), (3.5, 5.5, 4.5)])
+
+
+@pytest.mark.parametrize(
+    "silences, segments",
+    [
+        ([], [(0.0, 0.0, 10.0)]),
+        ([(2.0, 2.8)], [(0.0, 0.0, 10.0)]),
+        ([(2.0, 3.0)], [(0.0, 0.0, 10.0)]),
+        ([(3.0, 6.0)], [(0.0, 0.0, 3.5), (3.5, 5.5, 4.5)]),
+        ([(3.004, 5.996)], [(0.0, 0.0, 3.5), (3.5, 5.5, 4.5)]),
+        ([(0.0, 2.0)], [(0.0, 1.5, 8.5)]),
+        ([(0.003, 2.0)], [(0.0, 1.5, 8.5)]),
+        ([(8.0, 9.98)], [(0.0, 0.0, 8.5)]),
+        ([(0.0, 10.0)], [(0.0, 0.0, 10.0)]),
+        (
+            [(2.0, 4.0), (6.0, 9.0)],
+            [(0.0, 0.0, 2.5), (2.5, 3.5, 3.0), (5.5, 8.5, 1.5)],
+        ),
+    ],
+    ids=[
+        "none",
+        "short",
+        "exactly-max",
+        "middle",
+        "snapped",
+        "leading",
+        "leading-late",
+        "trailing",
+        "all-silent",
+        "two",
+    ],
+)
+def test_plan_cuts(silences, segments):
+    assert plan_cuts(10.0, silences, max_silence=1.0).segments == segments
+
+
+@pytest.mark.parametrize(
+    "seconds, end, original",
+    [
+        (0.0, False, 0.0),
+        (0.0, True, 0.0),
+        (2.0, False, 2.0),
+        # A time on the cut starts the stretch after it...
+        (3.5, False, 5.5),
+        # ...unless it ends a word, which then ends before the cut
+        (3.5, True, 3.5),
+        (3.49, True, 3.49),
+        (4.0, False, 6.0),
+        (4.0, True, 6.0),
+        (8.0, True, 10.0),
+        # Out of range times are clamped to the file
+        (9.0, False, 10.0),
+        (-1.0, False, 0.0),
+    ],
+)
+def test_to_original(seconds, end, original):
+    assert CUT.to_original(seconds, end=end) == pytest.approx(original)
+
+
+def test_identity_map_changes_nothing():
+    time_map = TimeMap.identity(60.0)
+
+    assert [time_map.to_original(t) for t in (0.0, 12.5, 60.0)] == [0.0, 12.5, 60.0]
+
+
+def test_restore_maps_word_times():
+    transcript = {
+        "text": "before after",
+        "words": [
+            {"text": "before", "start": 2.9, "end": 3.5, "speaker_id": "speaker_0"},
+            {"text": " ", "type": "spacing", "start": None, "end": None},
+            {"text": "after", "start": 3.5, "end": 4.123456},
+        ],
+    }
+
+    restored = CUT.restore(transcript)
+
+    assert restored["text"] == "before after"
+    assert restored["words"] == [
+        {"text": "before", "start": 2.9, "end": 3.5, "speaker_id": "speaker_0"},
+        {"text": " ", "type": "spacing", "start": None, "end": None},
+        {"text": "after", "start": 5.5, "end": 6.123},
+    ]
+    # The input is left as it was
+    assert transcript["words"][2] == {"text": "after", "start": 3.5, "end": 4.123456}
+
+
+def test_restore_without_words():
+    assert CUT.restore({"text": ""}) == {"text": "", "words": []}
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from ytscribe import retry
+from ytscribe.retry import CircuitBreaker, Retrier
+
+
+class _Throttled(Exception):
+    status_code = 429
+    headers = {}
+
+
+def _opened(monkeypatch, cooldown=0.05):
+    monkeypatch.setattr(retry, "_PROBE_POLL_SECONDS", 0.01)
+    breaker = CircuitBreaker("test", threshold=1, cooldown=cooldown)
+    breaker.record_throttle()
+    return breaker
+
+
+def _wait_in_threads(breaker, count):
+    admitted = []
+
+    def wait():
+        admitted.append(breaker.wait())
+
+    threads = [threading.Thread(target=wait) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return admitted, threads
+
+
+def test_one_probe_after_the_pause(monkeypatch):
+    breaker = _opened(monkeypatch)
+
+    admitted, threads = _wait_in_threads(breaker, 3)
+    time.sleep(0.2)
+    assert admitted == [True]
+
+    breaker.record_success()
+    for thread in threads:
+        thread.join(timeout=1)
+    assert sorted(admitted) == [False, False, True]
+
+
+def test_throttled_probe_reopens_for_longer(monkeypatch):
+    breaker = _opened(monkeypatch)
+    assert breaker.wait()
+
+    breaker.record_throttle()
+
+    assert breaker.remaining() > 0.05
+    assert breaker.remaining() <= 0.1
+
+
+def test_probe_with_other_outcome_lets_next_caller_probe(monkeypatch):
+    breaker = _opened(monkeypatch)
+    retrier = Retrier("test", breaker, attempts=1)
+
+    def fail():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        retrier.call(fail)
+
+    admitted, threads = _wait_in_threads(breaker, 1)
+    for thread in threads:
+        thread.join(timeout=1)
+    assert admitted == [True]
+
+
+def test_closed_circuit_admits_everyone():
+    breaker = CircuitBreaker("test")
+
+    assert [breaker.wait() for _ in range(3)] == [False, False, False]
+
+
+def test_retrier_retries_throttled_calls(monkeypatch):
+    monkeypatch.setattr(retry.time, "sleep", lambda seconds: None)
+    breaker = CircuitBreaker("test", threshold=10)
+    retrier = Retrier("test", breaker, attempts=3)
+    calls = []
+
+    def throttled_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise _Throttled()
+        return "ok"
+
+    assert retrier.call(throttled_once) == "ok"
+    assert len(calls) == 2
@@ -0,0 +1,161 @@
+import json
+
+import pytest
+
+from ytscribe.columnar import write_columnar
+from ytscribe.search import IndexStats, SearchIndex, find_transcripts, tokenize
+from ytscribe.storage import write_transcript_json
+
+
+def _transcript(*lines):
+    """Transcript with one word per token; lines are (speaker, text) pairs."""
+    words = []
+    start = 0.0
+    for speaker, text in lines:
+        for token in text.split():
+            if words:
+                words.append({"text": " ", "type": "spacing", "start": None})
+            words.append(
+                {"text": token, "type": "word", "start": start, "speaker_id": speaker}
+            )
+            start += 1.0
+    words.append({"text": "(applause)", "type": "audio_event", "start": start})
+    return {"text": " ".join(text for _, text in lines), "words": words}
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "transcripts" / "channel"
+    root.mkdir(parents=True)
+    write_transcript_json(
+        _transcript(
+            ("speaker_0", "Welcome back to the show."),
+            ("speaker_1", "Don't forget: the show must go on!"),
+        ),
+        root / "20240101_aaa.json",
+    )
+    write_columnar(
+        _transcript(("speaker_0", "Another show, another day")),
+        root / "20240102_bbb.words",
+        "gzip",
+    )
+    return root.parent
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(tmp_path / "search.sqlite3")
+    yield index
+    index.close()
+
+
+@pytest.mark.parametrize(
+    "text, tokens",
+    [
+        ("Hello, World!", ["hello", "world"]),
+        ("Don't stop", ["don't", "stop"]),
+        ("rock’n’roll", ["rock’n’roll"]),
+        ("'quoted'", ["quoted"]),
+        ("Café 2024", ["café", "2024"]),
+        ("...", []),
+    ],
+)
+def test_tokenize(text, tokens):
+    assert tokenize(text) == tokens
+
+
+def test_search_word_and_phrase(root, index):
+    assert index.update(root) == IndexStats(added=2)
+
+    hits = index.search("show")
+    assert [(hit.video_id, hit.start) for hit in hits] == [
+        ("aaa", 4.0),
+        ("aaa", 8.0),
+        ("bbb", 1.0),
+    ]
+    assert hits[0].url == "https://www.youtube.com/watch?v=aaa&t=4s"
+
+    phrase = index.search("The show MUST")
+    assert [(hit.video_id, hit.position) for hit in phrase] == [("aaa", 7)]
+    assert phrase[0].snippet.endswith("forget **the** **show** **must** go on")
+
+    assert index.search("show the") == []
+    assert index.search("applause") == []
+    assert index.search("missing") == []
+    assert index.search("!!") == []
+
+
+def test_search_by_speaker(root, index):
+    index.update(root)
+
+    assert [hit.start for hit in index.search("show", speaker="speaker_1")] == [8.0]
+    assert index.search("welcome", speaker="speaker_1") == []
+    assert len(index.search("show", limit=1)) == 1
+
+
+def test_update_is_incremental(root, index):
+    index.update(root)
+    events = []
+
+    def on_progress(action, path):
+        events.append((action.split(":")[0], path.name))
+
+    assert index.update(root, on_progress=on_progress) == IndexStats(unchanged=2)
+    assert events == []
+
+    write_transcript_json(
+        _transcript(("speaker_0", "A different episode entirely")),
+        root / "channel" / "20240101_aaa.json",
+    )
+    (root / "channel" / "20240102_bbb.words").unlink()
+    write_transcript_json(
+        _transcript(("speaker_2", "Brand new show")),
+        root / "channel" / "20240103_ccc.json.gz",
+        compression="gzip",
+    )
+    (root / "channel" / "20240104_bad.json").write_text("{not json")
+    (root / "channel" / "20240105_list.json").write_text("[]")
+    (root / "channel" / "20240106_broken.words").write_bytes(b"YTSW")
+
+    stats = index.update(root, on_progress=on_progress)
+
+    assert stats == IndexStats(added=1, updated=1, removed=1, failed=3)
+    assert sorted(events) == [
+        ("added", "20240103_ccc.json.gz"),
+        ("failed", "20240104_bad.json"),
+        ("failed", "20240105_list.json"),
+        ("failed", "20240106_broken.words"),
+        ("removed", "20240102_bbb.words"),
+        ("updated", "20240101_aaa.json"),
+    ]
+    assert index.document_count() == 2
+    assert [hit.video_id for hit in index.search("show")] == ["ccc"]
+    assert [hit.video_id for hit in index.search("episode")] == ["aaa"]
+
+
+def test_failed_file_keeps_previous_index(root, index):
+    index.update(root)
+    path = root / "channel" / "20240101_aaa.json"
+    path.write_text(json.dumps({"words": "not a list"}))
+
+    assert index.update(root).failed == 1
+    # The old postings stay searchable until the file can be read again
+    assert [hit.video_id for hit in index.search("welcome")] == ["aaa"]
+
+
+def test_rebuild_reindexes_everything(root, index):
+    index.update(root)
+
+    assert index.update(root, rebuild=True) == IndexStats(added=2)
+
+
+def test_columnar_file_shadows_json_of_same_video(root):
+    channel = root / "channel"
+    write_transcript_json(
+        _transcript(("speaker_0", "x")), channel / "20240102_bbb.json"
+    )
+
+    assert [path.name for path in find_transcripts(root)] == [
+        "20240101_aaa.json",
+        "20240102_bbb.words",
+    ]
@@ -0,0 +1,226 @@
+import http.client
+import json
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from ytscribe import server as server_module
+from ytscribe.server import (
+    DONE,
+    FAILED,
+    JOB_OPTIONS,
+    Job,
+    JobServer,
+    parse_job_request,
+)
+
+
+class FakeDownloader:
+    """Lists a fixed set of videos per URL and 'downloads' them instantly."""
+
+    def __init__(self, playlists, broken=()):
+        self.playlists = playlists
+        self.broken = set(broken)
+        self.ledger = None
+
+    def iter_entries(self, url):
+        if url not in self.playlists:
+            raise RuntimeError(f"Cannot list {url}")
+        yield from (
+            {"id": video_id, "title": video_id} for video_id in self.playlists[url]
+        )
+
+    def download_entry(self, entry, index, total, skip_existing, progress_label):
+        if entry["id"] in self.broken:
+            return None
+        return Path(f"/audio/20240101_{entry['id']}.opus")
+
+
+class FakeTranscriber:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio_path, **options):
+        self.calls.append((audio_path.name, options))
+        return {
+            "json_path": audio_path.with_suffix(".json"),
+            "md_path": audio_path.with_suffix(".md"),
+            "cached": False,
+        }
+
+
+@pytest.fixture
+def make_server():
+    servers = []
+
+    def make(playlists, broken=(), transcriber=None, **kwargs):
+        server = JobServer(
+            FakeDownloader(playlists, broken),
+            transcriber if transcriber is not None else FakeTranscriber(),
+            port=0,
+            **kwargs,
+        )
+        server.start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.stop(timeout=5)
+
+
+def _wait_finished(server, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = server.job(job_id)
+        if job["state"] in (DONE, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.mark.parametrize(
+    "payload, message",
+    [
+        ([], "must be a JSON object"),
+        ({}, "'url' is required"),
+        ({"url": "  "}, "'url' is required"),
+        ({"url": 5}, "'url' is required"),
+        ({"url": "u", "speed": 2}, "Unknown option"),
+        ({"url": "u", "language": 1}, "'language' must be a string"),
+        ({"url": "u", "diarize": "yes"}, "'diarize' must be true or false"),
+    ],
+)
+def test_parse_job_request_rejects(payload, message):
+    with pytest.raises(ValueError, match=message):
+        parse_job_request(payload)
+
+
+def test_parse_job_request_fills_defaults():
+    url, options = parse_job_request({"url": " URL ", "language": "eng"})
+
+    assert url == "URL"
+    assert options == {**JOB_OPTIONS, "language": "eng"}
+
+
+def test_job_runs_every_video(make_server):
+    transcriber = FakeTranscriber()
+    server = make_server({"list": ["a", "b"]}, transcriber=transcriber)
+
+    response = httpx.post(f"{server.url}/jobs", json={"url": "list", "diarize": False})
+    assert response.status_code == 202
+    job = _wait_finished(server, response.json()["job_id"])
+
+    assert job["state"] == DONE
+    assert job["counts"] == {DONE: 2}
+    assert [video["json_path"] for video in job["videos"]] == [
+        "/audio/20240101_a.json",
+        "/audio/20240101_b.json",
+    ]
+    assert all(options["diarize"] is False for _, options in transcriber.calls)
+    assert httpx.get(f"{server.url}/jobs").json()["jobs"][0]["job_id"] == job["job_id"]
+
+
+def test_job_fails_when_every_video_fails(make_server):
+    server = make_server({"list": ["a"]}, broken={"a"})
+
+    job = _wait_finished(server, server.submit("list").job_id)
+
+    assert job["state"] == FAILED
+    assert job["videos"][0]["error"] == "Download failed"
+    assert job["error"] == "All 1 video(s) failed"
+
+
+def test_job_with_listing_error_fails(make_server):
+    server = make_server({})
+
+    job = _wait_finished(server, server.submit("missing").job_id)
+
+    assert job["state"] == FAILED
+    assert job["error"].startswith("Listing failed")
+
+
+def test_skip_transcribe_only_downloads(make_server):
+    transcriber = FakeTranscriber()
+    server = make_server({"list": ["a"]}, transcriber=transcriber)
+
+    job = _wait_finished(
+        server, server.submit("list", {"skip_transcribe": True}).job_id
+    )
+
+    assert job["state"] == DONE
+    assert job["videos"][0]["audio_path"] == "/audio/20240101_a.opus"
+    assert transcriber.calls == []
+
+
+def _post(url, body, length):
+    """POST a raw body with the given Content-Length header."""
+    parts = httpx.URL(url)
+    connection = http.client.HTTPConnection(parts.host, parts.port, timeout=5)
+    try:
+        connection.putrequest("POST", "/jobs")
+        connection.putheader("Content-Length", length)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize(
+    "body, length, status, error",
+    [
+        (b"{}", "-1", 400, "Invalid Content-Length"),
+        (b"{}", "two", 400, "Invalid Content-Length"),
+        (b"{}", str(server_module._MAX_REQUEST_BYTES + 1), 413, "too large"),
+        (b"not json", "8", 400, "Expecting value"),
+        (b'{"url": ""}', "11", 400, "'url' is required"),
+    ],
+)
+def test_bad_submissions(make_server, body, length, status, error):
+    server = make_server({})
+
+    reply_status, reply = _post(server.url, body, length)
+
+    assert reply_status == status
+    assert error in reply["error"]
+    assert server.jobs() == []
+
+
+def test_unknown_routes(make_server):
+    server = make_server({})
+
+    assert httpx.get(f"{server.url}/jobs/nope").status_code == 404
+    assert httpx.get(f"{server.url}/videos/nope").status_code == 404
+    assert httpx.post(f"{server.url}/other", json={}).status_code == 404
+    assert httpx.get(f"{server.url}/health").json()["status"] == "ok"
+
+
+def test_forget_finished_drops_only_old_finished_jobs():
+    server = JobServer(FakeDownloader({}), None, port=0, job_retention=60)
+    try:
+        now = time.time()
+        old = Job("old", "u", {}, state=DONE, finished_at=now - 120)
+        recent = Job("recent", "u", {}, state=DONE, finished_at=now - 30)
+        running = Job("running", "u", {}, state="running", submitted_at=now - 120)
+        for job in (old, recent, running):
+            server._jobs[job.job_id] = job
+
+        with server._lock:
+            server._forget_finished()
+
+        assert set(server._jobs) == {"recent", "running"}
+    finally:
+        server._server.server_close()
+
+
+def test_submit_forgets_expired_jobs(make_server):
+    server = make_server({"list": ["a"]}, job_retention=0)
+    first = server.submit("list").job_id
+    _wait_finished(server, first)
+
+    server.submit("list")
+
+    assert server.job(first) is None
@@ -0,0 +1,46 @@
+import os
+import stat
+import subprocess
+import sys
+
+from ytscribe import storage
+from ytscribe.storage import atomic_write
+
+
+def test_atomic_write_uses_umask_permissions(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_umask", None)
+    previous = os.umask(0o027)
+    try:
+        with atomic_write(tmp_path / "out.txt") as f:
+            f.write("hello")
+    finally:
+        os.umask(previous)
+
+    path = tmp_path / "out.txt"
+    assert path.read_text() == "hello"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+
+def test_umask_is_not_changed_at_import():
+    code = (
+        "import os\n"
+        "def umask(mask): raise AssertionError('umask changed at import')\n"
+        "os.umask = umask\n"
+        "import ytscribe.storage\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+def test_failed_atomic_write_leaves_destination(tmp_path):
+    path = tmp_path / "out.txt"
+    path.write_text("old")
+    try:
+        with atomic_write(path) as f:
+            f.write("new")
+            raise RuntimeError("interrupted")
+    except RuntimeError:
+        pass
+
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["out.txt"]
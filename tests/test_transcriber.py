@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from ytscribe import transcriber
+from ytscribe.chunker import Chunk
+from ytscribe.fingerprint import Match
+from ytscribe.ledger import Ledger
+from ytscribe.transcriber import Transcriber
+
+
+def _fake_split(monkeypatch):
+    def split_audio(audio_path, output_dir, duration, target_seconds):
+        chunks = [
+            Chunk(index=0, start=0.0, end=60.0, boundary=0.0),
+            Chunk(index=1, start=55.0, end=120.0, boundary=58.0),
+        ]
+        for chunk in chunks:
+            chunk.path = output_dir / f"part{chunk.index}.mp3"
+            chunk.path.write_bytes(b"audio")
+        return chunks
+
+    monkeypatch.setattr(transcriber, "split_audio", split_audio)
+
+
+def test_chunked_reuses_paid_chunks_after_a_failure(tmp_path, config, monkeypatch):
+    _fake_split(monkeypatch)
+    t = Transcriber(config, chunk_workers=1)
+    calls = []
+    fail = {"part1.mp3"}
+
+    def convert(path, language, tag_audio_events, diarize, video_id=None):
+        calls.append(path.name)
+        if path.name in fail:
+            raise RuntimeError("chunk failed")
+        return {"words": [{"text": path.stem, "start": 5.0, "end": 6.0}]}
+
+    monkeypatch.setattr(t, "_convert", convert)
+    audio = tmp_path / "video.mp3"
+    audio.write_bytes(b"audio")
+
+    with pytest.raises(RuntimeError):
+        t._transcribe_chunked(audio, 120.0, 60.0, None, True, True, "key")
+    fail.clear()
+    result = t._transcribe_chunked(audio, 120.0, 60.0, None, True, True, "key")
+
+    assert calls == ["part0.mp3", "part1.mp3", "part1.mp3"]
+    assert [w["text"] for w in result["words"]] == ["part0", "part1"]
+
+
+def test_chunked_refresh_and_no_cache_transcribe_every_chunk(
+    tmp_path, config, monkeypatch
+):
+    _fake_split(monkeypatch)
+    t = Transcriber(config, chunk_workers=1)
+    calls = []
+
+    def convert(path, language, tag_audio_events, diarize, video_id=None):
+        calls.append(path.name)
+        return {"words": []}
+
+    monkeypatch.setattr(t, "_convert", convert)
+    audio = tmp_path / "video.mp3"
+    audio.write_bytes(b"audio")
+
+    t._transcribe_chunked(audio, 120.0, 60.0, None, True, True, "key")
+    t._transcribe_chunked(audio, 120.0, 60.0, None, True, True, "key", refresh=True)
+    t._transcribe_chunked(audio, 120.0, 60.0, None, True, True)
+
+    assert len(calls) == 6
+
+
+class _FakeIndex:
+    """Fingerprint index in which every file is a reupload of 'orig'."""
+
+    def __init__(self, original_path):
+        self.match = Match(
+            video_id="orig",
+            audio_path=original_path,
+            offset=0.0,
+            duration=60.0,
+            matched_duration=60.0,
+            bit_error_rate=0.0,
+        )
+
+    def get(self, video_id):
+        return object()
+
+    def find(self, fingerprint, exclude=None):
+        return [self.match]
+
+
+def _reupload(tmp_path, config):
+    """A transcriber that knows 'orig' was transcribed, and a reupload of it."""
+    original = tmp_path / "20240101_orig.mp3"
+    original.write_bytes(b"original")
+    transcript = tmp_path / "20240101_orig.json"
+    transcript.write_text(json.dumps({"text": "hi", "words": [{"text": "hi"}]}))
+    ledger = Ledger(config.ledger_path)
+    ledger.mark_transcribed("orig", transcript, tmp_path / "orig.md", 1.0)
+
+    t = Transcriber(config, chunk_workers=1)
+    t.ledger = ledger
+    t.fingerprints = _FakeIndex(original)
+    reupload = tmp_path / "20240102_copy.mp3"
+    reupload.write_bytes(b"reupload")
+    return t, reupload
+
+
+def test_duplicates_are_reused_with_the_cache_off(tmp_path, config):
+    t, reupload = _reupload(tmp_path, config)
+
+    key, cached = t._check_cache(reupload, None, True, True, False, False)
+
+    assert key is None
+    assert cached["words"] == [{"text": "hi"}]
+    assert cached["duplicate_of"]["video_id"] == "orig"
+    assert not (tmp_path / "cache").exists()
+
+
+def test_duplicate_falls_back_to_ledger_transcript_when_evicted(tmp_path, config):
+    t, reupload = _reupload(tmp_path, config)
+
+    key, cached = t._check_cache(reupload, None, True, True, True, False)
+
+    assert cached["words"] == [{"text": "hi"}]
+    # Stored under the reupload's own key for next time
+    assert t.cache.get(key) == cached
@@ -0,0 +1,189 @@
+import http.client
+import json
+import time
+from urllib.parse import urlsplit
+
+import httpx
+import pytest
+
+from ytscribe.ledger import FAILED, TRANSCRIBED, Ledger
+from ytscribe.transcriber import Transcriber
+from ytscribe.webhook import (
+    SIGNATURE_HEADER,
+    TRANSCRIPTION_EVENT,
+    SignatureError,
+    WebhookReceiver,
+    send_callback,
+    sign_payload,
+    verify_signature,
+)
+
+SECRET = "whsec_test"
+TRANSCRIPT = {
+    "language_code": "eng",
+    "text": "Hello there",
+    "words": [
+        {"text": "Hello", "type": "word", "start": 0.0, "end": 0.4},
+        {"text": " ", "type": "spacing", "start": 0.4, "end": 0.5},
+        {"text": "there", "type": "word", "start": 0.5, "end": 0.9},
+    ],
+}
+
+
+def _body(request_id="req-1", transcription=TRANSCRIPT, **data):
+    return json.dumps(
+        {
+            "type": TRANSCRIPTION_EVENT,
+            "data": {"request_id": request_id, "transcription": transcription, **data},
+        }
+    ).encode("utf-8")
+
+
+@pytest.fixture
+def receiver(config):
+    audio = config.download_root / "channel" / "20240101_vid.opus"
+    audio.parent.mkdir(parents=True)
+    audio.write_bytes(b"audio")
+    ledger = Ledger(config.ledger_path)
+    ledger.add_webhook_request("req-1", "vid", audio)
+    receiver = WebhookReceiver(Transcriber(config, ledger), SECRET, port=0)
+    yield receiver
+    receiver._server.server_close()
+    ledger.close()
+
+
+@pytest.mark.parametrize(
+    "header, message",
+    [
+        (None, "Missing signature header"),
+        ("v0=abc", "No signature hash"),
+        ("t=soon,v0=abc", "Invalid signature timestamp"),
+        (sign_payload(b"{}", SECRET, timestamp=0), "outside the tolerance"),
+        (sign_payload(b"{}", "other secret"), "does not match"),
+        (sign_payload(b'{"tampered": 1}', SECRET), "does not match"),
+    ],
+)
+def test_verify_signature_rejects(header, message):
+    with pytest.raises(SignatureError, match=message):
+        verify_signature(b"{}", header, SECRET)
+
+
+def test_verify_signature_accepts_recent_signature():
+    signed_at = int(time.time()) - 60
+    verify_signature(b"{}", sign_payload(b"{}", SECRET, signed_at), SECRET)
+
+
+def test_handle_writes_transcript_and_forgets_request(receiver, config):
+    body = _body()
+
+    status, payload = receiver.handle(body, sign_payload(body, SECRET))
+
+    assert (status, payload) == (200, {"received": True})
+    ledger = receiver.transcriber.ledger
+    assert ledger.get("vid")["state"] == TRANSCRIBED
+    assert ledger.get_webhook_request("req-1") is None
+    json_path = config.transcript_root / "channel" / "20240101_vid.json"
+    assert json.loads(json_path.read_text())["text"] == "Hello there"
+    assert receiver.pending() == 0
+
+
+def test_handle_records_failed_transcription(receiver):
+    body = _body(transcription=None, error="Audio too short")
+
+    status, _ = receiver.handle(body, sign_payload(body, SECRET))
+
+    assert status == 200
+    row = receiver.transcriber.ledger.get("vid")
+    assert row["state"] == FAILED
+    assert row["error"] == "Audio too short"
+
+
+@pytest.mark.parametrize(
+    "signature",
+    [
+        None,
+        sign_payload(_body(), SECRET, timestamp=0),
+        sign_payload(_body(request_id="req-2"), SECRET),
+    ],
+    ids=["unsigned", "stale", "tampered"],
+)
+def test_handle_rejects_bad_signatures(receiver, signature):
+    status, _ = receiver.handle(_body(), signature)
+
+    assert status == 401
+    assert receiver.pending() == 1
+
+
+def test_handle_rejects_malformed_payload(receiver):
+    body = b'{"type": "speech_to_text_transcription"}'
+
+    assert receiver.handle(body, sign_payload(body, SECRET))[0] == 400
+
+
+def test_handle_ignores_other_events(receiver):
+    body = json.dumps({"type": "other", "data": {"request_id": "req-1"}}).encode()
+
+    status, payload = receiver.handle(body, sign_payload(body, SECRET))
+
+    assert (status, payload["ignored"]) == (200, "other")
+    assert receiver.pending() == 1
+
+
+def test_handle_ignores_unknown_request(receiver):
+    body = _body(request_id="unknown")
+
+    assert receiver.handle(body, sign_payload(body, SECRET))[0] == 200
+    assert receiver.pending() == 1
+
+
+def test_send_callback_drives_the_receiver(receiver):
+    results = []
+    receiver.on_result = results.append
+    receiver.start()
+    try:
+        status = send_callback(receiver.url, "req-1", TRANSCRIPT, SECRET)
+        # The receiver answers 401 to callbacks signed with another secret
+        wrong = send_callback(receiver.url, "req-1", TRANSCRIPT, "other secret")
+    finally:
+        receiver.stop()
+
+    assert (status, wrong) == (200, 401)
+    assert [result["transcript"]["text"] for result in results] == ["Hello there"]
+    assert receiver.wait_until_idle(timeout=0)
+
+
+def _post_with_length(url, length):
+    """POST a small body that claims a different Content-Length."""
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=5)
+    try:
+        connection.putrequest("POST", parts.path)
+        connection.putheader("Content-Length", length)
+        connection.endheaders(b"{}")
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+def test_receiver_rejects_bad_requests(receiver):
+    receiver.start()
+    try:
+        bad_length = _post_with_length(receiver.url, "-5")
+        not_a_number = _post_with_length(receiver.url, "lots")
+        too_large = _post_with_length(receiver.url, str(2**40))
+        wrong_path = httpx.post(receiver.url + "/other", content=_body())
+        unsigned = httpx.post(receiver.url, content=_body())
+        signed = _body()
+        tampered = httpx.post(
+            receiver.url,
+            content=signed.replace(b"Hello", b"Jello"),
+            headers={SIGNATURE_HEADER: sign_payload(signed, SECRET)},
+        )
+    finally:
+        receiver.stop()
+
+    assert (bad_length, not_a_number, too_large) == (400, 400, 413)
+    assert wrong_path.status_code == 404
+    assert unsigned.status_code == 401
+    assert tampered.status_code == 401
+    assert receiver.pending() == 1